@@ -40,23 +40,49 @@
     'data/mail_activity_data.xml',
     'data/mail_templates.xml',
         'data/cron_escalation.xml',
+        'data/cron_archive.xml',
+        'data/cron_retention.xml',
+        'data/cron_anomaly.xml',
+        'data/cron_snapshot.xml',
+        'data/cron_concerns.xml',
         
         # Views
         'views/job_status_views.xml',
         'views/employee_report_views.xml',
+        'views/dwr_week_grid_views.xml',
         'views/support_staff_views.xml',
         'views/additional_manager_views.xml',
         'views/concerns_views.xml',
+        'views/dwr_concern_cluster_views.xml',
+        'views/report_archive_views.xml',
+        'views/dwr_purge_views.xml',
+        'views/dwr_perf_views.xml',
+        'views/dwr_audit_views.xml',
+        'views/dwr_monthly_summary_views.xml',
+        'views/dwr_hierarchy_views.xml',
         'views/menus.xml',
+
+        # Reports
+        'report/dwr_reports.xml',
+        'report/dwr_report_templates.xml',
         
         # Wizards
         'wizard/report_reject_wizard_views.xml',
         'wizard/concern_action_wizard_views.xml',
+        'wizard/escalation_simulator_views.xml',
     ],
     'demo': [],
     'assets': {
         'web.assets_backend': [
             'daily_work_report/static/src/css/daily_report.css',
+            'daily_work_report/static/src/js/daily_report.js',
+            'daily_work_report/static/src/js/pending_systray.js',
+            'daily_work_report/static/src/js/week_grid.js',
+            'daily_work_report/static/src/xml/daily_report.xml',
+            'daily_work_report/static/src/xml/week_grid.xml',
+        ],
+        'web.report_assets_common': [
+            'daily_work_report/static/src/css/print.css',
         ],
     },
     'application': True,
@@ -0,0 +1,174 @@
+"""Synthetic organisation generator for the Daily Work Report benchmarks.
+
+Builds a reproducible org chart (employees with users, a manager hierarchy of a given
+depth and a share of additional managers) and fills it with historical reports so that
+hot operations can be timed against realistic volumes.
+"""
+import random
+from datetime import timedelta
+
+from odoo import fields
+
+NO_TRACKING_CTX = {
+    'tracking_disable': True,
+    'mail_create_nolog': True,
+    'mail_create_nosubscribe': True,
+    'mail_notrack': True,
+    'no_reset_password': True,
+}
+
+
+class OrgGenerator:
+    """Generate a synthetic organisation in the database bound to ``env``.
+
+    :param employees: total number of employees (N)
+    :param depth: depth of the manager hierarchy (1 = everyone reports to the top manager)
+    :param days: number of past days with reports (M)
+    :param lines: number of lines per report (K)
+    :param additional_ratio: share of employees that get an additional reporting manager
+    :param seed: random seed, so two runs with the same parameters produce the same org
+    """
+
+    def __init__(self, env, employees=200, depth=4, days=20, lines=5, additional_ratio=0.1, seed=42):
+        self.env = env(context=dict(env.context, **NO_TRACKING_CTX))
+        self.employees = max(employees, depth)
+        self.depth = max(depth, 1)
+        self.days = days
+        self.lines = lines
+        self.additional_ratio = additional_ratio
+        self.rng = random.Random(seed)
+        self.levels = []
+        self.director = None
+
+    def generate(self):
+        """Create the whole organisation and return a summary dict"""
+        self._create_hierarchy()
+        additional = self._create_additional_managers()
+        reports = self._create_reports()
+        self.env.flush_all()
+        return {
+            'employees': sum(len(level) for level in self.levels),
+            'depth': len(self.levels),
+            'additional_managers': len(additional),
+            'reports': len(reports),
+            'lines': len(reports) * self.lines,
+        }
+
+    # ------------------------------------------------------------------
+    # Hierarchy
+    # ------------------------------------------------------------------
+
+    def _level_sizes(self):
+        """Split the employees into levels growing geometrically towards the leaves"""
+        if self.depth == 1:
+            return [self.employees]
+        ratio = max((self.employees / 2.0) ** (1.0 / (self.depth - 1)), 1.0)
+        sizes = [max(1, int(round(ratio ** i))) for i in range(self.depth)]
+        sizes[0] = 1
+        sizes[-1] = max(1, self.employees - sum(sizes[:-1]))
+        return sizes
+
+    def _create_users(self, count, level, groups):
+        vals = []
+        for i in range(count):
+            login = 'dwr_bench_l%s_%s' % (level, i)
+            vals.append({
+                'name': 'Bench L%s Employee %s' % (level, i),
+                'login': login,
+                'email': '%s@bench.example.com' % login,
+                'groups_id': [(6, 0, groups.ids)],
+            })
+        return self.env['res.users'].create(vals)
+
+    def _create_hierarchy(self):
+        ref = self.env.ref
+        user_group = ref('daily_work_report.group_user') | ref('base.group_user')
+        manager_group = ref('daily_work_report.group_hod') | user_group
+        director_group = ref('daily_work_report.group_directors') | user_group
+        department = self.env['hr.department'].create({'name': 'Benchmark Department'})
+
+        parents = self.env['hr.employee']
+        sizes = self._level_sizes()
+        for level, size in enumerate(sizes):
+            if level == 0:
+                groups = director_group
+            elif level < len(sizes) - 1:
+                groups = manager_group
+            else:
+                groups = user_group
+            users = self._create_users(size, level, groups)
+            employees = self.env['hr.employee'].create([{
+                'name': user.name,
+                'user_id': user.id,
+                'work_email': user.email,
+                'department_id': department.id,
+                'parent_id': parents[i % len(parents)].id if parents else False,
+            } for i, user in enumerate(users)])
+            self.levels.append(employees)
+            parents = employees
+        self.director = self.levels[0].user_id
+
+    def _create_additional_managers(self):
+        managers = self.env['hr.employee'].concat(*self.levels[:-1]) if len(self.levels) > 1 else self.levels[0]
+        vals = []
+        for employee in self.levels[-1]:
+            if self.rng.random() >= self.additional_ratio:
+                continue
+            candidates = managers - employee.parent_id - employee
+            if candidates:
+                vals.append({
+                    'employee_id': employee.id,
+                    'manager_id': self.rng.choice(candidates).id,
+                })
+        return self.env['employee.additional.manager'].create(vals)
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    def _line_vals(self, statuses):
+        completed = statuses[0]
+        vals = []
+        for i in range(self.lines):
+            status = completed if self.rng.random() < 0.7 else self.rng.choice(statuses)
+            vals.append((0, 0, {
+                'project_id': 'Project %s' % self.rng.randint(1, 20),
+                'task_id': 'Task %s' % self.rng.randint(1, 200),
+                'activity': 'Activity %s' % i,
+                'time_taken': '%02d:%02d' % (self.rng.randint(0, 2), self.rng.choice([0, 15, 30, 45])),
+                'current_status': status.id,
+                'to_work_on': 'Follow up' if status != completed else False,
+                'expected_close_date': fields.Date.today() + timedelta(days=7) if status != completed else False,
+            }))
+        return vals
+
+    def _create_reports(self):
+        statuses = self.env['job.status'].search([], order='sequence')
+        today = fields.Date.today()
+        now = fields.Datetime.now()
+        vals = []
+        for employee in self.env['hr.employee'].concat(*self.levels):
+            for offset in range(self.days, -1, -1):
+                day = today - timedelta(days=offset)
+                if offset == 0:
+                    state = 'draft'
+                elif offset <= 2:
+                    state = 'submitted'
+                else:
+                    state = self.rng.choice(['approved'] * 8 + ['submitted', 'draft'])
+                report_vals = {
+                    'name': employee.id,
+                    'department_id': employee.department_id.id,
+                    'reporting_manager_id': employee.parent_id.id,
+                    'prepared_by': employee.id,
+                    'date': day,
+                    'state': state,
+                    'report_ids': self._line_vals(statuses),
+                }
+                if state in ('submitted', 'approved'):
+                    report_vals['submitted_time'] = now - timedelta(days=offset, hours=-18)
+                if state == 'approved':
+                    report_vals['approved_by'] = employee.parent_id.id
+                    report_vals['approved_time'] = now - timedelta(days=offset - 1)
+                vals.append(report_vals)
+        return self.env['employee.report'].create(vals)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Daily Work Report performance benchmarks.
+
+Generates a synthetic organisation in a scratch database (inside a transaction that is
+rolled back at the end) and times the module's hot operations, recording wall time and
+SQL query counts to a JSON file so runs can be compared.
+
+Usage (the database must have ``daily_work_report`` installed)::
+
+    python3 benchmarks/run_benchmarks.py -d bench_db --employees 500 --depth 4 \\
+        --days 20 --lines 5 --output bench_output.json -- --addons-path=...
+
+Everything after ``--`` is passed to Odoo's own configuration parser. The ``run`` function
+can also be called from ``odoo-bin shell`` with an existing ``env``.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+_logger = logging.getLogger('daily_work_report.benchmarks')
+
+# Fields displayed by the employee.report list view
+LIST_SPECIFICATION = {
+    'name': {'fields': {'display_name': {}}},
+    'department_id': {'fields': {'display_name': {}}},
+    'reporting_manager_id': {'fields': {'display_name': {}}},
+    'summary': {},
+    'date': {},
+    'state': {},
+}
+
+# Fields read when opening the employee.report form
+FORM_SPECIFICATION = dict(LIST_SPECIFICATION, **{
+    'is_manager': {},
+    'is_director': {},
+    'is_hod': {},
+    'is_own_report': {},
+    'available_manager_ids': {},
+    'actual_work_hours': {},
+    'total_work_hours': {},
+    'report_ids': {'fields': {
+        'project_id': {}, 'task_id': {}, 'activity': {}, 'time_taken': {},
+        'current_status': {'fields': {'display_name': {}}},
+        'to_work_on': {}, 'expected_close_date': {},
+    }},
+})
+
+EXPORT_FIELDS = [
+    'name', 'department_id', 'reporting_manager_id', 'date', 'state', 'actual_work_hours',
+    'report_ids/project_id', 'report_ids/task_id', 'report_ids/time_taken', 'report_ids/current_status',
+]
+
+
+@contextmanager
+def _no_smtp():
+    """Never talk to a real mail server while benchmarking"""
+    from odoo.addons.base.models.ir_mail_server import IrMailServer
+    with patch.object(IrMailServer, 'send_email', lambda self, message, *args, **kwargs: message['Message-Id']):
+        yield
+
+
+def _measure(env, operation, repeat):
+    """Run ``operation(env)`` ``repeat`` times, each inside a rolled back savepoint"""
+    cr = env.cr
+    timings, queries, errors = [], [], []
+    size = 0
+    for _i in range(repeat):
+        env.flush_all()
+        env.invalidate_all()
+        cr.execute('SAVEPOINT dwr_benchmark')
+        start_count = cr.sql_log_count
+        start = time.perf_counter()
+        try:
+            size = operation(env) or 0
+            env.flush_all()
+        except Exception as e:
+            # Report failures instead of aborting the whole suite
+            errors.append('%s: %s' % (type(e).__name__, e))
+        timings.append((time.perf_counter() - start) * 1000.0)
+        queries.append(cr.sql_log_count - start_count)
+        cr.execute('ROLLBACK TO SAVEPOINT dwr_benchmark')
+        env.invalidate_all()
+        cr.precommit.clear()
+        cr.postcommit.clear()
+    result = {
+        'records': size,
+        'wall_ms_median': round(statistics.median(timings), 2),
+        'wall_ms_min': round(min(timings), 2),
+        'queries_median': int(statistics.median(queries)),
+        'queries_max': max(queries),
+    }
+    if errors:
+        result['error'] = errors[0]
+    return result
+
+
+# ----------------------------------------------------------------------
+# Operations
+# ----------------------------------------------------------------------
+
+def _middle_manager(generator):
+    level = generator.levels[1] if len(generator.levels) > 2 else generator.levels[0]
+    return level[0].user_id
+
+
+def op_manager_list_view(generator):
+    def run(env):
+        Report = env['employee.report'].with_user(_middle_manager(generator))
+        domain = ['&', ('state', '=', 'submitted'), '|',
+                  ('name.parent_id.user_id', '=', Report.env.uid),
+                  ('reporting_manager_id.user_id', '=', Report.env.uid)]
+        result = Report.web_search_read(domain, LIST_SPECIFICATION, limit=80)
+        return result['length']
+    return run
+
+
+def op_manager_form_load(generator):
+    def run(env):
+        manager = _middle_manager(generator)
+        Report = env['employee.report'].with_user(manager)
+        report = Report.search([('name.parent_id.user_id', '=', manager.id)], limit=1)
+        report.web_read(FORM_SPECIFICATION)
+        return len(report)
+    return run
+
+
+def op_submit(generator):
+    def run(env):
+        from odoo import fields
+        drafts = env['employee.report'].with_user(generator.director).search([
+            ('state', '=', 'draft'), ('date', '=', fields.Date.today()),
+        ])
+        drafts.action_submit()
+        return len(drafts)
+    return run
+
+
+def op_bulk_approve(generator):
+    def run(env):
+        submitted = env['employee.report'].with_user(generator.director).search([('state', '=', 'submitted')])
+        submitted.action_approve()
+        return len(submitted)
+    return run
+
+
+def op_escalation_cron(generator):
+    def run(env):
+        from odoo import fields
+        reports = env['employee.report'].search([('state', '=', 'submitted')])
+        past = fields.Datetime.now().replace(microsecond=0)
+        env['dwr.escalation'].sudo().create([{
+            'employee_report_id': report.id,
+            'scheduled_datetime': past,
+        } for report in reports])
+        env.flush_all()
+        env['dwr.escalation'].process_due_escalations()
+        return len(reports)
+    return run
+
+
+def op_grouped_analytics(generator):
+    def run(env):
+        Report = env['employee.report'].with_user(generator.director)
+        groups = Report.read_group([], ['total_work_minutes:sum'], ['department_id', 'date:month', 'state'], lazy=False)
+        lines = env['report'].with_user(generator.director).read_group(
+            [], ['current_status'], ['current_status'], lazy=False)
+        return len(groups) + len(lines)
+    return run
+
+
+def op_export(generator):
+    def run(env):
+        reports = env['employee.report'].with_user(generator.director).search([])
+        data = reports.export_data(EXPORT_FIELDS)
+        return len(data['datas'])
+    return run
+
+
+def op_anomaly_detection(generator):
+    def run(env):
+        from datetime import timedelta
+        from odoo import fields
+        stats = env['dwr.anomaly.detector']._detect_anomalies(fields.Date.today() - timedelta(days=365))
+        return stats['scored']
+    return run
+
+
+OPERATIONS = [
+    ('manager_list_view', op_manager_list_view),
+    ('manager_form_load', op_manager_form_load),
+    ('submit', op_submit),
+    ('bulk_approve', op_bulk_approve),
+    ('escalation_cron', op_escalation_cron),
+    ('grouped_analytics', op_grouped_analytics),
+    ('export', op_export),
+    ('anomaly_detection', op_anomaly_detection),
+]
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(env, employees=200, depth=4, days=20, lines=5, additional_ratio=0.1, repeat=3, seed=42,
+        operations=None):
+    """Generate the synthetic org in ``env`` and return the benchmark results as a dict.
+
+    The caller owns the transaction: roll it back afterwards to leave the database untouched.
+    """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from org_generator import OrgGenerator
+
+    generator = OrgGenerator(env, employees=employees, depth=depth, days=days, lines=lines,
+                             additional_ratio=additional_ratio, seed=seed)
+    start = time.perf_counter()
+    org = generator.generate()
+    org['generation_s'] = round(time.perf_counter() - start, 2)
+    _logger.info('Generated synthetic organisation: %s', org)
+
+    env.cr.execute('SHOW server_version')
+    server_version = env.cr.fetchone()[0]
+    results = {}
+    with _no_smtp():
+        for name, factory in OPERATIONS:
+            if operations and name not in operations:
+                continue
+            results[name] = _measure(env, factory(generator), repeat)
+            _logger.info('%-20s %s', name, results[name])
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'postgresql': server_version,
+        'parameters': {
+            'employees': employees, 'depth': depth, 'days': days, 'lines': lines,
+            'additional_ratio': additional_ratio, 'repeat': repeat, 'seed': seed,
+        },
+        'organisation': org,
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-d', '--database', required=True)
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--days', type=int, default=20)
+    parser.add_argument('--lines', type=int, default=5)
+    parser.add_argument('--additional-ratio', type=float, default=0.1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', nargs='*', choices=[name for name, _f in OPERATIONS])
+    parser.add_argument('--output', default='bench_output.json')
+    args, odoo_args = parser.parse_known_args()
+    if odoo_args[:1] == ['--']:
+        odoo_args = odoo_args[1:]
+
+    import odoo
+    from odoo.tools import config
+    config.parse_config(odoo_args + ['-d', args.database])
+    logging.basicConfig(level=logging.INFO)
+
+    registry = odoo.registry(args.database)
+    with registry.cursor() as cr:
+        env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+        try:
+            report = run(env, employees=args.employees, depth=args.depth, days=args.days, lines=args.lines,
+                         additional_ratio=args.additional_ratio, repeat=args.repeat, seed=args.seed,
+                         operations=args.only)
+        finally:
+            cr.rollback()
+
+    with open(args.output, 'w') as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+    print(json.dumps(report['results'], indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Concurrent submit load test for the Daily Work Report module.
+
+Simulates the end-of-day rush: N worker threads, each with its own database cursor, submit
+today's draft reports of a synthetic organisation as their employees, committing after
+every submit. Concurrency errors (serialization failures, deadlocks, lock timeouts) are
+retried with a jittered backoff, as Odoo's RPC layer does. For every concurrency level the
+harness reports throughput, latency percentiles and retry counts, so the scaling of the
+submit path can be compared between revisions. Each level also records its scaling efficiency,
+its throughput divided by the lowest level's throughput times the concurrency ratio (1.0 is
+linear); ``--min-scaling`` makes the run fail below a given efficiency.
+
+Usage (run against a scratch copy of a database with ``daily_work_report`` installed)::
+
+    python3 benchmarks/submit_load.py -d bench_db --employees 500 --concurrency 1 5 10 20 \\
+        --output submit_load.json --min-scaling 0.7 -- --addons-path=...
+
+The synthetic organisation is committed on the first run and reused afterwards; before each
+concurrency level today's benchmark reports are reset to draft.
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import random
+import statistics
+import sys
+import threading
+import time
+
+_logger = logging.getLogger('daily_work_report.benchmarks.submit_load')
+
+MAX_RETRIES = 5
+BENCH_LOGIN_PATTERN = 'dwr_bench_%'
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return round(ordered[index], 2)
+
+
+def prepare(registry, employees, depth, seed):
+    """Create the synthetic organisation once (committed), and return the leaf employees'
+    ``(report_id, user_id)`` pairs of today's reports"""
+    import odoo
+    from odoo import fields
+
+    with registry.cursor() as cr:
+        env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+        if not env['res.users'].search_count([('login', '=like', BENCH_LOGIN_PATTERN)]):
+            sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+            from org_generator import OrgGenerator
+            OrgGenerator(env, employees=employees, depth=depth, days=0, lines=5, seed=seed).generate()
+            cr.commit()
+            _logger.info('Created synthetic organisation')
+        reports = env['employee.report'].search([
+            ('date', '=', fields.Date.today()),
+            ('name.user_id.login', '=like', BENCH_LOGIN_PATTERN),
+            ('name.parent_id', '!=', False),
+        ])
+        return [(report.id, report.name.user_id.id) for report in reports]
+
+
+def reset(registry, report_ids):
+    """Put today's benchmark reports back to draft and drop what their submit queued"""
+    import odoo
+
+    with registry.cursor() as cr:
+        env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {'tracking_disable': True})
+        reports = env['employee.report'].browse(report_ids)
+        env['dwr.escalation'].search([('employee_report_id', 'in', report_ids)]).unlink()
+        env['mail.mail'].search([('model', '=', 'employee.report'), ('res_id', 'in', report_ids)]).unlink()
+        reports.write({'state': 'draft', 'submitted_time': False})
+
+
+def _submit_one(registry, report_id, user_id):
+    """Submit one report in its own transaction; return the number of retries it needed"""
+    import odoo
+    from psycopg2 import OperationalError
+    from odoo.service.model import PG_CONCURRENCY_ERRORS_TO_RETRY
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            with registry.cursor() as cr:
+                env = odoo.api.Environment(cr, user_id, {})
+                env['employee.report'].browse(report_id).action_submit()
+            return attempt
+        except OperationalError as e:
+            if e.pgcode not in PG_CONCURRENCY_ERRORS_TO_RETRY or attempt == MAX_RETRIES:
+                raise
+            time.sleep(random.uniform(0.0, 0.1 * 2 ** attempt))
+    return MAX_RETRIES
+
+
+def run_level(registry, work, concurrency):
+    """Submit all of ``work`` with ``concurrency`` threads and return the measurements"""
+    tasks = queue.Queue()
+    for item in work:
+        tasks.put(item)
+    latencies, retries, errors = [], [], []
+    lock = threading.Lock()
+
+    def worker():
+        threading.current_thread().dbname = registry.db_name
+        while True:
+            try:
+                report_id, user_id = tasks.get_nowait()
+            except queue.Empty:
+                return
+            start = time.perf_counter()
+            try:
+                attempts = _submit_one(registry, report_id, user_id)
+                error = None
+            except Exception as e:
+                attempts, error = MAX_RETRIES, '%s: %s' % (type(e).__name__, e)
+            elapsed = (time.perf_counter() - start) * 1000.0
+            with lock:
+                latencies.append(elapsed)
+                retries.append(attempts)
+                if error:
+                    errors.append(error)
+
+    threads = [threading.Thread(target=worker, name='dwr-submit-%s' % i) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - start
+    result = {
+        'concurrency': concurrency,
+        'submits': len(latencies) - len(errors),
+        'failed': len(errors),
+        'duration_s': round(duration, 2),
+        'throughput_per_s': round((len(latencies) - len(errors)) / duration, 2) if duration else None,
+        'latency_ms_p50': _percentile(latencies, 50),
+        'latency_ms_p95': _percentile(latencies, 95),
+        'latency_ms_p99': _percentile(latencies, 99),
+        'latency_ms_mean': round(statistics.mean(latencies), 2) if latencies else None,
+        'retries': sum(retries),
+        'submits_retried': sum(1 for r in retries if r),
+    }
+    if errors:
+        result['error'] = errors[0]
+    return result
+
+
+def add_scaling(levels):
+    """Record on each level its throughput relative to linear scaling from the lowest level"""
+    base = min(levels, key=lambda level: level['concurrency'])
+    for level in levels:
+        if base['throughput_per_s'] and level['throughput_per_s'] is not None:
+            linear = base['throughput_per_s'] * level['concurrency'] / base['concurrency']
+            level['scaling'] = round(level['throughput_per_s'] / linear, 2)
+        else:
+            level['scaling'] = None
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-d', '--database', required=True)
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 5, 10, 20])
+    parser.add_argument('--output', default='submit_load.json')
+    parser.add_argument('--min-scaling', type=float, default=None,
+                        help="fail when a level's scaling efficiency (1.0 is linear) is below this")
+    args, odoo_args = parser.parse_known_args()
+    if odoo_args[:1] == ['--']:
+        odoo_args = odoo_args[1:]
+
+    import odoo
+    from odoo.tools import config
+    # Every worker thread holds its own connection
+    config.parse_config(odoo_args + ['-d', args.database, '--db_maxconn', str(max(args.concurrency) + 4)])
+    logging.basicConfig(level=logging.INFO)
+
+    registry = odoo.registry(args.database)
+    work = prepare(registry, args.employees, args.depth, args.seed)
+    if not work:
+        print('No benchmark reports found for today', file=sys.stderr)
+        return 1
+    levels = []
+    for concurrency in args.concurrency:
+        reset(registry, [report_id for report_id, _uid in work])
+        levels.append(run_level(registry, work, concurrency))
+        _logger.info('%s', levels[-1])
+    reset(registry, [report_id for report_id, _uid in work])
+    add_scaling(levels)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'parameters': {'employees': args.employees, 'depth': args.depth, 'seed': args.seed},
+        'reports': len(work),
+        'levels': levels,
+    }
+    with open(args.output, 'w') as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+    print(json.dumps(levels, indent=2, sort_keys=True))
+    below = [
+        level['concurrency'] for level in levels
+        if args.min_scaling is not None and (level['scaling'] is None or level['scaling'] < args.min_scaling)
+    ]
+    if below:
+        print('Scaling below %s at concurrency %s' % (args.min_scaling, below), file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+import base64
+import gzip
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from werkzeug.exceptions import BadRequest, NotFound
+
+from odoo import http
+from odoo.exceptions import AccessDenied, AccessError, UserError, ValidationError
+from odoo.http import request
+
+# Resources exposed by the change feed: url name -> (model, exported fields)
+CHANGE_FEED_RESOURCES = {
+    'employee_reports': ('employee.report', [
+        'name', 'department_id', 'branch_id', 'reporting_manager_id', 'date', 'state',
+        'prepared_by', 'approved_by', 'submitted_time', 'approved_time', 'total_work_hours',
+        'actual_work_hours', 'total_work_minutes', 'summary', 'student_concerns',
+        'employee_concerns', 'other_concerns', 'has_concerns', 'reject_reason', 'write_date',
+    ]),
+    'report_lines': ('report', [
+        'employee_id', 'sequence', 'project_id', 'task_id', 'activity', 'time_taken',
+        'current_status', 'to_work_on', 'expected_close_date', 'remarks_if_any', 'write_date',
+    ]),
+    'support_staff': ('support.staff', [
+        'name', 'department_id', 'branch_id', 'date', 'start_time', 'end_time', 'state',
+        'prepared_by', 'approved_by', 'summary1', 'summary2', 'summary3', 'write_date',
+    ]),
+    'support_work_lines': ('support.work.line', [
+        'support_staff_id', 'work_type', 'name', 'time_taken', 'current_status', 'write_date',
+    ]),
+}
+
+DEFAULT_PAGE_SIZE = 500
+# Seconds a change waits before the feed serves it: write_date is the start of the writing
+# transaction, which may commit after rows with a newer write_date have been served
+DEFAULT_FEED_MARGIN = 60
+MAX_PAGE_SIZE = 5000
+# Responses smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+# Upper bound of reports accepted by one batch ingest call
+MAX_INGEST_REPORTS = 500
+
+
+class DWRApiController(http.Controller):
+    """Shared helpers of the Daily Work Report HTTP API.
+
+    Clients authenticate either with a regular session cookie or with an API key sent as
+    ``Authorization: Bearer <key>``.
+    """
+
+    def _authenticate(self):
+        header = request.httprequest.headers.get('Authorization', '')
+        if header.lower().startswith('bearer '):
+            try:
+                uid = request.env['res.users.apikeys'].sudo()._check_credentials(
+                    scope='rpc', key=header[7:].strip())
+            except AccessDenied:
+                uid = False
+            if uid:
+                request.update_env(user=uid)
+                return
+        if not request.env.user or request.env.user._is_public():
+            raise AccessDenied()
+
+    def _json_response(self, payload, status=200):
+        """JSON response with ETag/If-None-Match support and gzip when the client accepts it"""
+        body = json.dumps(payload, default=str, separators=(',', ':')).encode()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        headers = [('ETag', etag), ('Cache-Control', 'private, no-cache'), ('Vary', 'Accept-Encoding')]
+        if etag in request.httprequest.headers.get('If-None-Match', ''):
+            return request.make_response(b'', headers=headers, status=304)
+        headers.append(('Content-Type', 'application/json'))
+        accept_encoding = request.httprequest.headers.get('Accept-Encoding', '')
+        if 'gzip' in accept_encoding and len(body) >= GZIP_MIN_SIZE:
+            body = gzip.compress(body, compresslevel=5)
+            headers.append(('Content-Encoding', 'gzip'))
+        return request.make_response(body, headers=headers, status=status)
+
+    def _error_response(self, status, message):
+        return request.make_response(
+            json.dumps({'error': message}), headers=[('Content-Type', 'application/json')], status=status)
+
+
+class DWRChangeFeedController(DWRApiController):
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        """Cursor is an opaque base64 JSON of the last (write_date, id) and tombstone id seen"""
+        if not cursor:
+            return None, 0, 0
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            write_date = datetime.fromisoformat(data['w']) if data.get('w') else None
+            return write_date, int(data.get('i', 0)), int(data.get('d', 0))
+        except (ValueError, KeyError, TypeError):
+            raise BadRequest('Invalid cursor')
+
+    @staticmethod
+    def _encode_cursor(write_date, record_id, tombstone_id):
+        # Full precision: the rows written by one transaction share the same microsecond
+        data = {'w': write_date.isoformat() if write_date else None, 'i': record_id, 'd': tombstone_id}
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    @http.route('/dwr/api/changes/<string:resource>', type='http', auth='public', methods=['GET'], csrf=False)
+    def changes(self, resource, cursor=None, limit=None, **kwargs):
+        """Return records of ``resource`` created or modified after ``cursor``, plus the ids of
+        records deleted since then, ordered by (write_date, id).
+
+        The response carries ``next_cursor`` to pass on the next call and ``has_more`` when
+        another page is immediately available. Changes younger than
+        ``daily_work_report.change_feed_margin`` seconds are left for a later call, so that a
+        transaction committing late is not skipped.
+        """
+        if resource not in CHANGE_FEED_RESOURCES:
+            raise NotFound()
+        try:
+            self._authenticate()
+        except AccessDenied:
+            return self._error_response(401, 'Authentication required')
+
+        model_name, field_names = CHANGE_FEED_RESOURCES[resource]
+        try:
+            request.env[model_name].check_access_rights('read')
+        except AccessError:
+            return self._error_response(403, 'Access denied')
+        try:
+            limit = min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        except ValueError:
+            raise BadRequest('Invalid limit')
+        write_date, last_id, last_tombstone = self._decode_cursor(cursor)
+        margin = int(request.env['ir.config_parameter'].sudo().get_param(
+            'daily_work_report.change_feed_margin', DEFAULT_FEED_MARGIN))
+        cutoff = request.env.cr.now() - timedelta(seconds=margin)
+
+        domain = [('write_date', '<', cutoff)]
+        if write_date:
+            domain += ['|', ('write_date', '>', write_date),
+                       '&', ('write_date', '=', write_date), ('id', '>', last_id)]
+        # A lagging replica only returns fewer changes; the cursor resumes from what was returned
+        with request.env['dwr.replica']._read_env('change_feed') as env:
+            records = env[model_name].search(domain, order='write_date, id', limit=limit + 1)
+            has_more = len(records) > limit
+            records = records[:limit]
+            rows = records.read(field_names, load=None)
+            if records:
+                last = records[-1]
+                write_date, last_id = last.write_date, last.id
+
+            tombstones = env['dwr.deletion.log'].sudo().search_read(
+                [('res_model', '=', model_name), ('id', '>', last_tombstone), ('deleted_at', '<', cutoff)],
+                ['res_id', 'reason', 'deleted_at'], order='id', limit=limit + 1)
+        has_more = has_more or len(tombstones) > limit
+        tombstones = tombstones[:limit]
+        if tombstones:
+            last_tombstone = tombstones[-1]['id']
+
+        return self._json_response({
+            'resource': resource,
+            'records': rows,
+            'deleted': [{'id': t['res_id'], 'reason': t['reason'], 'deleted_at': t['deleted_at']} for t in tombstones],
+            'next_cursor': self._encode_cursor(write_date, last_id, last_tombstone),
+            'has_more': has_more,
+        })
+
+
+class _PayloadRejected(Exception):
+    """Rolls back the ingest savepoint and carries the validation errors of the payload"""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class DWRIngestController(DWRApiController):
+
+    @http.route('/dwr/api/reports/batch', type='http', auth='public', methods=['POST'], csrf=False)
+    def ingest(self, **kwargs):
+        """Create many reports with their lines from one JSON payload::
+
+            {"idempotency_key": "...", "submit": true, "reports": [{"date": "2024-05-02", "lines": [...]}]}
+
+        The whole payload is validated first and every error is returned at once (422). Reports
+        are created, and submitted when ``submit`` is set, in a single transaction. A request
+        repeated with the same idempotency key (body field or ``Idempotency-Key`` header) gets
+        the original response back instead of creating the reports again.
+        """
+        try:
+            self._authenticate()
+        except AccessDenied:
+            return self._error_response(401, 'Authentication required')
+        try:
+            payload = json.loads(request.httprequest.get_data() or b'{}')
+        except ValueError:
+            return self._error_response(400, 'Invalid JSON body')
+        if not isinstance(payload, dict):
+            return self._error_response(400, 'JSON object expected')
+        reports_payload = payload.get('reports')
+        if isinstance(reports_payload, list) and len(reports_payload) > MAX_INGEST_REPORTS:
+            return self._error_response(413, 'At most %s reports per call' % MAX_INGEST_REPORTS)
+        key = payload.get('idempotency_key') or request.httprequest.headers.get('Idempotency-Key')
+        if not key:
+            return self._error_response(400, 'An idempotency key is required')
+
+        env = request.env
+        EmployeeReport = env['employee.report']
+        try:
+            with env.cr.savepoint():
+                # Claimed inside the savepoint: a rejected payload releases the key so the
+                # client can correct it and retry with the same one
+                ingest_request, created = env['dwr.ingest.request'].sudo()._claim(str(key)[:255])
+                if not created:
+                    if ingest_request.state != 'done':
+                        return self._error_response(409, 'A request with this idempotency key is in progress')
+                    return self._json_response(dict(json.loads(ingest_request.response), replayed=True))
+
+                vals_list, errors = EmployeeReport._ingest_prepare_vals(reports_payload)
+                if errors:
+                    raise _PayloadRejected(errors)
+                reports = EmployeeReport.create(vals_list)
+                if payload.get('submit'):
+                    reports.action_submit()
+                env.flush_all()
+                result = {
+                    'idempotency_key': ingest_request.key,
+                    'reports': [
+                        {'id': report.id, 'employee_id': report.name.id, 'date': report.date,
+                         'state': report.state, 'line_ids': report.report_ids.ids}
+                        for report in reports
+                    ],
+                }
+                ingest_request.write({
+                    'state': 'done',
+                    'response': json.dumps(result, default=str),
+                    'report_count': len(reports),
+                })
+        except _PayloadRejected as e:
+            return self._json_response({'errors': e.errors}, status=422)
+        except (ValidationError, UserError) as e:
+            return self._json_response({'errors': [{'path': 'reports', 'error': e.args[0]}]}, status=422)
+        except AccessError as e:
+            return self._error_response(403, e.args[0])
+        return self._json_response(dict(result, replayed=False), status=201)
+
+
+class DWRHierarchyController(DWRApiController):
+
+    @http.route('/dwr/api/hierarchy', type='http', auth='public', methods=['GET'], csrf=False)
+    def hierarchy(self, **kwargs):
+        """Pending, overdue and escalated report counts for every manager of the organisation,
+        as a tree following the reporting lines"""
+        try:
+            self._authenticate()
+        except AccessDenied:
+            return self._error_response(401, 'Authentication required')
+        try:
+            tree = request.env['dwr.hierarchy.rollup'].get_rollup_tree()
+        except AccessError:
+            return self._error_response(403, 'Access denied')
+        return self._json_response({'managers': tree})
@@ -1,8 +1,24 @@
+from . import dwr_perf
+from . import dwr_deletion_log
+from . import dwr_replica
+from . import dwr_org_snapshot
+from . import dwr_week_grid
+from . import dwr_audit
+from . import dwr_monthly_summary
 from . import job_status
 from . import report
 from . import employee_report
+from . import report_approval
 from . import additional_manager
 from . import support_staff
 from . import concern_action
+from . import dwr_concern_cluster
 from . import support_work_line
-from . import dwr_escalation
\ No newline at end of file
+from . import dwr_escalation
+from . import report_archive
+from . import dwr_purge
+from . import dwr_ingest
+from . import dwr_hierarchy
+from . import dwr_pending_counter
+from . import dwr_anomaly
+from . import dwr_snapshot
\ No newline at end of file
@@ -1,4 +1,4 @@
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class EmployeeAdditionalManager(models.Model):
@@ -10,12 +10,28 @@ class EmployeeAdditionalManager(models.Model):
     manager_id = fields.Many2one('hr.employee', string='Manager', required=True)
     active = fields.Boolean(string='Active', default=True)
     notes = fields.Text(string='Notes')
+    project_names = fields.Char(string='Projects',
+                                help="Comma-separated projects this manager approves when the approval policy "
+                                     "is 'project'; lines of other projects go to the reporting manager.")
 
     _sql_constraints = [
         ('unique_employee_manager', 'unique(employee_id, manager_id)', 
          'An employee cannot have the same additional manager twice!')
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env['dwr.pending.counter']._invalidate()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env['dwr.pending.counter']._invalidate()
+        return super().write(vals)
+
+    def unlink(self):
+        self.env['dwr.pending.counter']._invalidate()
+        return super().unlink()
+
     def name_get(self):
         result = []
         for record in self:
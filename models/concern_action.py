@@ -1,4 +1,4 @@
-from odoo import fields, models
+from odoo import api, fields, models, tools
 
 
 class ConcernAction(models.Model):
@@ -9,6 +9,8 @@ class ConcernAction(models.Model):
 
     name = fields.Char(string='Title', required=True, tracking=True)
     employee_report_id = fields.Many2one('employee.report', string='Related Report')
+    archive_id = fields.Many2one('employee.report.archive', string='Archived Report', readonly=True,
+                                 ondelete='set null', help="The related report once it has been archived")
     employee_id = fields.Many2one('hr.employee', string='Employee', required=True)
     concern_type = fields.Selection([
         ('student', 'Student Concern'),
@@ -36,7 +38,55 @@ class ConcernAction(models.Model):
     assigned_to = fields.Many2one('hr.employee', string='Assigned To')
     action_date = fields.Date(string='Action Date')
     resolved_date = fields.Date(string='Resolved Date')
+    cluster_id = fields.Many2one('dwr.concern.cluster', string='Concern Cluster', ondelete='set null',
+                                 index=True, readonly=True)
+    cluster_member_ids = fields.One2many(related='cluster_id.member_ids', string='Related Reports')
+    cluster_member_count = fields.Integer(related='cluster_id.member_count', string='Related Report Count')
+
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        # Default list order
+        tools.create_index(cr, 'concern_action_create_date_id_idx', self._table, ['create_date', 'id'])
+        # Status filters in list order
+        tools.create_index(cr, 'concern_action_state_create_date_idx', self._table, ['state', 'create_date'])
+        # "High Priority"
+        tools.create_index(cr, 'concern_action_priority_state_idx', self._table, ['priority', 'state'])
+        # "Assigned to Me"
+        tools.create_index(cr, 'concern_action_assigned_to_state_idx', self._table, ['assigned_to', 'state'])
+        # Concerns of an employee and of a report
+        tools.create_index(cr, 'concern_action_employee_id_state_idx', self._table, ['employee_id', 'state'])
+        tools.create_index(cr, 'concern_action_employee_report_id_idx', self._table, ['employee_report_id'])
+        # Changes since the watermark of the analytics snapshot
+        tools.create_index(cr, 'concern_action_write_date_idx', self._table, ['write_date'])
     
+    @api.model_create_multi
+    def create(self, vals_list):
+        # A concern raised from a report joins the cluster of that report's concern
+        keys = [
+            (vals['employee_report_id'], vals['concern_type'])
+            for vals in vals_list
+            if not vals.get('cluster_id') and vals.get('employee_report_id') and vals.get('concern_type')
+        ]
+        if keys:
+            members = self.env['dwr.concern.cluster.member'].sudo().search([
+                ('employee_report_id', 'in', [key[0] for key in keys]),
+            ])
+            clusters = {(member.employee_report_id.id, member.concern_type): member.cluster_id for member in members}
+            for vals in vals_list:
+                cluster = clusters.get((vals.get('employee_report_id'), vals.get('concern_type')))
+                if cluster and not vals.get('cluster_id'):
+                    vals['cluster_id'] = cluster.id
+        records = super().create(vals_list)
+        for record in records.filtered(lambda r: r.cluster_id and not r.cluster_id.concern_action_id):
+            record.cluster_id.sudo().concern_action_id = record
+        return records
+
+    def unlink(self):
+        # The concern leaves the snapshot of the day it was raised
+        self.env['dwr.snapshot.stale.day'].sudo()._log_concern_days(self)
+        return super().unlink()
+
     def action_start_progress(self):
         self.state = 'in_progress'
     
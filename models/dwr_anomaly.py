@@ -0,0 +1,204 @@
+import logging
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from .dwr_perf import perf_tracked
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_logger = logging.getLogger(__name__)
+
+# Submitted and approved reports since %(date_from)s, sorted by employee and date: logged and
+# expected minutes, a fingerprint of the distinct project/task pairs of the lines, and the
+# scores stored by the previous run
+_LOAD_SQL = """
+    WITH window_reports AS (
+        SELECT r.id, r.name, r.date, r.total_work_minutes, r.total_work_hours,
+               r.hours_deviation, r.hours_streak, r.lines_repeat_streak,
+               r.anomaly_under_hours, r.anomaly_fixed_hours, r.anomaly_repeated_lines
+          FROM employee_report r
+         WHERE r.date >= %(date_from)s AND r.name IS NOT NULL AND r.state IN ('submitted', 'approved')
+    ),
+    fingerprints AS (
+        SELECT k.report_id,
+               ('x' || substr(md5(string_agg(k.key, ',' ORDER BY k.key)), 1, 15))::bit(60)::bigint AS fingerprint
+          FROM (SELECT DISTINCT l.employee_id AS report_id,
+                       lower(trim(l.project_id)) || '/' || lower(trim(coalesce(l.task_id, ''))) AS key
+                  FROM report l
+                  JOIN window_reports w ON w.id = l.employee_id) k
+      GROUP BY k.report_id
+    )
+    SELECT w.id, w.name,
+           coalesce(w.total_work_minutes, 0),
+           CASE WHEN w.total_work_hours ~ '^[0-9]+:[0-9]{2}$'
+                THEN split_part(w.total_work_hours, ':', 1)::int * 60 + split_part(w.total_work_hours, ':', 2)::int
+                ELSE 480 END,
+           coalesce(f.fingerprint, 0),
+           coalesce(w.hours_deviation, 0)::float8,
+           coalesce(w.hours_streak, 0),
+           coalesce(w.lines_repeat_streak, 0),
+           coalesce(w.anomaly_under_hours, FALSE),
+           coalesce(w.anomaly_fixed_hours, FALSE),
+           coalesce(w.anomaly_repeated_lines, FALSE)
+      FROM window_reports w
+ LEFT JOIN fingerprints f ON f.report_id = w.id
+  ORDER BY w.name, w.date, w.id
+"""
+
+_WRITE_SQL = """
+    UPDATE employee_report r
+       SET hours_deviation = v.hours_deviation,
+           hours_streak = v.hours_streak,
+           lines_repeat_streak = v.lines_repeat_streak,
+           anomaly_under_hours = v.anomaly_under_hours,
+           anomaly_fixed_hours = v.anomaly_fixed_hours,
+           anomaly_repeated_lines = v.anomaly_repeated_lines,
+           write_date = (now() at time zone 'UTC')
+      FROM unnest(%s::int[], %s::float8[], %s::int[], %s::int[], %s::bool[], %s::bool[], %s::bool[])
+           AS v(id, hours_deviation, hours_streak, lines_repeat_streak,
+                anomaly_under_hours, anomaly_fixed_hours, anomaly_repeated_lines)
+     WHERE r.id = v.id
+"""
+
+# Scores and flags of the reports no longer scored: rejected or reset to draft, or out of the window
+_CLEAR_SQL = """
+    UPDATE employee_report
+       SET hours_deviation = NULL,
+           hours_streak = NULL,
+           lines_repeat_streak = NULL,
+           anomaly_under_hours = FALSE,
+           anomaly_fixed_hours = FALSE,
+           anomaly_repeated_lines = FALSE,
+           write_date = (now() at time zone 'UTC')
+     WHERE (anomaly_under_hours OR anomaly_fixed_hours OR anomaly_repeated_lines
+            OR hours_deviation <> 0 OR hours_streak <> 0 OR lines_repeat_streak <> 0) IS TRUE
+       AND (date < %(date_from)s OR name IS NULL OR state IS NULL OR state NOT IN ('submitted', 'approved'))
+"""
+
+# Reports updated per statement
+WRITE_BATCH = 50000
+
+ANOMALY_FIELDS = [
+    'hours_deviation', 'hours_streak', 'lines_repeat_streak',
+    'anomaly_under_hours', 'anomaly_fixed_hours', 'anomaly_repeated_lines',
+]
+
+
+def _run_lengths(groups, values):
+    """Length of the run of equal consecutive ``values`` within the same group that each row
+    belongs to; rows are sorted by group"""
+    starts = np.ones(len(values), dtype=bool)
+    starts[1:] = (values[1:] != values[:-1]) | (groups[1:] != groups[:-1])
+    run_ids = np.cumsum(starts) - 1
+    return np.bincount(run_ids)[run_ids]
+
+
+def score_reports(employee_ids, minutes, expected, fingerprints):
+    """Scores of reports sorted by employee and date, computed over the whole arrays at once.
+
+    Returns the deviation of the logged minutes from the expected ones (percent), the length
+    of the run of reports with the same logged minutes and the length of the run of reports
+    with the same line fingerprint, per report.
+    """
+    deviation = np.round((minutes - expected) * 100.0 / np.maximum(expected, 1), 1)
+    hours_streak = np.where(minutes > 0, _run_lengths(employee_ids, minutes), 0)
+    lines_streak = np.where(fingerprints != 0, _run_lengths(employee_ids, fingerprints), 0)
+    return deviation, hours_streak, lines_streak
+
+
+class DWRAnomalyDetector(models.AbstractModel):
+    """Batch detection of suspicious logging patterns in the daily work reports.
+
+    The reports of the window are loaded with a single query (on the read replica when one is
+    available) into NumPy arrays and scored for the whole organisation at once; the scores and flags are stored on ``employee.report``
+    (only for the reports whose values changed) so managers can filter on them.
+    """
+    _name = 'dwr.anomaly.detector'
+    _description = 'DWR Anomaly Detection'
+
+    @api.model
+    @perf_tracked('dwr.anomaly.detector._cron_detect_anomalies')
+    def _cron_detect_anomalies(self):
+        """Score the reports of the last ``daily_work_report.anomaly_window_days`` days (default 365).
+
+        A report is flagged when it logs less than ``anomaly_under_ratio`` (default 0.75) of the
+        expected hours, when it belongs to a run of at least ``anomaly_streak_days`` (default 5)
+        reports with the same logged minutes, or to a run of at least ``anomaly_repeat_days``
+        (default 5) reports with the same project/task lines.
+        """
+        if np is None:
+            _logger.warning('DWR Anomalies: numpy is not installed, skipping anomaly detection')
+            return False
+        params = self.env['ir.config_parameter'].sudo()
+        window_days = int(params.get_param('daily_work_report.anomaly_window_days', 365))
+        self._detect_anomalies(
+            fields.Date.today() - timedelta(days=window_days),
+            under_ratio=float(params.get_param('daily_work_report.anomaly_under_ratio', 0.75)),
+            streak_days=int(params.get_param('daily_work_report.anomaly_streak_days', 5)),
+            repeat_days=int(params.get_param('daily_work_report.anomaly_repeat_days', 5)),
+        )
+        return True
+
+    @api.model
+    def _detect_anomalies(self, date_from, under_ratio=0.75, streak_days=5, repeat_days=5):
+        """Score and flag the reports dated from ``date_from`` and clear the scores of the
+        others; return the number of reports scored, flagged, updated and cleared and the
+        duration"""
+        start = time.perf_counter()
+        self.env['employee.report'].flush_model()
+        self.env['report'].flush_model()
+        with self.env['dwr.replica']._read_env('dwr.anomaly.detector._detect_anomalies') as env:
+            env.cr.execute(_LOAD_SQL, {'date_from': date_from})
+            rows = env.cr.fetchall()
+        scored = flagged = updated = 0
+        if rows:
+            scored, flagged, updated = self._score_rows(rows, under_ratio, streak_days, repeat_days)
+        # On the primary, after the writes: a report that left the scored set since the (replica)
+        # read is cleared too
+        self.env.cr.execute(_CLEAR_SQL, {'date_from': date_from})
+        cleared = self.env.cr.rowcount
+        if updated or cleared:
+            self.env['employee.report'].invalidate_model(ANOMALY_FIELDS)
+
+        stats = {
+            'scored': scored,
+            'flagged': flagged,
+            'updated': updated,
+            'cleared': cleared,
+            'duration_s': round(time.perf_counter() - start, 2),
+        }
+        _logger.info('DWR Anomalies: scored %(scored)s reports, %(flagged)s flagged, %(updated)s updated, '
+                     '%(cleared)s cleared in %(duration_s)ss', stats)
+        return stats
+
+    @api.model
+    def _score_rows(self, rows, under_ratio, streak_days, repeat_days):
+        """Score the rows of ``_LOAD_SQL`` and write the changed ones; return the number of
+        reports scored, flagged and updated"""
+        columns = list(zip(*rows))
+        report_ids = np.array(columns[0], dtype=np.int64)
+        employee_ids = np.array(columns[1], dtype=np.int64)
+        minutes = np.array(columns[2], dtype=np.int64)
+        expected = np.array(columns[3], dtype=np.int64)
+        fingerprints = np.array(columns[4], dtype=np.int64)
+        old = [np.array(column) for column in columns[5:]]
+
+        deviation, hours_streak, lines_streak = score_reports(employee_ids, minutes, expected, fingerprints)
+        under = minutes < expected * under_ratio
+        fixed = hours_streak >= streak_days
+        repeated = lines_streak >= repeat_days
+        new = [deviation, hours_streak, lines_streak, under, fixed, repeated]
+
+        changed = np.zeros(len(report_ids), dtype=bool)
+        for old_values, new_values in zip(old, new):
+            changed |= old_values != new_values
+        indices = np.flatnonzero(changed)
+        for offset in range(0, len(indices), WRITE_BATCH):
+            batch = indices[offset:offset + WRITE_BATCH]
+            self.env.cr.execute(_WRITE_SQL, [report_ids[batch].tolist()] + [values[batch].tolist() for values in new])
+        return len(report_ids), int((under | fixed | repeated).sum()), len(indices)
@@ -0,0 +1,39 @@
+from odoo import api, fields, models
+
+
+class DWRAuditLog(models.Model):
+    """Compact, append-only history of report state transitions.
+
+    Used instead of chatter tracking when ``daily_work_report.audit_mode`` is ``compact``: each
+    transition is one narrow row rather than a ``mail.message`` with its tracking values. Rows
+    are inserted with SQL only; nobody has write access through the ORM.
+    """
+    _name = 'dwr.audit.log'
+    _description = 'DWR Audit Log'
+    _order = 'id desc'
+    _log_access = False
+
+    res_model = fields.Char(string='Model', required=True, readonly=True, index=True)
+    res_id = fields.Integer(string='Record ID', required=True, readonly=True, index=True)
+    from_state = fields.Char(string='From', readonly=True)
+    to_state = fields.Char(string='To', readonly=True)
+    user_id = fields.Many2one('res.users', string='Actor', readonly=True)
+    reason = fields.Text(string='Reason', readonly=True)
+    date = fields.Datetime(string='Date', readonly=True)
+
+    @api.model
+    def _is_compact(self):
+        return self.env['ir.config_parameter'].sudo().get_param('daily_work_report.audit_mode') == 'compact'
+
+    @api.model
+    def _log_transitions(self, records, to_state, reason=None):
+        """Append one row per record of ``records`` whose state differs from ``to_state``
+        (called right before the new state is written)"""
+        changed = records.filtered(lambda r: r.state != to_state)
+        if not changed:
+            return
+        self.env.cr.execute("""
+            INSERT INTO dwr_audit_log (res_model, res_id, from_state, to_state, user_id, reason, date)
+            SELECT %s, t.res_id, t.from_state, %s, %s, %s, (now() at time zone 'UTC')
+              FROM unnest(%s, %s) AS t(res_id, from_state)
+        """, (changed._name, to_state, self.env.uid, reason or None, changed.ids, changed.mapped('state')))
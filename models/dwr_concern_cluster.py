@@ -0,0 +1,333 @@
+import logging
+import random
+import re
+import struct
+import zlib
+
+from markupsafe import Markup
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+from .dwr_perf import perf_tracked
+
+_logger = logging.getLogger(__name__)
+
+CONCERN_TYPES = [
+    ('student', 'Student Concern'),
+    ('employee', 'Employee Concern'),
+    ('other', 'Other Concern'),
+]
+# Report field holding the text of each concern type
+CONCERN_FIELDS = {
+    'student': 'student_concerns',
+    'employee': 'employee_concerns',
+    'other': 'other_concerns',
+}
+# Texts that only say there is nothing to report
+NON_CONCERNS = {
+    '', 'nil', 'none', 'na', 'n a', 'no', 'nothing', 'no concern', 'no concerns', 'not applicable',
+}
+
+# MinHash signature of NUM_PERM values cut into BANDS bands of NUM_PERM / BANDS rows: two concerns
+# whose Jaccard similarity is s share a band with probability 1 - (1 - s^4)^16, about 0.5 at
+# s = 0.5 and 0.99 at s = 0.8
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+# Fixed seed: signatures are stored and must stay comparable across processes and restarts
+_random = random.Random(0x5eed)
+_PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _i in range(NUM_PERM)]
+
+# Most candidate clusters compared per concern
+MAX_CANDIDATES = 50
+# Submitted reports indexed per run of the clustering cron
+INDEX_BATCH = 2000
+
+
+def normalize_concern(text):
+    """Lowercase words of ``text`` separated by single spaces, markup and punctuation removed"""
+    text = re.sub(r'<[^>]*>', ' ', text or '')
+    return ' '.join(re.findall(r'\w+', text.lower()))
+
+
+def minhash_signature(text):
+    """MinHash signature of the character shingles of a normalized text"""
+    shingles = {
+        zlib.crc32(text[i:i + SHINGLE_SIZE].encode())
+        for i in range(max(len(text) - SHINGLE_SIZE + 1, 1))
+    }
+    return [min(((a * h + b) % _PRIME) & _MASK for h in shingles) for a, b in _PERMUTATIONS]
+
+
+def band_keys(concern_type, signature):
+    """LSH bucket key (a signed 32-bit integer) of each band of ``signature``"""
+    keys = []
+    for band in range(BANDS):
+        values = signature[band * ROWS:(band + 1) * ROWS]
+        key = zlib.crc32(('%s:%s:%s' % (concern_type, band, ','.join(map(str, values)))).encode())
+        keys.append(key - (1 << 32) if key >= (1 << 31) else key)
+    return keys
+
+
+def pack_signature(signature):
+    return struct.pack('>%dI' % NUM_PERM, *signature).hex()
+
+
+def unpack_signature(value):
+    return list(struct.unpack('>%dI' % NUM_PERM, bytes.fromhex(value)))
+
+
+def estimate_similarity(signature, other):
+    """Estimated Jaccard similarity of the texts of two signatures"""
+    return sum(1 for a, b in zip(signature, other) if a == b) / NUM_PERM
+
+
+class DWRConcernCluster(models.Model):
+    """Group of near-duplicate concerns reported on daily work reports.
+
+    Concerns are indexed when their report is submitted: the MinHash signature of the
+    normalized text is cut into bands, and the clusters sharing a band with it (found through
+    ``dwr.concern.bucket``) are the only candidates it is compared with. It joins the most
+    similar one when the estimated similarity with that cluster's first concern reaches
+    ``daily_work_report.concern_similarity`` (default 0.5), else it starts a new cluster. Each
+    concern costs a couple of indexed lookups whatever the number of concerns already indexed.
+    """
+    _name = 'dwr.concern.cluster'
+    _description = 'DWR Concern Cluster'
+    _order = 'last_date desc, member_count desc, id desc'
+
+    name = fields.Char(string='Concern', required=True, readonly=True)
+    concern_type = fields.Selection(CONCERN_TYPES, string='Concern Type', required=True, readonly=True)
+    signature = fields.Char(string='Signature', required=True, readonly=True)
+    member_ids = fields.One2many('dwr.concern.cluster.member', 'cluster_id', string='Reported Concerns', readonly=True)
+    member_count = fields.Integer(string='Reports', readonly=True)
+    employee_count = fields.Integer(string='Employees', readonly=True)
+    first_date = fields.Date(string='First Reported', readonly=True)
+    last_date = fields.Date(string='Last Reported', readonly=True, index=True)
+    concern_action_id = fields.Many2one('concern.action', string='Concern Action', ondelete='set null', index=True)
+    action_state = fields.Selection(related='concern_action_id.state', string='Action Status', store=True)
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _index_reports(self, reports):
+        """(Re)index the concerns of ``reports``; unchanged concerns are skipped, edited ones
+        move to the cluster of their new text and cleared ones leave their cluster"""
+        threshold = float(self.env['ir.config_parameter'].sudo().get_param(
+            'daily_work_report.concern_similarity', 0.5))
+        Member = self.env['dwr.concern.cluster.member'].sudo()
+        members = {
+            (member.employee_report_id.id, member.concern_type): member
+            for member in Member.search([('employee_report_id', 'in', reports.ids)])
+        }
+        touched = self.browse()
+        for report in reports:
+            for concern_type, field in CONCERN_FIELDS.items():
+                text = (report[field] or '').strip()
+                member = members.get((report.id, concern_type))
+                if member and member.text == text:
+                    continue
+                if member:
+                    touched |= member.cluster_id
+                    member.unlink()
+                normalized = normalize_concern(text)
+                if normalized in NON_CONCERNS:
+                    continue
+                signature = minhash_signature(normalized)
+                keys = band_keys(concern_type, signature)
+                cluster, similarity = self._find_cluster(concern_type, signature, keys, threshold)
+                if not cluster:
+                    cluster = self.sudo().create({
+                        'name': text[:120],
+                        'concern_type': concern_type,
+                        'signature': pack_signature(signature),
+                    })
+                    similarity = 1.0
+                self._add_bucket_keys(cluster, keys)
+                Member.create({
+                    'cluster_id': cluster.id,
+                    'employee_report_id': report.id,
+                    'employee_id': report.name.id,
+                    'date': report.date,
+                    'concern_type': concern_type,
+                    'text': text,
+                    'similarity': similarity,
+                })
+                touched |= cluster
+        touched._update_stats()
+
+    @api.model
+    @perf_tracked('dwr.concern.cluster._cron_index_reports')
+    def _cron_index_reports(self):
+        """Index the concerns of the reports submitted since the previous run; submitting only
+        flags them, so that concurrent submits never update the shared cluster rows"""
+        Report = self.env['employee.report'].sudo()
+        reports = Report.search([
+            ('has_concerns', '=', True),
+            ('concerns_indexed', '=', False),
+            ('state', 'in', ['submitted', 'approved']),
+        ], order='id', limit=INDEX_BATCH)
+        if not reports:
+            return 0
+        self._index_reports(reports)
+        self.env.cr.execute("UPDATE employee_report SET concerns_indexed = TRUE WHERE id = ANY(%s)", (reports.ids,))
+        reports.invalidate_recordset(['concerns_indexed'])
+        _logger.info('DWR Concern Clusters: indexed %s reports', len(reports))
+        if len(reports) == INDEX_BATCH:
+            # More to index: run again right away
+            cron = self.env.ref('daily_work_report.ir_cron_dwr_index_concerns', raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
+        return len(reports)
+
+    @api.model
+    def _find_cluster(self, concern_type, signature, keys, threshold):
+        """Most similar cluster sharing a bucket with ``signature`` and its estimated
+        similarity, or an empty recordset when none reaches ``threshold``"""
+        self.env.cr.execute("""
+            SELECT cluster_id FROM dwr_concern_bucket
+             WHERE key = ANY(%s)
+          GROUP BY cluster_id
+          ORDER BY count(*) DESC, cluster_id DESC
+             LIMIT %s
+        """, (keys, MAX_CANDIDATES))
+        candidates = self.sudo().browse([row[0] for row in self.env.cr.fetchall()])
+        best, best_similarity = self.browse(), 0.0
+        for candidate in candidates:
+            if candidate.concern_type != concern_type:
+                continue
+            similarity = estimate_similarity(signature, unpack_signature(candidate.signature))
+            if similarity >= threshold and similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+        return best, best_similarity
+
+    @api.model
+    def _add_bucket_keys(self, cluster, keys):
+        """Make ``cluster`` a candidate for the concerns sharing one of ``keys``"""
+        self.env.cr.execute("""
+            INSERT INTO dwr_concern_bucket (key, cluster_id)
+                 SELECT unnest(%s::int[]), %s
+            ON CONFLICT DO NOTHING
+        """, (keys, cluster.id))
+
+    def _update_stats(self):
+        """Refresh the counts and dates of the clusters and drop those left without concerns"""
+        if not self:
+            return
+        self.env['dwr.concern.cluster.member'].flush_model()
+        self.env.cr.execute("""
+            UPDATE dwr_concern_cluster c
+               SET member_count = s.member_count,
+                   employee_count = s.employee_count,
+                   first_date = s.first_date,
+                   last_date = s.last_date
+              FROM (SELECT cluster_id, count(*) AS member_count, count(DISTINCT employee_id) AS employee_count,
+                           min(date) AS first_date, max(date) AS last_date
+                      FROM dwr_concern_cluster_member
+                     WHERE cluster_id = ANY(%s)
+                  GROUP BY cluster_id) s
+             WHERE c.id = s.cluster_id
+        """, (self.ids,))
+        self.invalidate_recordset(['member_ids', 'member_count', 'employee_count', 'first_date', 'last_date'])
+        empty = self.sudo().exists().filtered(lambda cluster: not cluster.member_ids)
+        if empty:
+            # No longer a candidate for new concerns; its concern action is released by the unlink
+            self.env.cr.execute("DELETE FROM dwr_concern_bucket WHERE cluster_id = ANY(%s)", (empty.ids,))
+            empty.unlink()
+
+    # ------------------------------------------------------------------
+    # Triage
+    # ------------------------------------------------------------------
+
+    def action_create_concern_action(self):
+        """Create the concern action of the cluster, linked to every report of the cluster"""
+        self.ensure_one()
+        if self.concern_action_id:
+            raise UserError(_("This concern already has an action."))
+        latest = self.member_ids.sorted(lambda m: (m.date or fields.Date.today(), m.id))[-1:]
+        if not latest:
+            raise UserError(_("This cluster has no reported concern left."))
+        items = Markup().join(
+            Markup("<li>%s, %s: %s</li>") % (member.employee_id.name, member.date or '', member.text)
+            for member in self.member_ids.sorted(lambda m: (m.date or fields.Date.today(), m.id))
+        )
+        concern_action = self.env['concern.action'].create({
+            'name': self.name[:80],
+            'cluster_id': self.id,
+            'employee_report_id': latest.employee_report_id.id,
+            'employee_id': latest.employee_id.id,
+            'concern_type': self.concern_type,
+            'description': Markup("<p><strong>%s</strong></p><ul>%s</ul>") % (
+                _("Reported %s times by %s employees:", self.member_count, self.employee_count), items),
+            'action_date': fields.Date.today(),
+        })
+        # Linked to the cluster by the creation of the action
+        return concern_action.cluster_id.action_open_concern_action()
+
+    def action_open_concern_action(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Concern Action'),
+            'res_model': 'concern.action',
+            'res_id': self.concern_action_id.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
+    def action_open_reports(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': self.name,
+            'res_model': 'employee.report',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', self.member_ids.employee_report_id.ids)],
+        }
+
+
+class DWRConcernClusterMember(models.Model):
+    """One concern of a report, as indexed in its cluster"""
+    _name = 'dwr.concern.cluster.member'
+    _description = 'DWR Concern Cluster Member'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    cluster_id = fields.Many2one('dwr.concern.cluster', string='Cluster', required=True, ondelete='cascade',
+                                 index=True)
+    # An archived report keeps its concerns in their clusters through its archive row
+    employee_report_id = fields.Many2one('employee.report', string='Report', ondelete='cascade')
+    archive_id = fields.Many2one('employee.report.archive', string='Archived Report', ondelete='cascade',
+                                 index='btree_not_null')
+    employee_id = fields.Many2one('hr.employee', string='Employee')
+    date = fields.Date(string='Date')
+    concern_type = fields.Selection(CONCERN_TYPES, string='Concern Type', required=True)
+    text = fields.Text(string='Concern')
+    similarity = fields.Float(string='Similarity', digits=(16, 2))
+
+    _sql_constraints = [
+        ('report_type_uniq', 'unique(employee_report_id, concern_type)',
+         'A concern of a report belongs to a single cluster.'),
+    ]
+
+
+class DWRConcernBucket(models.Model):
+    """LSH bucket: the clusters having a concern with a given band of MinHash values"""
+    _name = 'dwr.concern.bucket'
+    _description = 'DWR Concern LSH Bucket'
+    _log_access = False
+
+    key = fields.Integer(string='Band Key', required=True)
+    cluster_id = fields.Many2one('dwr.concern.cluster', string='Cluster', required=True, ondelete='cascade',
+                                 index=True)
+
+    # Also the index of the lookups by key
+    _sql_constraints = [
+        ('key_cluster_uniq', 'unique(key, cluster_id)', 'A cluster is listed once per bucket.'),
+    ]
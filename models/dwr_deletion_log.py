@@ -0,0 +1,67 @@
+from odoo import api, fields, models, tools
+
+
+class DWRDeletionLog(models.Model):
+    _name = 'dwr.deletion.log'
+    _description = 'DWR Deletion Tombstone'
+    _order = 'id'
+    _log_access = False
+
+    res_model = fields.Char(string='Model', required=True, readonly=True)
+    res_id = fields.Integer(string='Record ID', required=True, readonly=True)
+    res_date = fields.Date(string='Record Day', readonly=True)
+    reason = fields.Selection([
+        ('deleted', 'Deleted'),
+        ('archived', 'Archived'),
+    ], string='Reason', default='deleted', readonly=True)
+    deleted_at = fields.Datetime(string='Deleted On', readonly=True)
+
+    def init(self):
+        tools.create_index(self.env.cr, 'dwr_deletion_log_model_id_idx', self._table, ['res_model', 'id'])
+        tools.create_index(
+            self.env.cr, 'dwr_deletion_log_model_deleted_at_idx', self._table, ['res_model', 'deleted_at'])
+
+    @api.model
+    def _log_deletion(self, records):
+        """Record tombstones for ``records`` (called right before they are unlinked)"""
+        if not records:
+            return
+        reason = 'archived' if self.env.context.get('dwr_archive') else 'deleted'
+        days = records._change_feed_days()
+        self.env.cr.execute("""
+            INSERT INTO dwr_deletion_log (res_model, res_id, res_date, reason, deleted_at)
+            SELECT %s, t.id, t.day, %s, (now() at time zone 'UTC')
+              FROM unnest(%s::int[], %s::date[]) AS t(id, day)
+        """, (records._name, reason, records.ids, [days.get(record_id) for record_id in records.ids]))
+
+
+class DWRChangeFeedMixin(models.AbstractModel):
+    """Index ``(write_date, id)`` and keep deletion tombstones so that external systems can
+    fetch incremental changes with a cursor instead of re-reading whole periods."""
+    _name = 'dwr.change.feed.mixin'
+    _description = 'DWR Change Feed Mixin'
+
+    def init(self):
+        super().init()
+        if self._abstract:
+            return
+        tools.create_index(
+            self.env.cr, '%s_write_date_id_idx' % self._table, self._table, ['write_date', 'id'])
+
+    def _change_feed_children(self):
+        """Records deleted together with ``self`` by a database cascade"""
+        return []
+
+    def _change_feed_days(self):
+        """Day of each record in the analytics snapshot, kept on its tombstone so that the
+        snapshot rewrites that day"""
+        if 'date' not in self._fields:
+            return {}
+        return {record.id: record.date for record in self}
+
+    def unlink(self):
+        Log = self.env['dwr.deletion.log'].sudo()
+        Log._log_deletion(self)
+        for children in self._change_feed_children():
+            Log._log_deletion(children)
+        return super().unlink()
@@ -1,10 +1,175 @@
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import UserError
-from datetime import datetime, timedelta
+from collections import Counter, namedtuple
+from datetime import datetime, time, timedelta
+from statistics import median
 import logging
 
+import pytz
+
+from .dwr_perf import perf_tracked
+
 _logger = logging.getLogger(__name__)
 
+# When escalations are scheduled: the first one ``first_days`` days after the submission at
+# ``first_hour`` (local time of ``timezone``), the next levels ``repeat_days`` days after the
+# previous one at ``repeat_hour``. ``working_days`` moves them to the next working day of the
+# company calendar, and ``digest`` sends a manager one mail for all the reports escalated to them
+# in the same run.
+EscalationPolicy = namedtuple('EscalationPolicy', [
+    'first_days', 'first_hour', 'repeat_days', 'repeat_hour', 'timezone', 'working_days', 'digest',
+])
+# Working weekdays (0 is Monday) and public holidays of a resource calendar
+WorkingCalendar = namedtuple('WorkingCalendar', ['weekdays', 'holidays'])
+
+# Historical submissions replayed by the simulator: the report, the employee whose manager gets
+# the first escalation, the submission time, the time the report left the submitted state (None
+# while pending) and the state it went to
+Submission = namedtuple('Submission', ['report_id', 'escalated_from', 'submitted_at', 'ended_at', 'outcome'])
+# Reporting hierarchy as the escalation cron walks it
+Hierarchy = namedtuple('Hierarchy', ['parents', 'with_user', 'with_email'])
+
+POLICY_PARAMS = {
+    'first_days': ('daily_work_report.escalation_first_days', 1, int),
+    'first_hour': ('daily_work_report.escalation_first_hour', 16.0, float),
+    'repeat_days': ('daily_work_report.escalation_repeat_days', 1, int),
+    'repeat_hour': ('daily_work_report.escalation_repeat_hour', 14.0, float),
+    'timezone': ('daily_work_report.escalation_timezone', 'Asia/Kolkata', str),
+    'working_days': ('daily_work_report.escalation_working_days', False, lambda value: value in ('1', 'True', True)),
+    'digest': ('daily_work_report.escalation_digest', False, lambda value: value in ('1', 'True', True)),
+}
+# Accepted values of the policy parameters, as checked by the simulator wizard
+POLICY_CHECKS = {
+    'first_days': lambda value: value >= 0,
+    'first_hour': lambda value: 0 <= value < 24,
+    'repeat_days': lambda value: value >= 0,
+    'repeat_hour': lambda value: 0 <= value < 24,
+    'timezone': lambda value: value in pytz.all_timezones_set,
+}
+# Days searched for a working day before falling back to calendar days (a working schedule
+# without any working day)
+MAX_SCHEDULE_DAYS = 366
+
+# Every submission of the period with how it ended, from the audit log when it recorded it (each
+# submission of a report that was sent back and resubmitted), else from the report itself
+_HISTORY_SQL = """
+    WITH audited AS (
+        SELECT a.res_id AS report_id, a.date AS submitted_at, n.date AS ended_at, n.to_state AS outcome
+          FROM dwr_audit_log a
+     LEFT JOIN LATERAL (
+               SELECT n.date, n.to_state
+                 FROM dwr_audit_log n
+                WHERE n.res_model = a.res_model AND n.res_id = a.res_id AND n.id > a.id
+             ORDER BY n.id
+                LIMIT 1
+               ) n ON TRUE
+         WHERE a.res_model = 'employee.report' AND a.to_state = 'submitted'
+           AND a.date >= %(date_from)s AND a.date < %(date_to)s
+    ),
+    submissions AS (
+        SELECT report_id, submitted_at, ended_at, outcome FROM audited
+        UNION ALL
+        SELECT r.id, r.submitted_time,
+               CASE r.state WHEN 'submitted' THEN NULL WHEN 'approved' THEN r.approved_time ELSE r.write_date END,
+               CASE WHEN r.state <> 'submitted' THEN r.state END
+          FROM employee_report r
+         WHERE r.submitted_time >= %(date_from)s AND r.submitted_time < %(date_to)s
+           AND NOT EXISTS (SELECT 1 FROM audited WHERE audited.report_id = r.id)
+    )
+    SELECT s.report_id, coalesce(r.prepared_by, r.name), s.submitted_at, s.ended_at, s.outcome
+      FROM submissions s
+      JOIN employee_report r ON r.id = s.report_id
+  ORDER BY s.submitted_at
+"""
+
+_HIERARCHY_SQL = """
+    SELECT e.id, e.parent_id, e.user_id IS NOT NULL,
+           coalesce(nullif(e.work_email, ''), nullif(p.email, '')) IS NOT NULL
+      FROM hr_employee e
+ LEFT JOIN res_users u ON u.id = e.user_id
+ LEFT JOIN res_partner p ON p.id = u.partner_id
+"""
+
+
+def schedule_after(moment, days, hour, timezone, calendar=None):
+    """Time at ``hour`` (local to ``timezone``) ``days`` days after the naive UTC ``moment``, on a
+    working day of ``calendar`` when given, and always after ``moment``; naive UTC"""
+    tz = pytz.timezone(timezone)
+    day = pytz.utc.localize(moment).astimezone(tz).date() + timedelta(days=days)
+    at = time(int(hour), int(round(hour % 1 * 60)) % 60)
+    for _i in range(MAX_SCHEDULE_DAYS):
+        if calendar is None or (day.weekday() in calendar.weekdays and day not in calendar.holidays):
+            run = tz.localize(datetime.combine(day, at)).astimezone(pytz.utc).replace(tzinfo=None)
+            if run > moment:
+                return run
+        day += timedelta(days=1)
+    return schedule_after(moment, days, hour, timezone)
+
+
+def invalid_policy_fields(policy):
+    """Names of the fields of ``policy`` with a value the schedule cannot use"""
+    return [name for name, check in POLICY_CHECKS.items() if not check(getattr(policy, name))]
+
+
+def simulate_escalations(submissions, hierarchy, policy, calendar=None, now=None):
+    """Replay the escalation cron over ``submissions`` under ``policy``.
+
+    An escalation is due at its scheduled time unless the report left the submitted state
+    before; it goes to the manager above the previous target, like ``process_due_escalations``.
+    Returns the counts of escalations and mails, the mails per manager and day, the share of
+    submissions never escalated and the median delays in hours.
+    """
+    now = now or datetime.utcnow()
+    calendar = calendar if policy.working_days else None
+    tz = pytz.timezone(policy.timezone)
+    parents, with_user, with_email = hierarchy
+    escalations = 0
+    escalated_reports = 0
+    mails = set() if policy.digest else Counter()
+    first_delays = []
+    approval_delays = []
+    for submission in submissions:
+        end = submission.ended_at or now
+        due = schedule_after(submission.submitted_at, policy.first_days, policy.first_hour, policy.timezone, calendar)
+        previous = submission.escalated_from
+        escalated = False
+        while due < end:
+            target = parents.get(previous)
+            if not target or target not in with_email:
+                break
+            escalations += 1
+            if not escalated:
+                escalated = True
+                first_delays.append((due - submission.submitted_at).total_seconds() / 3600)
+            if policy.digest:
+                mails.add((target, due))
+            else:
+                mails[(target, due)] += 1
+            if not parents.get(target):
+                break
+            # The cron resumes from the target through its user, else from the report again
+            previous = target if target in with_user else submission.escalated_from
+            due = schedule_after(due, policy.repeat_days, policy.repeat_hour, policy.timezone, calendar)
+        if escalated:
+            escalated_reports += 1
+            if submission.outcome == 'approved':
+                approval_delays.append((submission.ended_at - submission.submitted_at).total_seconds() / 3600)
+    per_manager_day = Counter()
+    for target, due in mails:
+        per_manager_day[(target, pytz.utc.localize(due).astimezone(tz).date())] += 1 if policy.digest else mails[(target, due)]
+    return {
+        'submissions': len(submissions),
+        'escalated_reports': escalated_reports,
+        'escalations': escalations,
+        'mails': sum(per_manager_day.values()),
+        'managers': len({target for target, _day in per_manager_day}),
+        'max_manager_day_mails': max(per_manager_day.values(), default=0),
+        'avg_manager_day_mails': sum(per_manager_day.values()) / len(per_manager_day) if per_manager_day else 0.0,
+        'unescalated_pct': 100.0 * (len(submissions) - escalated_reports) / len(submissions) if submissions else 0.0,
+        'median_first_escalation_hours': median(first_delays) if first_delays else 0.0,
+        'median_approval_hours': median(approval_delays) if approval_delays else 0.0,
+    }
+
 
 class DWREscalation(models.Model):
     _name = 'dwr.escalation'
@@ -13,28 +178,171 @@ class DWREscalation(models.Model):
     employee_report_id = fields.Many2one('employee.report', string='Employee Report', required=True, ondelete='cascade')
     scheduled_datetime = fields.Datetime(string='Scheduled Datetime', required=True)
     processed = fields.Boolean(string='Processed', default=False)
+    cancelled = fields.Boolean(string='Cancelled', default=False, readonly=True,
+                               help="The report left the submitted state before the escalation was due")
     created_by = fields.Many2one('res.users', string='Created By', default=lambda self: self.env.user)
     create_date = fields.Datetime(string='Created On', default=fields.Datetime.now)
 
+    def init(self):
+        # Close rows left pending by reports that are no longer submitted, keep only the latest
+        # pending row per report, then guarantee at most one active escalation chain per report
+        self.env.cr.execute("""
+            UPDATE dwr_escalation esc
+               SET processed = TRUE, cancelled = TRUE
+             WHERE NOT esc.processed
+               AND (EXISTS (SELECT 1 FROM employee_report r
+                             WHERE r.id = esc.employee_report_id AND r.state IS DISTINCT FROM 'submitted')
+                    OR EXISTS (SELECT 1 FROM dwr_escalation newer
+                                WHERE newer.employee_report_id = esc.employee_report_id
+                                  AND NOT newer.processed AND newer.id > esc.id))
+        """)
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS dwr_escalation_active_report_uniq
+                ON dwr_escalation (employee_report_id) WHERE NOT processed
+        """)
+        # Due rows of the cron; the domain ('processed', '=', False) also matches NULL, which a
+        # partial index on NOT processed would not cover
+        tools.create_index(self.env.cr, 'dwr_escalation_processed_scheduled_datetime_idx', self._table,
+                           ['processed', 'scheduled_datetime'])
+        # Escalation history of a report (cascade deletes and the hierarchy roll-up)
+        tools.create_index(self.env.cr, 'dwr_escalation_employee_report_id_idx', self._table, ['employee_report_id'])
+
+    @api.model
+    def _get_policy(self):
+        """Escalation policy configured in the system parameters; invalid values are replaced
+        by their defaults"""
+        params = self.env['ir.config_parameter'].sudo()
+        values = {}
+        for name, (key, default, convert) in POLICY_PARAMS.items():
+            value = params.get_param(key)
+            try:
+                value = default if value in (None, False, '') else convert(value)
+            except ValueError:
+                value = None
+            check = POLICY_CHECKS.get(name)
+            if value is None or (check and not check(value)):
+                _logger.warning('DWR Escalation: invalid %s %r, using %r', key, params.get_param(key), default)
+                value = default
+            values[name] = value
+        return EscalationPolicy(**values)
+
+    @api.model
+    def _set_policy(self, policy):
+        invalid = invalid_policy_fields(policy)
+        if invalid:
+            raise UserError(_("Invalid escalation policy: %s.", ', '.join(invalid)))
+        params = self.env['ir.config_parameter'].sudo()
+        for name, (key, _default, _convert) in POLICY_PARAMS.items():
+            value = getattr(policy, name)
+            params.set_param(key, ('1' if value else '0') if isinstance(value, bool) else str(value))
+
+    @api.model
+    def _get_working_calendar(self):
+        """Working weekdays and public holidays of the company's working schedule"""
+        resource_calendar = self.env.company.resource_calendar_id
+        if not resource_calendar:
+            return WorkingCalendar(frozenset(range(5)), frozenset())
+        holidays = set()
+        for leave in resource_calendar.global_leave_ids:
+            day = leave.date_from.date()
+            while day <= leave.date_to.date():
+                holidays.add(day)
+                day += timedelta(days=1)
+        return WorkingCalendar(
+            frozenset(int(attendance.dayofweek) for attendance in resource_calendar.attendance_ids),
+            frozenset(holidays),
+        )
+
+    @api.model
+    def _schedule(self, moment, first=True, policy=None, calendar=None):
+        """Due time of the first escalation of a report submitted at ``moment``, or of the next
+        level of an escalation processed at ``moment``"""
+        policy = policy or self._get_policy()
+        if policy.working_days and calendar is None:
+            calendar = self._get_working_calendar()
+        days, hour = (policy.first_days, policy.first_hour) if first else (policy.repeat_days, policy.repeat_hour)
+        return schedule_after(moment, days, hour, policy.timezone, calendar if policy.working_days else None)
+
     @api.model
+    def _load_history(self, date_from, date_to):
+        """Submissions between ``date_from`` and ``date_to`` and the reporting hierarchy, read
+        once for any number of simulated policies"""
+        self.env['employee.report'].flush_model()
+        self.env.cr.execute(_HISTORY_SQL, {'date_from': date_from, 'date_to': date_to})
+        submissions = [Submission(*row) for row in self.env.cr.fetchall()]
+        self.env.cr.execute(_HIERARCHY_SQL)
+        parents, with_user, with_email = {}, set(), set()
+        for employee_id, parent_id, has_user, has_email in self.env.cr.fetchall():
+            parents[employee_id] = parent_id
+            if has_user:
+                with_user.add(employee_id)
+            if has_email:
+                with_email.add(employee_id)
+        return submissions, Hierarchy(parents, with_user, with_email)
+
+    @api.model
+    def _cancel_pending(self, reports):
+        """Cancel the pending escalations of ``reports`` with a single statement"""
+        if not reports:
+            return
+        self.flush_model(['processed'])
+        self.env.cr.execute("""
+            UPDATE dwr_escalation
+               SET processed = TRUE, cancelled = TRUE
+             WHERE employee_report_id = ANY(%s) AND NOT processed
+         RETURNING created_by
+        """, (reports.ids,))
+        user_ids = {row[0] for row in self.env.cr.fetchall() if row[0]}
+        self.invalidate_model(['processed', 'cancelled'])
+        if user_ids:
+            self.env['dwr.pending.counter']._invalidate(self.env['res.users'].browse(user_ids))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        # The escalation target can now approve the report
+        self.env['dwr.pending.counter']._invalidate(records.created_by)
+        return records
+
+    def write(self, vals):
+        if 'processed' in vals:
+            self.env['dwr.pending.counter']._invalidate(self.created_by)
+        return super().write(vals)
+
+    @api.model
+    @perf_tracked('dwr.escalation.process_due_escalations')
     def process_due_escalations(self):
-        """Process escalations: escalate up hierarchy every 15 hours until top manager is reached."""
-        import pytz
+        """Process escalations: escalate up the hierarchy on the schedule of the configured
+        policy (``_get_policy``) until the top manager is reached."""
         now = fields.Datetime.now()
         esc_recs = self.search([('processed', '=', False), ('scheduled_datetime', '<=', now)])
-        _logger.info('DWR Escalation: processing %s records', len(esc_recs))
+        _logger.debug('DWR Escalation: processing %s records', len(esc_recs))
+        if not esc_recs:
+            return True
+
+        Report = self.env['employee.report']
+        email_from = Report._get_notification_email_from()
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        # Next level if still not approved
+        policy = self._get_policy()
+        next_due = self._schedule(now, first=False, policy=policy)
+        next_scheduled = fields.Datetime.to_string(next_due)
+
+        processed = self.browse()
+        mail_vals_list = []
+        next_esc_vals = []
+        chatter_bodies = {}
         for esc in esc_recs:
             try:
                 report = esc.employee_report_id
                 if not report:
-                    esc.processed = True
+                    processed |= esc
                     continue
                 if report.state != 'submitted':
-                    _logger.info('Report %s state is %s, skipping escalation', report.id, report.state)
-                    esc.processed = True
+                    _logger.debug('Report %s state is %s, skipping escalation', report.id, report.state)
+                    processed |= esc
                     continue
                 # Find current escalation manager (from last escalation)
-                last_manager = None
                 if esc.created_by and esc.created_by.employee_id:
                     last_manager = esc.created_by.employee_id
                 else:
@@ -43,40 +351,36 @@ class DWREscalation(models.Model):
                 next_manager = last_manager.parent_id if last_manager else None
                 if not next_manager:
                     _logger.warning('No higher manager to escalate to for report %s; marking processed', report.id)
-                    esc.processed = True
+                    processed |= esc
                     continue
-                next_manager_email = next_manager.work_email or (next_manager.user_id.partner_id.email if next_manager.user_id else False)
+                next_manager_email = Report._get_employee_email(next_manager)
                 if not next_manager_email:
                     _logger.warning('Escalation target %s has no email; marking processed', next_manager.id)
-                    esc.processed = True
+                    processed |= esc
                     continue
-                # Send escalation email
-                email_from = self.env['ir.config_parameter'].sudo().get_param('mail.default.from')
-                if not email_from:
-                    email_from = self.env.company.email or (self.env.user.company_id.email if self.env.user.company_id else False)
-                if not email_from:
-                    catchall = self.env['ir.config_parameter'].sudo().get_param('mail.catchall.domain')
-                    if catchall:
-                        email_from = 'no-reply@' + catchall
-                    else:
-                        email_from = 'no-reply@example.com'
-                subject = _('Escalation: Daily Work Report requires your approval')
-                base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
                 record_url = f"{base_url}/web#id={report.id}&model={report._name}&view_type=form"
+                # Deadlines of the configured policy, in its local time
+                if next_manager.parent_id:
+                    next_step = _('If you do not approve it by %s, it will escalate to your manager.') % (
+                        self._format_due(next_due, policy),)
+                else:
+                    next_step = ''
                 body = _(
                     '<p>Hello %(manager)s,</p>'
                     '<p>%(employee)s has a pending daily work report submitted on %(date)s that requires your review and approval.</p>'
-                    '<p>This request was escalated because the previous manager did not act within 15 hours. If you do not approve within 15 hours, it will escalate to your manager.</p>'
+                    '<p>This request was escalated because the previous manager did not act by %(due)s. %(next_step)s</p>'
                     '<p><a href="%(url)s" style="background-color: #875A7B; padding: 8px 16px; text-decoration: none; color: #fff; border-radius: 5px; font-size:13px;">View Report</a></p>'
                     '<p>Thank you.</p>'
                 ) % {
                     'manager': next_manager.name,
                     'employee': report.name.name if report.name else '',
                     'date': report.date or '',
+                    'due': self._format_due(esc.scheduled_datetime, policy),
+                    'next_step': next_step,
                     'url': record_url
                 }
-                mail_values = {
-                    'subject': subject,
+                mail_vals_list.append({
+                    'subject': _('Escalation: Daily Work Report requires your approval'),
                     'body_html': body,
                     'email_to': next_manager_email,
                     'email_from': email_from,
@@ -85,30 +389,61 @@ class DWREscalation(models.Model):
                     'message_type': 'email',
                     'model': report._name,
                     'res_id': report.id,
-                }
-                mail = self.env['mail.mail'].sudo().create(mail_values)
-                mail.sudo().send(raise_exception=False)
-                report.message_post(
-                    body=_('Escalation notification sent to %s. If not approved within 15 hours, it will escalate to the next manager.') % (next_manager.name,),
-                    message_type='notification'
-                )
-                _logger.info('Escalation: sent mail.mail %s for report %s', mail.id, report.id)
-                esc.processed = True
-                # Schedule next escalation at next day's 14:00 IST if still not approved
+                })
+                if next_manager.parent_id:
+                    chatter_bodies[report.id] = _(
+                        'Escalation notification sent to %s. If not approved by %s, it will escalate to the next manager.'
+                    ) % (next_manager.name, self._format_due(next_due, policy))
+                else:
+                    chatter_bodies[report.id] = _('Escalation notification sent to %s.') % (next_manager.name,)
+                processed |= esc
                 if next_manager.parent_id:
-                    ist = pytz.timezone('Asia/Kolkata')
-                    now_utc = datetime.utcnow().replace(tzinfo=pytz.utc)
-                    now_ist = now_utc.astimezone(ist)
-                    next_day = now_ist.date() + timedelta(days=1)
-                    target_time = datetime(next_day.year, next_day.month, next_day.day, 14, 0, 0)
-                    scheduled_ist = ist.localize(target_time)
-                    scheduled_utc = scheduled_ist.astimezone(pytz.utc)
-                    self.env['dwr.escalation'].sudo().create({
+                    next_esc_vals.append({
                         'employee_report_id': report.id,
-                        'scheduled_datetime': fields.Datetime.to_string(scheduled_utc),
+                        'scheduled_datetime': next_scheduled,
                         'created_by': next_manager.user_id.id if next_manager.user_id else None,
                     })
             except Exception as e:
                 _logger.error('Error processing escalation %s: %s', esc.id, e, exc_info=True)
                 # Do not mark processed to allow retry next run
-        return True
\ No newline at end of file
+
+        # Send escalation emails, log them and queue the next level in bulk
+        if policy.digest:
+            mail_vals_list = self._digest_mails(mail_vals_list)
+        mails = Report._send_mails(mail_vals_list)
+        if chatter_bodies and not self.env['dwr.audit.log']._is_compact():
+            Report.browse(list(chatter_bodies))._message_log_batch(bodies=chatter_bodies)
+        processed.write({'processed': True})
+        # The next level may only be queued once the current row is closed (one active chain)
+        processed.flush_recordset(['processed'])
+        if next_esc_vals:
+            self.sudo().create(next_esc_vals)
+        _logger.debug('Escalation: sent %s mails for %s escalations', len(mails), len(processed))
+        return True
+
+    @api.model
+    def _format_due(self, moment, policy):
+        """``moment`` (naive UTC) in the local time of the policy, as shown in the mails"""
+        local = pytz.utc.localize(moment).astimezone(pytz.timezone(policy.timezone))
+        return '%s (%s)' % (local.strftime('%Y-%m-%d %H:%M'), policy.timezone)
+
+    @api.model
+    def _digest_mails(self, mail_vals_list):
+        """Merge the escalation mails of a run into one mail per recipient"""
+        by_recipient = {}
+        for vals in mail_vals_list:
+            by_recipient.setdefault(vals['email_to'], []).append(vals)
+        digests = []
+        for recipient_mails in by_recipient.values():
+            if len(recipient_mails) == 1:
+                digests += recipient_mails
+                continue
+            digests.append(dict(
+                recipient_mails[0],
+                subject=_('Escalation: %s Daily Work Reports require your approval', len(recipient_mails)),
+                body_html='<hr/>'.join(vals['body_html'] for vals in recipient_mails),
+                # Kept on the first report so that the mail purge still finds the digest
+                model=recipient_mails[0]['model'],
+                res_id=recipient_mails[0]['res_id'],
+            ))
+        return digests
@@ -0,0 +1,141 @@
+from odoo import api, fields, models, tools
+
+# Manager -> employee links of the reporting graph: direct managers and active additional managers
+REPORTING_EDGES_SQL = """
+    SELECT e.parent_id AS manager_id, e.id AS employee_id
+      FROM hr_employee e
+     WHERE e.parent_id IS NOT NULL AND e.active
+    UNION
+    SELECT am.manager_id, am.employee_id
+      FROM employee_additional_manager am
+     WHERE am.active
+"""
+
+class DWRHierarchyRollup(models.Model):
+    """Pending report counts rolled up for every manager of the organisation.
+
+    A recursive CTE walks the reporting graph (``hr.employee.parent_id`` plus active
+    ``employee.additional.manager`` links) so each manager row counts the submitted reports of
+    the whole team below it. Reports reached through several paths are counted once per
+    manager, and cycles in the graph are harmless.
+    """
+    _name = 'dwr.hierarchy.rollup'
+    _description = 'DWR Hierarchy Roll-up'
+    _inherit = ['dwr.replica.mixin']
+    _dwr_replica_reads = True
+    _auto = False
+    _order = 'pending_count desc, id'
+    _rec_name = 'employee_id'
+
+    employee_id = fields.Many2one('hr.employee', string='Manager', readonly=True)
+    parent_id = fields.Many2one('dwr.hierarchy.rollup', string='Parent Manager', readonly=True)
+    department_id = fields.Many2one('hr.department', string='Department', readonly=True)
+    direct_count = fields.Integer(string='Direct Reports', readonly=True)
+    team_size = fields.Integer(string='Team Size', readonly=True)
+    direct_pending_count = fields.Integer(string='Direct Pending', readonly=True)
+    pending_count = fields.Integer(string='Pending', readonly=True)
+    overdue_count = fields.Integer(string='Overdue', readonly=True)
+    escalated_count = fields.Integer(string='Escalated', readonly=True)
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW dwr_hierarchy_rollup AS (
+                WITH RECURSIVE edges AS (%s),
+                -- UNION (not UNION ALL) discards pairs already seen, which stops on cycles
+                team AS (
+                    SELECT manager_id, employee_id FROM edges
+                    UNION
+                    SELECT t.manager_id, e.employee_id
+                      FROM team t
+                      JOIN edges e ON e.manager_id = t.employee_id
+                ),
+                pending AS (
+                    SELECT r.name AS employee_id,
+                           count(*) AS pending,
+                           count(*) FILTER (WHERE r.date < current_date) AS overdue,
+                           count(*) FILTER (WHERE EXISTS (
+                               SELECT 1 FROM dwr_escalation esc
+                                WHERE esc.employee_report_id = r.id AND esc.processed AND NOT esc.cancelled
+                           )) AS escalated
+                      FROM employee_report r
+                     WHERE r.state = 'submitted'
+                  GROUP BY r.name
+                )
+                SELECT m.id AS id,
+                       m.id AS employee_id,
+                       m.parent_id AS parent_id,
+                       m.department_id AS department_id,
+                       count(d.employee_id) AS direct_count,
+                       count(t.employee_id) AS team_size,
+                       coalesce(sum(p.pending) FILTER (WHERE d.employee_id IS NOT NULL), 0) AS direct_pending_count,
+                       coalesce(sum(p.pending), 0) AS pending_count,
+                       coalesce(sum(p.overdue), 0) AS overdue_count,
+                       coalesce(sum(p.escalated), 0) AS escalated_count
+                  FROM hr_employee m
+                  JOIN team t ON t.manager_id = m.id AND t.employee_id <> m.id
+             LEFT JOIN edges d ON d.manager_id = t.manager_id AND d.employee_id = t.employee_id
+             LEFT JOIN pending p ON p.employee_id = t.employee_id
+                 WHERE m.active
+              GROUP BY m.id
+            )
+        """ % REPORTING_EDGES_SQL)
+
+    @api.model
+    def get_rollup_tree(self):
+        """Return the roll-up of the whole organisation as a nested list of nodes, read with
+        a single query (on the read replica when one is available); each node carries its counts
+        and its ``children``"""
+        self.check_access_rights('read')
+        with self.env['dwr.replica']._read_env('dwr.hierarchy.rollup.get_rollup_tree') as env:
+            rows = self.with_env(env).search_read([], [
+                'employee_id', 'parent_id', 'department_id', 'direct_count', 'team_size',
+                'direct_pending_count', 'pending_count', 'overdue_count', 'escalated_count',
+            ], order='id')
+        nodes = {}
+        for row in rows:
+            nodes[row['id']] = dict(
+                row,
+                employee_id=row['employee_id'] and row['employee_id'][0],
+                name=row['employee_id'] and row['employee_id'][1],
+                parent_id=row['parent_id'] and row['parent_id'][0],
+                department_id=row['department_id'] and row['department_id'][0],
+                children=[],
+            )
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node['parent_id'])
+            (parent['children'] if parent else roots).append(node)
+        return roots
+
+    def action_open_team(self):
+        """Drill down to the managers reporting to this one"""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': self.employee_id.name,
+            'res_model': self._name,
+            'view_mode': 'tree',
+            'domain': [('parent_id', '=', self.id)],
+        }
+
+    def action_open_pending_reports(self):
+        """Pending reports of the whole team below this manager"""
+        self.ensure_one()
+        self.env.cr.execute("""
+            WITH RECURSIVE edges AS (%s),
+            team AS (
+                SELECT employee_id FROM edges WHERE manager_id = %%s
+                UNION
+                SELECT e.employee_id FROM team t JOIN edges e ON e.manager_id = t.employee_id
+            )
+            SELECT employee_id FROM team WHERE employee_id <> %%s
+        """ % REPORTING_EDGES_SQL, (self.id, self.id))
+        employee_ids = [row[0] for row in self.env.cr.fetchall()]
+        return {
+            'type': 'ir.actions.act_window',
+            'name': self.employee_id.name,
+            'res_model': 'employee.report',
+            'view_mode': 'tree,form',
+            'domain': [('state', '=', 'submitted'), ('name', 'in', employee_ids)],
+        }
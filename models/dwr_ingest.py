@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+
+class DWRIngestRequest(models.Model):
+    """Client-supplied idempotency keys of the batch ingest endpoint with the response that was
+    returned for them, so that a retried request is answered without creating anything twice."""
+    _name = 'dwr.ingest.request'
+    _description = 'DWR Batch Ingest Request'
+    _order = 'id desc'
+
+    key = fields.Char(string='Idempotency Key', required=True, readonly=True)
+    user_id = fields.Many2one('res.users', string='User', required=True, readonly=True, ondelete='cascade')
+    state = fields.Selection([
+        ('pending', 'In Progress'),
+        ('done', 'Done'),
+    ], string='Status', default='pending', readonly=True)
+    response = fields.Text(string='Response', readonly=True)
+    report_count = fields.Integer(string='Reports', readonly=True)
+
+    _sql_constraints = [
+        ('user_key_uniq', 'unique(user_id, key)', 'Idempotency keys must be unique per user.'),
+    ]
+
+    @api.model
+    def _claim(self, key):
+        """Reserve ``key`` for the current user.
+
+        Returns ``(request, created)``: ``created`` is False when the key was used before, in
+        which case ``request`` holds the earlier attempt.
+        """
+        self.env.cr.execute("""
+            INSERT INTO dwr_ingest_request (key, user_id, state, report_count, create_uid, create_date, write_uid, write_date)
+            VALUES (%s, %s, 'pending', 0, %s, (now() at time zone 'UTC'), %s, (now() at time zone 'UTC'))
+            ON CONFLICT (user_id, key) DO NOTHING
+            RETURNING id
+        """, (key, self.env.uid, self.env.uid, self.env.uid))
+        row = self.env.cr.fetchone()
+        if row:
+            return self.browse(row[0]), True
+        return self.search([('user_id', '=', self.env.uid), ('key', '=', key)], limit=1), False
+
+    @api.autovacuum
+    def _gc_requests(self):
+        """Keys only need to outlive client retries; drop them after
+        ``daily_work_report.ingest_key_retention_days`` (default 7) days"""
+        days = int(self.env['ir.config_parameter'].sudo().get_param('daily_work_report.ingest_key_retention_days', 7))
+        self.search([('create_date', '<', fields.Datetime.now() - timedelta(days=days))]).unlink()
@@ -0,0 +1,195 @@
+import logging
+
+from odoo import api, fields, models, _
+
+_logger = logging.getLogger(__name__)
+
+# Fields of employee.report / report that feed the summary
+SUMMARY_REPORT_FIELDS = {
+    'name', 'date', 'department_id', 'state', 'submitted_time', 'approved_time',
+    'has_concerns', 'total_work_minutes', 'report_ids',
+}
+SUMMARY_LINE_FIELDS = {'employee_id', 'time_taken', 'current_status'}
+
+# Aggregates of the (employee_id, month) rows of a ``keys`` relation, over the submitted reports
+# whether live or moved to the archive
+_STATS_SQL = """
+        SELECT r.employee_id,
+               date_trunc('month', r.date)::date AS month,
+               max(r.department_id) AS department_id,
+               count(DISTINCT r.date) AS days_reported,
+               count(DISTINCT r.date) FILTER (WHERE r.state = 'approved') AS days_approved,
+               coalesce(sum(r.total_work_minutes), 0) AS total_minutes,
+               coalesce(sum(r.completed), 0) AS completed_line_count,
+               coalesce(sum(r.open), 0) AS open_line_count,
+               avg(extract(epoch FROM r.approved_time - r.submitted_time) / 3600.0)
+                   FILTER (WHERE r.state = 'approved' AND r.approved_time IS NOT NULL) AS avg_approval_delay,
+               count(*) FILTER (WHERE r.has_concerns) AS concern_count
+          FROM (
+                SELECT r.name AS employee_id, r.date, r.department_id, r.state, r.submitted_time,
+                       r.approved_time, r.total_work_minutes, r.has_concerns, l.completed, l.open
+                  FROM employee_report r
+                  JOIN keys k ON k.employee_id = r.name
+                             AND r.date >= k.month AND r.date < k.month + interval '1 month'
+                  LEFT JOIN LATERAL (
+                        SELECT count(*) FILTER (WHERE lower(trim(s.name)) = 'completed') AS completed,
+                               count(*) FILTER (WHERE lower(trim(s.name)) <> 'completed') AS open
+                          FROM report line
+                          JOIN job_status s ON s.id = line.current_status
+                         WHERE line.employee_id = r.id
+                  ) l ON TRUE
+                 WHERE r.submitted_time IS NOT NULL
+             UNION ALL
+                SELECT a.name, a.date, a.department_id, a.state, a.submitted_time,
+                       a.approved_time, a.total_work_minutes, coalesce(a.has_concerns, a.concerns IS NOT NULL),
+                       l.completed, l.open
+                  FROM employee_report_archive a
+                  JOIN keys k ON k.employee_id = a.name
+                             AND a.date >= k.month AND a.date < k.month + interval '1 month'
+                  LEFT JOIN LATERAL (
+                        SELECT count(*) FILTER (WHERE lower(trim(line->>'status')) = 'completed') AS completed,
+                               count(*) FILTER (WHERE lower(trim(line->>'status')) NOT IN ('completed', '')) AS open
+                          FROM jsonb_array_elements(coalesce(a.lines_json, '[]')::jsonb) line
+                  ) l ON TRUE
+                 WHERE a.source_model = 'employee.report' AND a.submitted_time IS NOT NULL
+          ) r
+      GROUP BY r.employee_id, date_trunc('month', r.date)
+"""
+
+_KEYS_UNNEST_SQL = "SELECT * FROM unnest(%s::int[], %s::date[]) AS k(employee_id, month)"
+# Every (employee, month) with live or archived reports, and every existing summary row
+_REBUILD_KEYS_SQL = """
+    SELECT DISTINCT name AS employee_id, date_trunc('month', date)::date AS month
+      FROM employee_report
+     WHERE name IS NOT NULL AND date IS NOT NULL
+    UNION
+    SELECT DISTINCT name, date_trunc('month', date)::date
+      FROM employee_report_archive
+     WHERE source_model = 'employee.report' AND name IS NOT NULL AND date IS NOT NULL
+    UNION
+    SELECT employee_id, month
+      FROM dwr_monthly_summary
+"""
+
+# Upsert the ``stats`` rows and drop the rows of the other ``keys``
+_REFRESH_SQL = """
+    WITH keys AS (%(keys)s),
+    report_stats AS (%(stats)s),
+    upserted AS (
+        INSERT INTO dwr_monthly_summary
+            (employee_id, month, department_id, days_reported, days_approved, total_minutes,
+             completed_line_count, open_line_count, avg_approval_delay, concern_count, refreshed_at)
+        SELECT employee_id, month, department_id, days_reported, days_approved, total_minutes,
+               completed_line_count, open_line_count, avg_approval_delay, concern_count,
+               (now() at time zone 'UTC')
+          FROM report_stats
+        ON CONFLICT (employee_id, month) DO UPDATE SET
+            department_id = EXCLUDED.department_id,
+            days_reported = EXCLUDED.days_reported,
+            days_approved = EXCLUDED.days_approved,
+            total_minutes = EXCLUDED.total_minutes,
+            completed_line_count = EXCLUDED.completed_line_count,
+            open_line_count = EXCLUDED.open_line_count,
+            avg_approval_delay = EXCLUDED.avg_approval_delay,
+            concern_count = EXCLUDED.concern_count,
+            refreshed_at = EXCLUDED.refreshed_at
+        RETURNING employee_id, month
+    )
+    DELETE FROM dwr_monthly_summary s
+     USING keys k
+     WHERE s.employee_id = k.employee_id AND s.month = k.month
+       AND NOT EXISTS (SELECT 1 FROM upserted u WHERE u.employee_id = s.employee_id AND u.month = s.month)
+"""
+
+
+class DWRMonthlySummary(models.Model):
+    """Per employee and month aggregates of the submitted daily work reports, archived ones
+    included.
+
+    Rows are refreshed at commit time for the (employee, month) keys touched in the
+    transaction, so dashboards read pre-aggregated rows instead of grouping every report
+    and line. ``action_rebuild`` recomputes everything to repair drift.
+    """
+    _name = 'dwr.monthly.summary'
+    _description = 'DWR Monthly Summary'
+    _inherit = ['dwr.replica.mixin']
+    _dwr_replica_reads = True
+    _order = 'month desc, employee_id'
+    _rec_name = 'employee_id'
+    _log_access = False
+
+    employee_id = fields.Many2one('hr.employee', string='Employee', required=True, readonly=True, ondelete='cascade')
+    month = fields.Date(string='Month', required=True, readonly=True, index=True)
+    department_id = fields.Many2one('hr.department', string='Department', readonly=True)
+    days_reported = fields.Integer(string='Days Reported', readonly=True, group_operator='sum')
+    days_approved = fields.Integer(string='Days Approved', readonly=True, group_operator='sum')
+    total_minutes = fields.Integer(string='Total Minutes', readonly=True, group_operator='sum')
+    total_hours = fields.Float(string='Total Hours', compute='_compute_total_hours')
+    completed_line_count = fields.Integer(string='Completed Lines', readonly=True, group_operator='sum')
+    open_line_count = fields.Integer(string='Open Lines', readonly=True, group_operator='sum')
+    avg_approval_delay = fields.Float(string='Avg Approval Delay (h)', digits=(16, 2), readonly=True,
+                                      group_operator='avg')
+    concern_count = fields.Integer(string='Reports with Concerns', readonly=True, group_operator='sum')
+    refreshed_at = fields.Datetime(string='Refreshed On', readonly=True)
+
+    _sql_constraints = [
+        ('employee_month_uniq', 'unique(employee_id, month)', 'Only one summary per employee and month.'),
+    ]
+
+    @api.depends('total_minutes')
+    def _compute_total_hours(self):
+        for record in self:
+            record.total_hours = record.total_minutes / 60.0
+
+    @api.model
+    def _mark_dirty(self, reports):
+        """Schedule the refresh of the (employee, month) keys of ``reports`` at commit time"""
+        keys = {
+            (report.name.id, report.date.replace(day=1))
+            for report in reports.sudo() if report.name and report.date
+        }
+        if not keys:
+            return
+        precommit = self.env.cr.precommit
+        dirty = precommit.data.setdefault('dwr.monthly.summary.keys', set())
+        if not dirty:
+            summary = self.sudo()
+            precommit.add(lambda: summary._refresh(precommit.data.pop('dwr.monthly.summary.keys', set())))
+        dirty.update(keys)
+
+    @api.model
+    def _refresh(self, keys):
+        """Recompute the summary rows of ``keys``, a set of (employee_id, first day of month)"""
+        if not keys:
+            return
+        self.env['employee.report'].flush_model()
+        self.env['report'].flush_model()
+        self.env['employee.report.archive'].flush_model()
+        employee_ids, months = zip(*keys)
+        self.env.cr.execute(
+            _REFRESH_SQL % {'keys': _KEYS_UNNEST_SQL, 'stats': _STATS_SQL},
+            (list(employee_ids), list(months)))
+        self.invalidate_model()
+
+    def action_rebuild(self):
+        """Recompute every summary from the reports.
+
+        Runs on the primary: aggregates read on a lagging replica would overwrite the rows
+        already refreshed by the transactions committed since.
+        """
+        self.env['employee.report'].flush_model()
+        self.env['report'].flush_model()
+        self.env['employee.report.archive'].flush_model()
+        self.env.cr.execute(_REFRESH_SQL % {'keys': _REBUILD_KEYS_SQL, 'stats': _STATS_SQL})
+        self.invalidate_model()
+        _logger.info('DWR Monthly Summary: rebuilt %s rows', self.search_count([]))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Monthly Summary'),
+                'message': _('The monthly summary has been rebuilt.'),
+                'type': 'success',
+                'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+            },
+        }
@@ -0,0 +1,101 @@
+import logging
+import threading
+
+from odoo import api, models
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# Rewrite the department and branch of the given reports from their employee's current ones,
+# skipping the reports that already match; returns the ids actually changed
+_BACKFILL_SQL = """
+    UPDATE %s r
+       SET department_id = e.department_id,
+           branch_id = c.partner_id,
+           write_uid = %s,
+           write_date = (now() at time zone 'UTC')
+      FROM hr_employee e
+ LEFT JOIN res_company c ON c.id = e.company_id
+     WHERE e.id = r.name
+       AND r.id = ANY(%s)
+       AND (r.department_id IS DISTINCT FROM e.department_id OR r.branch_id IS DISTINCT FROM c.partner_id)
+ RETURNING r.id
+"""
+
+
+class DWROrgSnapshotMixin(models.AbstractModel):
+    """Department and branch of a report, captured from its employee when the report is
+    created and again when it is submitted.
+
+    The values are plain stored fields: later changes to the employee (a transfer, a company
+    change, a bulk HR update) leave the existing reports untouched, so each report keeps the
+    organisation unit it was filed under. Deliberate corrections of the history go through
+    ``_backfill_org_units``.
+    """
+    _name = 'dwr.org.snapshot.mixin'
+    _description = 'DWR Organisation Snapshot Mixin'
+
+    @api.model
+    def _get_org_units(self, employee_ids):
+        """Current (department, branch) of each employee, read at once"""
+        employee_ids = {employee_id for employee_id in employee_ids if employee_id}
+        employees = self.env['hr.employee'].sudo().browse(employee_ids).exists()
+        return {
+            employee.id: (employee.department_id.id, employee.company_id.partner_id.id)
+            for employee in employees
+        }
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        default_employee = self.env.user.employee_id.id
+        units = self._get_org_units(vals.get('name', default_employee) for vals in vals_list)
+        for vals in vals_list:
+            department_id, branch_id = units.get(vals.get('name', default_employee), (False, False))
+            vals.setdefault('department_id', department_id)
+            vals.setdefault('branch_id', branch_id)
+        return super().create(vals_list)
+
+    def _snapshot_org_units(self):
+        """Capture the current department and branch of the employee of each report, with one
+        write per distinct (department, branch)"""
+        units = self._get_org_units(self.name.ids)
+        groups = {}
+        for record in self:
+            unit = units.get(record.name.id, (False, False))
+            if unit != (record.department_id.id, record.branch_id.id):
+                groups.setdefault(unit, []).append(record.id)
+        for (department_id, branch_id), ids in groups.items():
+            self.browse(ids).write({'department_id': department_id, 'branch_id': branch_id})
+
+    @api.model
+    def _backfill_org_units(self, domain=None, batch_size=None):
+        """Rewrite the department and branch of the reports matching ``domain`` (all reports
+        when None) from the current ones of their employee.
+
+        This is the only way the snapshot of existing reports changes. The update runs in SQL by
+        chunks of ``batch_size`` reports (``daily_work_report.backfill_batch_size``, default
+        5000), committed one at a time outside of tests, and only touches the reports whose
+        values differ. Returns the number of reports changed.
+        """
+        if batch_size is None:
+            batch_size = int(self.env['ir.config_parameter'].sudo().get_param(
+                'daily_work_report.backfill_batch_size', 5000))
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        self.flush_model()
+        ids = self.sudo().search(domain or [], order='id').ids
+        changed = 0
+        for offset in range(0, len(ids), batch_size):
+            self.env.cr.execute(SQL(
+                _BACKFILL_SQL, SQL.identifier(self._table), self.env.uid, ids[offset:offset + batch_size]))
+            changed_ids = [row[0] for row in self.env.cr.fetchall()]
+            if changed_ids:
+                self.invalidate_model(['department_id', 'branch_id', 'write_uid', 'write_date'])
+                self.browse(changed_ids)._org_units_backfilled()
+            changed += len(changed_ids)
+            if auto_commit:
+                self.env.cr.commit()
+        _logger.info('DWR Backfill: %s of %s %s reports updated', changed, len(ids), self._name)
+        return changed
+
+    def _org_units_backfilled(self):
+        """Hook called with the reports whose department or branch a backfill chunk changed"""
@@ -0,0 +1,182 @@
+import logging
+
+import psycopg2
+
+from odoo import api, fields, models, _
+
+_logger = logging.getLogger(__name__)
+
+APPROVER_GROUPS = (
+    'daily_work_report.group_hod',
+    'daily_work_report.group_staff_manager',
+    'daily_work_report.group_directors',
+)
+
+# Submitted reports the user (%(uid)s) may approve; mirrors employee.report._compute_is_manager
+_PENDING_SQL = {
+    'employee.report': """
+        FROM employee_report r
+        JOIN hr_employee emp ON emp.id = r.name
+   LEFT JOIN hr_employee parent ON parent.id = emp.parent_id
+   LEFT JOIN hr_employee rm ON rm.id = r.reporting_manager_id
+       WHERE r.state = 'submitted'
+         AND emp.user_id IS DISTINCT FROM %(uid)s
+         -- Approvers who already decided on their part are no longer waited for
+         AND NOT EXISTS (SELECT 1 FROM employee_report_approval a
+                          WHERE a.report_id = r.id AND a.approver_user_id = %(uid)s AND a.state <> 'pending')
+         AND (%(director)s
+              OR EXISTS (SELECT 1 FROM employee_report_approval a
+                          WHERE a.report_id = r.id AND a.approver_user_id = %(uid)s AND a.state = 'pending')
+              OR parent.user_id = %(uid)s
+              OR rm.user_id = %(uid)s
+              OR EXISTS (SELECT 1 FROM employee_additional_manager am
+                           JOIN hr_employee m ON m.id = am.manager_id
+                          WHERE am.employee_id = r.name AND am.active AND m.user_id = %(uid)s)
+              OR EXISTS (SELECT 1 FROM dwr_escalation esc
+                          WHERE esc.employee_report_id = r.id AND NOT esc.processed
+                            AND esc.created_by = %(uid)s))
+    """,
+    'support.staff': """
+        FROM support_staff r
+        JOIN hr_employee emp ON emp.id = r.name
+   LEFT JOIN hr_employee parent ON parent.id = emp.parent_id
+       WHERE r.state = 'submitted'
+         AND (%(director)s OR parent.user_id = %(uid)s)
+    """,
+}
+
+# Users whose counters the current transaction invalidated (None for everybody), dropped after
+# the commit
+_STALE_KEY = 'dwr.pending.counter.stale'
+
+
+def _drop_counters(registry, user_ids):
+    """Delete the counters of ``user_ids`` and of directors in a transaction of their own"""
+    try:
+        with registry.cursor() as cr:
+            if None in user_ids:
+                cr.execute("DELETE FROM dwr_pending_counter")
+            else:
+                cr.execute("DELETE FROM dwr_pending_counter WHERE is_director OR user_id = ANY(%s)",
+                           (list(user_ids),))
+    except psycopg2.Error:
+        # Another transaction dropped the same rows first; the rest expires with the TTL
+        _logger.debug('DWR Pending Counter: could not drop the counters of %s', user_ids, exc_info=True)
+
+
+class DWRPendingCounter(models.Model):
+    """Per-user cache of the number of submitted reports awaiting the user's approval.
+
+    A row is computed on first lookup and deleted whenever a change may affect it (state
+    changes, reporting manager changes, escalations, additional managers). The rows are deleted
+    after the commit of the change, so concurrent submits never delete the same rows in their
+    own transactions; until then the changing transaction ignores them. Rows also expire
+    after ``daily_work_report.pending_counter_ttl`` seconds (default 900) to pick up org chart
+    changes.
+    """
+    _name = 'dwr.pending.counter'
+    _description = 'DWR Pending Approval Counter'
+    _log_access = False
+
+    user_id = fields.Many2one('res.users', string='User', required=True, readonly=True, ondelete='cascade')
+    employee_report_count = fields.Integer(string='Pending Daily Work Reports', readonly=True)
+    support_staff_count = fields.Integer(string='Pending Support Staff Reports', readonly=True)
+    is_director = fields.Boolean(string='Director', readonly=True)
+    computed_at = fields.Datetime(string='Computed On', readonly=True)
+
+    _sql_constraints = [
+        ('user_uniq', 'unique(user_id)', 'Only one counter per user.'),
+    ]
+
+    @api.model
+    def _pending_params(self):
+        return {
+            'uid': self.env.uid,
+            'director': self.env.user.has_group('daily_work_report.group_directors'),
+        }
+
+    @api.model
+    def get_pending_counts(self):
+        """Counts for the systray badge: one lookup in the cache table when it is warm"""
+        user = self.env.user
+        ttl = int(self.env['ir.config_parameter'].sudo().get_param('daily_work_report.pending_counter_ttl', 900))
+        self.env.cr.execute("""
+            SELECT employee_report_count, support_staff_count
+              FROM dwr_pending_counter
+             WHERE user_id = %s AND computed_at > (now() at time zone 'UTC') - make_interval(secs => %s)
+        """, (user.id, ttl))
+        row = self.env.cr.fetchone()
+        stale = self.env.cr.postcommit.data.get(_STALE_KEY)
+        if stale and (None in stale or user.id in stale or self._pending_params()['director']):
+            row = None
+        if row is None:
+            row = self._compute_counts()
+        return {
+            'employee_report': row[0],
+            'support_staff': row[1],
+            'is_approver': any(user.has_group(group) for group in APPROVER_GROUPS) or any(row),
+        }
+
+    @api.model
+    def _compute_counts(self):
+        params = self._pending_params()
+        self.env['employee.report'].flush_model(['state', 'name', 'reporting_manager_id'])
+        self.env['support.staff'].flush_model(['state', 'name'])
+        self.env['dwr.escalation'].flush_model()
+        self.env['employee.report.approval'].flush_model()
+        self.env.cr.execute("""
+            INSERT INTO dwr_pending_counter
+                (user_id, employee_report_count, support_staff_count, is_director, computed_at)
+            VALUES (%%(uid)s, (SELECT count(*) %s), (SELECT count(*) %s), %%(director)s, (now() at time zone 'UTC'))
+            ON CONFLICT (user_id) DO UPDATE SET
+                employee_report_count = EXCLUDED.employee_report_count,
+                support_staff_count = EXCLUDED.support_staff_count,
+                is_director = EXCLUDED.is_director,
+                computed_at = EXCLUDED.computed_at
+            RETURNING employee_report_count, support_staff_count
+        """ % (_PENDING_SQL['employee.report'], _PENDING_SQL['support.staff']), params)
+        return self.env.cr.fetchone()
+
+    @api.model
+    def action_open_pending(self, model):
+        """Open the reports of ``model`` counted by the badge"""
+        if model not in _PENDING_SQL:
+            return False
+        self.env[model].flush_model()
+        self.env.cr.execute("SELECT r.id %s" % _PENDING_SQL[model], self._pending_params())
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Awaiting My Approval'),
+            'res_model': model,
+            'view_mode': 'tree,form',
+            'views': [(False, 'list'), (False, 'form')],
+            'domain': [('id', 'in', [row[0] for row in self.env.cr.fetchall()])],
+        }
+
+    @api.model
+    def _invalidate(self, users=None):
+        """Drop the cached counters of ``users`` and of directors (who see every report), or
+        of everybody when ``users`` is None, once the transaction is committed"""
+        postcommit = self.env.cr.postcommit
+        stale = postcommit.data.get(_STALE_KEY)
+        if stale is None:
+            stale = postcommit.data[_STALE_KEY] = set()
+            registry = self.env.registry
+            postcommit.add(lambda: _drop_counters(registry, postcommit.data.pop(_STALE_KEY, set())))
+        if users is None:
+            stale.add(None)
+        else:
+            stale.update(users.ids)
+
+    @api.model
+    def _invalidate_reports(self, reports):
+        """Drop the counters of everybody who may approve ``reports``"""
+        reports = reports.sudo()
+        users = reports.name.parent_id.user_id
+        if reports._name == 'employee.report':
+            users |= reports.reporting_manager_id.user_id
+            users |= self.env['employee.additional.manager'].sudo().search([
+                ('employee_id', 'in', reports.name.ids)]).manager_id.user_id
+            users |= self.env['dwr.escalation'].sudo().search([
+                ('employee_report_id', 'in', reports.ids), ('processed', '=', False)]).created_by
+        self._invalidate(users)
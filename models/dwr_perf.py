@@ -0,0 +1,137 @@
+import functools
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+
+def perf_tracked(name=None):
+    """Record wall time, SQL query count and SQL time of a model method in ``dwr.perf.sample``.
+
+    Instrumentation is off unless the ``daily_work_report.perf_instrumentation`` system
+    parameter is set. When ``daily_work_report.profile_user_id`` holds the id of the calling
+    user, the call is also captured by Odoo's profiler and saved as an ``ir.profile`` record.
+    """
+    def decorator(method):
+        action = name or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            params = self.env['ir.config_parameter'].sudo()
+            enabled = params.get_param('daily_work_report.perf_instrumentation')
+            profile_uid = params.get_param('daily_work_report.profile_user_id')
+            profiling = bool(profile_uid) and profile_uid == str(self.env.uid)
+            if not enabled and not profiling:
+                return method(self, *args, **kwargs)
+
+            cr = self.env.cr
+            thread = threading.current_thread()
+            # Odoo only accumulates SQL time on threads that carry these counters (HTTP workers)
+            owns_counters = not hasattr(thread, 'query_time')
+            if owns_counters:
+                thread.query_count = 0
+                thread.query_time = 0.0
+            start_sql_time = thread.query_time
+            start_count = cr.sql_log_count
+            start = time.perf_counter()
+            try:
+                if profiling:
+                    from odoo.tools.profiler import Profiler
+                    with Profiler(description='DWR %s (%s)' % (action, self._name), db=cr.dbname):
+                        result = method(self, *args, **kwargs)
+                else:
+                    result = method(self, *args, **kwargs)
+                self.env.flush_all()
+                duration = time.perf_counter() - start
+                query_count = cr.sql_log_count - start_count
+                sql_time = thread.query_time - start_sql_time
+            finally:
+                if owns_counters:
+                    del thread.query_count
+                    del thread.query_time
+            if enabled:
+                self.env['dwr.perf.sample']._record(action, self._name, len(self), duration, query_count, sql_time)
+            return result
+        return wrapper
+    return decorator
+
+
+class DWRPerfSample(models.Model):
+    _name = 'dwr.perf.sample'
+    _description = 'DWR Performance Sample'
+    _order = 'id desc'
+    _log_access = False
+
+    action = fields.Char(string='Action', required=True, index=True, readonly=True)
+    model = fields.Char(string='Model', readonly=True)
+    record_count = fields.Integer(string='Records', readonly=True)
+    duration_ms = fields.Float(string='Wall Time (ms)', digits=(16, 2), readonly=True)
+    query_count = fields.Integer(string='SQL Queries', readonly=True)
+    sql_time_ms = fields.Float(string='SQL Time (ms)', digits=(16, 2), readonly=True)
+    user_id = fields.Many2one('res.users', string='User', readonly=True)
+    create_date = fields.Datetime(string='Recorded On', readonly=True, index=True)
+
+    @api.model
+    def _record(self, action, model, record_count, duration, query_count, sql_time):
+        """Insert one sample with a single statement, bypassing the ORM overhead"""
+        self.env.cr.execute("""
+            INSERT INTO dwr_perf_sample
+                (action, model, record_count, duration_ms, query_count, sql_time_ms, user_id, create_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, (now() at time zone 'UTC'))
+        """, (action, model, record_count, duration * 1000.0, query_count, sql_time * 1000.0, self.env.uid))
+
+    @api.autovacuum
+    def _gc_samples(self):
+        """Keep a rolling window of ``daily_work_report.perf_retention_days`` (default 7) days"""
+        days = int(self.env['ir.config_parameter'].sudo().get_param('daily_work_report.perf_retention_days', 7))
+        cutoff = fields.Datetime.now() - timedelta(days=days)
+        self.env.cr.execute("DELETE FROM dwr_perf_sample WHERE create_date < %s", (cutoff,))
+        _logger.info('DWR Perf: removed %s samples older than %s', self.env.cr.rowcount, cutoff)
+
+
+class DWRPerfStat(models.Model):
+    _name = 'dwr.perf.stat'
+    _description = 'DWR Performance Statistics'
+    _auto = False
+    _order = 'p95_duration_ms desc'
+    _rec_name = 'action'
+
+    action = fields.Char(string='Action', readonly=True)
+    sample_count = fields.Integer(string='Samples', readonly=True)
+    avg_duration_ms = fields.Float(string='Avg (ms)', digits=(16, 2), readonly=True)
+    p50_duration_ms = fields.Float(string='p50 (ms)', digits=(16, 2), readonly=True)
+    p95_duration_ms = fields.Float(string='p95 (ms)', digits=(16, 2), readonly=True)
+    p99_duration_ms = fields.Float(string='p99 (ms)', digits=(16, 2), readonly=True)
+    max_duration_ms = fields.Float(string='Max (ms)', digits=(16, 2), readonly=True)
+    avg_query_count = fields.Float(string='Avg Queries', digits=(16, 1), readonly=True)
+    p95_query_count = fields.Float(string='p95 Queries', digits=(16, 1), readonly=True)
+    avg_sql_time_ms = fields.Float(string='Avg SQL (ms)', digits=(16, 2), readonly=True)
+    p95_sql_time_ms = fields.Float(string='p95 SQL (ms)', digits=(16, 2), readonly=True)
+    last_sample = fields.Datetime(string='Last Sample', readonly=True)
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW dwr_perf_stat AS (
+                SELECT
+                    min(id) AS id,
+                    action,
+                    count(*) AS sample_count,
+                    avg(duration_ms) AS avg_duration_ms,
+                    percentile_cont(0.50) WITHIN GROUP (ORDER BY duration_ms) AS p50_duration_ms,
+                    percentile_cont(0.95) WITHIN GROUP (ORDER BY duration_ms) AS p95_duration_ms,
+                    percentile_cont(0.99) WITHIN GROUP (ORDER BY duration_ms) AS p99_duration_ms,
+                    max(duration_ms) AS max_duration_ms,
+                    avg(query_count) AS avg_query_count,
+                    percentile_cont(0.95) WITHIN GROUP (ORDER BY query_count) AS p95_query_count,
+                    avg(sql_time_ms) AS avg_sql_time_ms,
+                    percentile_cont(0.95) WITHIN GROUP (ORDER BY sql_time_ms) AS p95_sql_time_ms,
+                    max(create_date) AS last_sample
+                FROM dwr_perf_sample
+                GROUP BY action
+            )
+        """)
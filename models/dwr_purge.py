@@ -0,0 +1,95 @@
+import logging
+import threading
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from .dwr_perf import perf_tracked
+
+_logger = logging.getLogger(__name__)
+
+
+class DWRPurgeLog(models.Model):
+    _name = 'dwr.purge.log'
+    _description = 'DWR Retention Purge Log'
+    _order = 'run_date desc, id desc'
+
+    run_date = fields.Datetime(string='Run On', required=True, default=fields.Datetime.now, readonly=True)
+    table_name = fields.Char(string='Table', required=True, readonly=True)
+    cutoff = fields.Datetime(string='Purged Before', readonly=True)
+    purged_count = fields.Integer(string='Rows Purged', readonly=True)
+    size_before = fields.Integer(string='Size Before (KB)', readonly=True)
+    size_after = fields.Integer(string='Size After (KB)', readonly=True)
+
+    # Module models whose notification mails are subject to retention
+    MAIL_MODELS = ('employee.report', 'support.staff')
+
+    @api.model
+    def _get_table_size(self, table):
+        """Return the total on-disk size of ``table`` (including indexes and toast) in KB"""
+        self.env.cr.execute("SELECT pg_total_relation_size(%s)", (table,))
+        return (self.env.cr.fetchone()[0] or 0) // 1024
+
+    @api.model
+    def _purge_in_batches(self, model_name, domain, batch_size, auto_commit):
+        """Unlink records matching ``domain`` in chunks of ``batch_size`` and return the count"""
+        Model = self.env[model_name].sudo()
+        total = 0
+        while True:
+            records = Model.search(domain, limit=batch_size, order='id')
+            if not records:
+                break
+            total += len(records)
+            records.unlink()
+            if auto_commit:
+                self.env.cr.commit()
+        return total
+
+    @api.model
+    @perf_tracked('dwr.purge.log._cron_purge')
+    def _cron_purge(self):
+        """Purge processed escalations and the module's sent notification mails.
+
+        Retention is read from the ``daily_work_report.escalation_retention_days`` (default 30)
+        and ``daily_work_report.mail_retention_days`` (default 90) system parameters; a value of 0
+        disables the corresponding purge. Rows are deleted in chunks of
+        ``daily_work_report.purge_batch_size`` (default 1000) so no single transaction holds
+        long locks, and one ``dwr.purge.log`` row per table records the outcome.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        batch_size = int(params.get_param('daily_work_report.purge_batch_size', 1000))
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        now = fields.Datetime.now()
+
+        targets = []
+        escalation_days = int(params.get_param('daily_work_report.escalation_retention_days', 30))
+        if escalation_days > 0:
+            cutoff = now - timedelta(days=escalation_days)
+            targets.append(('dwr.escalation', cutoff, [
+                ('processed', '=', True),
+                ('create_date', '<', cutoff),
+            ]))
+        mail_days = int(params.get_param('daily_work_report.mail_retention_days', 90))
+        if mail_days > 0:
+            cutoff = now - timedelta(days=mail_days)
+            targets.append(('mail.mail', cutoff, [
+                ('model', 'in', self.MAIL_MODELS),
+                ('state', 'in', ['sent', 'exception', 'cancel']),
+                ('create_date', '<', cutoff),
+            ]))
+
+        for model_name, cutoff, domain in targets:
+            table = self.env[model_name]._table
+            size_before = self._get_table_size(table)
+            purged = self._purge_in_batches(model_name, domain, batch_size, auto_commit)
+            self.create({
+                'table_name': table,
+                'cutoff': cutoff,
+                'purged_count': purged,
+                'size_before': size_before,
+                'size_after': self._get_table_size(table),
+            })
+            _logger.info('DWR Purge: removed %s rows from %s older than %s', purged, table, cutoff)
+            if auto_commit:
+                self.env.cr.commit()
+        return True
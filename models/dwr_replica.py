@@ -0,0 +1,114 @@
+import logging
+import time
+from contextlib import contextmanager
+
+import psycopg2
+
+from odoo import api, models, sql_db
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+# Seconds during which the primary is used without retrying a replica that could not be reached
+REPLICA_RETRY_DELAY = 60
+_replica_unavailable_until = {}
+
+# Replication lag in seconds; a standby that replayed everything it received is up to date even
+# when the primary has been idle, and a server that is not a standby has no lag
+_LAG_SQL = """
+    SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END::float8
+"""
+
+
+class DWRReplica(models.AbstractModel):
+    """Routing of read-only report workloads to a read replica.
+
+    The replica is the database (a name or a ``postgresql://`` URI) set in the ``dwr_replica_uri``
+    option of the server configuration. It is used while its replication lag stays under
+    ``daily_work_report.replica_max_lag`` seconds (default 30); otherwise, and when the option is
+    not set or the replica cannot be reached, the workload runs on the primary database.
+    """
+    _name = 'dwr.replica'
+    _description = 'DWR Read Replica'
+
+    @api.model
+    def _open_replica_cursor(self, workload):
+        """Read-only cursor on the replica, or None when ``workload`` must run on the primary"""
+        uri = config.get('dwr_replica_uri')
+        if not uri or _replica_unavailable_until.get(uri, 0) > time.monotonic():
+            return None
+        max_lag = float(self.env['ir.config_parameter'].sudo().get_param('daily_work_report.replica_max_lag', 30))
+        cr = None
+        try:
+            cr = sql_db.db_connect(uri, allow_uri=True).cursor()
+            cr.execute("SET TRANSACTION READ ONLY")
+            cr.execute(_LAG_SQL)
+            lag = cr.fetchone()[0]
+        except psycopg2.Error as e:
+            if cr is not None:
+                cr.close()
+            _replica_unavailable_until[uri] = time.monotonic() + REPLICA_RETRY_DELAY
+            _logger.warning('DWR Replica: replica unavailable (%s), running %s on the primary', e, workload)
+            return None
+        if lag > max_lag:
+            cr.close()
+            _logger.info('DWR Replica: lag of %.1fs over %ss, running %s on the primary', lag, max_lag, workload)
+            return None
+        return cr
+
+    @api.model
+    @contextmanager
+    def _read_env(self, workload):
+        """Environment to run the read-only ``workload`` in: the current one bound to a replica
+        cursor when the replica can be used, else ``self.env``.
+
+        Nothing may be written through it, and data written by the current transaction is not
+        visible on the replica.
+        """
+        cr = self._open_replica_cursor(workload)
+        if cr is None:
+            yield self.env
+            return
+        try:
+            yield self.env(cr=cr)
+        finally:
+            cr.close()
+
+
+class DWRReplicaMixin(models.AbstractModel):
+    """Run the exports and analytics reads of a model on the read replica.
+
+    Exports use the replica whenever it is available. Grouped reads (pivot, graph, grouped
+    lists) and list reads use it for models setting ``_dwr_replica_reads`` (read-only
+    reporting models) and under the ``dwr_replica`` context key (analytics actions).
+    """
+    _name = 'dwr.replica.mixin'
+    _description = 'DWR Read Replica Mixin'
+    _dwr_replica_reads = False
+
+    def _use_replica(self):
+        return self._dwr_replica_reads or self.env.context.get('dwr_replica')
+
+    @api.model
+    def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
+        if not self._use_replica():
+            return super().read_group(domain, fields, groupby, offset=offset, limit=limit, orderby=orderby, lazy=lazy)
+        with self.env['dwr.replica']._read_env('%s.read_group' % self._name) as env:
+            return super(DWRReplicaMixin, self.with_env(env)).read_group(
+                domain, fields, groupby, offset=offset, limit=limit, orderby=orderby, lazy=lazy)
+
+    @api.model
+    def web_search_read(self, domain, specification, offset=0, limit=None, order=None, count_limit=None):
+        if not self._use_replica():
+            return super().web_search_read(
+                domain, specification, offset=offset, limit=limit, order=order, count_limit=count_limit)
+        with self.env['dwr.replica']._read_env('%s.web_search_read' % self._name) as env:
+            return super(DWRReplicaMixin, self.with_env(env)).web_search_read(
+                domain, specification, offset=offset, limit=limit, order=order, count_limit=count_limit)
+
+    def export_data(self, fields_to_export):
+        with self.env['dwr.replica']._read_env('%s.export_data' % self._name) as env:
+            return super(DWRReplicaMixin, self.with_env(env)).export_data(fields_to_export)
@@ -0,0 +1,288 @@
+import csv
+import gzip
+import itertools
+import logging
+import os
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from .dwr_perf import perf_tracked
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+_logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+    'csv': '.csv.gz',
+}
+# Re-read changes made this long before the previous run, to catch transactions that were
+# still running when it read the tables
+WATERMARK_OVERLAP = timedelta(hours=1)
+
+_MINUTES_SQL = """CASE WHEN %(col)s ~ '^[0-9]{1,2}:[0-5][0-9]$'
+                       THEN split_part(%(col)s, ':', 1)::int * 60 + split_part(%(col)s, ':', 2)::int END"""
+
+# Days of the changed reports and lines, of the deleted or archived ones (their tombstones) and
+# the days that reports or lines moved away from
+_REPORT_DAYS_SQL = """
+    SELECT r.date FROM employee_report r WHERE r.write_date > %(since)s AND r.date IS NOT NULL
+    UNION
+    SELECT r.date FROM report l JOIN employee_report r ON r.id = l.employee_id
+     WHERE l.write_date > %(since)s AND r.date IS NOT NULL
+    UNION
+    SELECT t.res_date FROM dwr_deletion_log t
+     WHERE t.res_model IN ('employee.report', 'report') AND t.deleted_at > %(since)s AND t.res_date IS NOT NULL
+    UNION
+    SELECT s.day FROM dwr_snapshot_stale_day s WHERE s.res_model = 'employee.report' AND s.logged_at > %(since)s
+"""
+
+# Denormalized datasets: the days changed since a watermark (all days when there is none),
+# the rows of a list of days sorted by day (the day first), and the typed columns of a row
+DATASETS = {
+    'employee_report': {
+        'days': _REPORT_DAYS_SQL,
+        'all_days': "SELECT DISTINCT date FROM employee_report WHERE date IS NOT NULL",
+        'rows': """
+            SELECT r.date, r.id, r.name, e.name, r.department_id, d.complete_name,
+                   r.reporting_manager_id, rm.name, r.state, r.submitted_time, r.approved_time,
+                   coalesce(r.total_work_minutes, 0), %(expected)s,
+                   coalesce(l.line_count, 0), coalesce(l.completed_line_count, 0),
+                   coalesce(r.has_concerns, FALSE), coalesce(r.anomaly_under_hours, FALSE),
+                   coalesce(r.anomaly_fixed_hours, FALSE), coalesce(r.anomaly_repeated_lines, FALSE)
+              FROM employee_report r
+         LEFT JOIN hr_employee e ON e.id = r.name
+         LEFT JOIN hr_department d ON d.id = r.department_id
+         LEFT JOIN hr_employee rm ON rm.id = r.reporting_manager_id
+         LEFT JOIN LATERAL (
+                   SELECT count(*) AS line_count,
+                          count(*) FILTER (WHERE lower(trim(s.name)) = 'completed') AS completed_line_count
+                     FROM report line
+                     JOIN job_status s ON s.id = line.current_status
+                    WHERE line.employee_id = r.id
+                   ) l ON TRUE
+             WHERE r.date = ANY(%%(days)s)
+          ORDER BY r.date, r.id
+        """ % {'expected': _MINUTES_SQL % {'col': 'r.total_work_hours'}},
+        'columns': [
+            ('date', 'date'), ('report_id', 'int'), ('employee_id', 'int'), ('employee', 'str'),
+            ('department_id', 'int'), ('department', 'category'),
+            ('reporting_manager_id', 'int'), ('reporting_manager', 'category'), ('state', 'category'),
+            ('submitted_time', 'datetime'), ('approved_time', 'datetime'),
+            ('work_minutes', 'minutes'), ('expected_minutes', 'minutes'),
+            ('line_count', 'int'), ('completed_line_count', 'int'),
+            ('has_concerns', 'bool'), ('anomaly_under_hours', 'bool'),
+            ('anomaly_fixed_hours', 'bool'), ('anomaly_repeated_lines', 'bool'),
+        ],
+    },
+    'report_line': {
+        'days': _REPORT_DAYS_SQL,
+        'all_days': "SELECT DISTINCT date FROM employee_report WHERE date IS NOT NULL",
+        'rows': """
+            SELECT r.date, l.id, l.employee_id, l.sequence, r.name, e.name, d.complete_name, r.state,
+                   l.project_id, l.task_id, l.activity, %(minutes)s, s.name,
+                   l.to_work_on, l.expected_close_date
+              FROM report l
+              JOIN employee_report r ON r.id = l.employee_id
+         LEFT JOIN hr_employee e ON e.id = r.name
+         LEFT JOIN hr_department d ON d.id = r.department_id
+         LEFT JOIN job_status s ON s.id = l.current_status
+             WHERE r.date = ANY(%%(days)s)
+          ORDER BY r.date, l.employee_id, l.sequence, l.id
+        """ % {'minutes': _MINUTES_SQL % {'col': 'l.time_taken'}},
+        'columns': [
+            ('date', 'date'), ('line_id', 'int'), ('report_id', 'int'), ('sequence', 'int'),
+            ('employee_id', 'int'), ('employee', 'str'), ('department', 'category'), ('report_state', 'category'),
+            ('project', 'category'), ('task', 'str'), ('activity', 'str'), ('minutes', 'minutes'),
+            ('status', 'category'), ('to_work_on', 'str'), ('expected_close_date', 'date'),
+        ],
+    },
+    'concern_action': {
+        # Days of the changed concerns, of the deleted ones and of those whose report was deleted
+        'days': """
+            SELECT create_date::date FROM concern_action WHERE write_date > %(since)s
+            UNION
+            SELECT day FROM dwr_snapshot_stale_day WHERE res_model = 'concern.action' AND logged_at > %(since)s
+        """,
+        'all_days': "SELECT DISTINCT create_date::date FROM concern_action WHERE create_date IS NOT NULL",
+        'rows': """
+            SELECT c.create_date::date, c.id, c.create_date, c.employee_id, e.name, d.complete_name,
+                   c.employee_report_id, r.date, c.concern_type, c.state, c.priority,
+                   c.assigned_to, a.name, c.action_date, c.resolved_date
+              FROM concern_action c
+         LEFT JOIN hr_employee e ON e.id = c.employee_id
+         LEFT JOIN hr_department d ON d.id = e.department_id
+         LEFT JOIN employee_report r ON r.id = c.employee_report_id
+         LEFT JOIN hr_employee a ON a.id = c.assigned_to
+             WHERE c.create_date::date = ANY(%(days)s)
+          ORDER BY c.create_date::date, c.id
+        """,
+        'columns': [
+            ('date', 'date'), ('concern_id', 'int'), ('create_date', 'datetime'),
+            ('employee_id', 'int'), ('employee', 'str'), ('department', 'category'),
+            ('report_id', 'int'), ('report_date', 'date'), ('concern_type', 'category'),
+            ('state', 'category'), ('priority', 'category'),
+            ('assigned_to_id', 'int'), ('assigned_to', 'category'), ('action_date', 'date'), ('resolved_date', 'date'),
+        ],
+    },
+}
+
+
+def _arrow_table(columns, rows):
+    """Typed Arrow table of ``rows``: minutes as 32-bit integers, statuses and other repeated
+    labels dictionary-encoded"""
+    types = {
+        'int': pa.int64(),
+        'minutes': pa.int32(),
+        'str': pa.string(),
+        'category': pa.string(),
+        'date': pa.date32(),
+        'datetime': pa.timestamp('us'),
+        'bool': pa.bool_(),
+    }
+    arrays = []
+    for (name, kind), column in zip(columns, zip(*rows)):
+        array = pa.array(column, type=types[kind])
+        arrays.append(array.dictionary_encode() if kind == 'category' else array)
+    return pa.Table.from_arrays(arrays, names=[name for name, _kind in columns])
+
+
+def _write_file(path, columns, rows, fmt):
+    """Write ``rows`` to ``path`` atomically"""
+    tmp_path = path + '.tmp'
+    if fmt == 'csv':
+        with gzip.open(tmp_path, 'wt', newline='') as fh:
+            writer = csv.writer(fh)
+            writer.writerow([name for name, _kind in columns])
+            writer.writerows(rows)
+    elif fmt == 'arrow':
+        feather.write_feather(_arrow_table(columns, rows), tmp_path, compression='zstd')
+    else:
+        pq.write_table(_arrow_table(columns, rows), tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+class DWRSnapshotExporter(models.AbstractModel):
+    """Incremental columnar snapshot of the report data for offline analytics.
+
+    Each dataset is written under ``<daily_work_report.snapshot_dir>/<dataset>/month=YYYY-MM/``
+    as one file per day. A run only rewrites the days with rows changed since the previous run
+    (``daily_work_report.snapshot_watermark``), usually just the new day.
+    """
+    _name = 'dwr.snapshot.exporter'
+    _description = 'DWR Analytics Snapshot'
+
+    @api.model
+    def _get_snapshot_format(self):
+        fmt = self.env['ir.config_parameter'].sudo().get_param('daily_work_report.snapshot_format', 'parquet')
+        if fmt not in SNAPSHOT_FORMATS:
+            _logger.warning('DWR Snapshot: unknown format %r, using parquet', fmt)
+            fmt = 'parquet'
+        if fmt != 'csv' and pa is None:
+            _logger.info('DWR Snapshot: pyarrow is not installed, writing compressed CSV instead of %s', fmt)
+            fmt = 'csv'
+        return fmt
+
+    @api.model
+    @perf_tracked('dwr.snapshot.exporter._cron_export_snapshot')
+    def _cron_export_snapshot(self):
+        """Write the days changed since the last run; disabled while ``daily_work_report.snapshot_dir``
+        is not set"""
+        params = self.env['ir.config_parameter'].sudo()
+        directory = params.get_param('daily_work_report.snapshot_dir')
+        if not directory:
+            return False
+        watermark = params.get_param('daily_work_report.snapshot_watermark')
+        since = fields.Datetime.to_datetime(watermark) - WATERMARK_OVERLAP if watermark else None
+        self.env.cr.execute("SELECT now() at time zone 'UTC'")
+        started = self.env.cr.fetchone()[0]
+        self._export_snapshot(directory, self._get_snapshot_format(), since)
+        params.set_param('daily_work_report.snapshot_watermark', fields.Datetime.to_string(started))
+        # The next run only reads the days logged after its own overlap
+        self.env.cr.execute("DELETE FROM dwr_snapshot_stale_day WHERE logged_at < %s",
+                            (started - WATERMARK_OVERLAP,))
+        return True
+
+    @api.model
+    def _export_snapshot(self, directory, fmt, since=None):
+        """Write every day with changes after ``since`` (every day when None) of each dataset to
+        ``directory``, reading on the read replica when one is available; return the number of
+        files written per dataset"""
+        self.env['employee.report'].flush_model()
+        self.env['report'].flush_model()
+        self.env['concern.action'].flush_model()
+        stats = {}
+        with self.env['dwr.replica']._read_env('dwr.snapshot.exporter._export_snapshot') as env:
+            cr = env.cr
+            for dataset, spec in DATASETS.items():
+                if since is None:
+                    cr.execute(spec['all_days'])
+                else:
+                    cr.execute(spec['days'], {'since': since})
+                days = sorted(row[0] for row in cr.fetchall())
+                written = 0
+                # One query per month keeps the memory bounded on the first (full) run
+                for _month, month_days in itertools.groupby(days, key=lambda day: (day.year, day.month)):
+                    month_days = list(month_days)
+                    cr.execute(spec['rows'], {'days': month_days})
+                    rows_by_day = {
+                        day: list(day_rows)
+                        for day, day_rows in itertools.groupby(cr.fetchall(), key=lambda row: row[0])
+                    }
+                    for day in month_days:
+                        written += self._write_partition(
+                            directory, dataset, day, spec['columns'], rows_by_day.get(day, []), fmt)
+                stats[dataset] = written
+        _logger.info('DWR Snapshot: wrote %s files (%s) to %s', stats, fmt, directory)
+        return stats
+
+    @api.model
+    def _write_partition(self, directory, dataset, day, columns, rows, fmt):
+        """Write the file of ``day`` and drop the copies of that day in other formats; a day
+        without rows left loses its file. Return the number of files written."""
+        partition = os.path.join(directory, dataset, 'month=%s' % day.strftime('%Y-%m'))
+        os.makedirs(partition, exist_ok=True)
+        basename = os.path.join(partition, day.isoformat())
+        for other_fmt, extension in SNAPSHOT_FORMATS.items():
+            if (other_fmt != fmt or not rows) and os.path.exists(basename + extension):
+                os.remove(basename + extension)
+        if not rows:
+            return 0
+        _write_file(basename + SNAPSHOT_FORMATS[fmt], columns, rows, fmt)
+        return 1
+
+
+class DWRSnapshotStaleDay(models.Model):
+    """Days to rewrite in the next snapshot although no row of theirs changed, e.g. the previous
+    day of a report whose date moved or the day of a deleted concern"""
+    _name = 'dwr.snapshot.stale.day'
+    _description = 'DWR Snapshot Stale Day'
+    _order = 'id'
+    _log_access = False
+
+    res_model = fields.Char(string='Model', required=True, readonly=True, default='employee.report',
+                            help="Model whose datasets rewrite the day")
+    day = fields.Date(string='Day', required=True, readonly=True)
+    logged_at = fields.Datetime(string='Logged On', readonly=True)
+
+    @api.model
+    def _log_days(self, days, res_model='employee.report'):
+        days = sorted({day for day in days if day})
+        if days:
+            self.env.cr.execute("""
+                INSERT INTO dwr_snapshot_stale_day (res_model, day, logged_at)
+                SELECT %s, unnest(%s::date[]), (now() at time zone 'UTC')
+            """, (res_model, days))
+
+    @api.model
+    def _log_concern_days(self, concerns):
+        """Log the days of ``concerns`` in the ``concern_action`` dataset (the day they were raised)"""
+        self._log_days([concern.create_date.date() for concern in concerns if concern.create_date],
+                       res_model='concern.action')
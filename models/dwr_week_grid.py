@@ -0,0 +1,186 @@
+from datetime import timedelta
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+# Report and line fields exchanged with the weekly grid
+GRID_REPORT_FIELDS = ['date', 'state', 'reporting_manager_id', 'total_work_hours', 'actual_work_hours',
+                      'is_half_day', 'reject_reason']
+GRID_LINE_FIELDS = ['employee_id', 'sequence', 'project_id', 'task_id', 'activity', 'time_taken',
+                    'current_status', 'to_work_on', 'expected_close_date', 'remarks_if_any']
+# Line values the grid may set; the report of a line is given by the day it is in
+GRID_LINE_VALUES = set(GRID_LINE_FIELDS) - {'employee_id'}
+# States of the reports the grid can edit
+EDITABLE_STATES = ('draft', 'rejected')
+
+_DEFERRED_KEY = 'dwr.deferred.constraints'
+
+
+class DWRDeferredConstraintsMixin(models.AbstractModel):
+    """Postpone the Python constraints of a model under the ``dwr_defer_constraints`` context key.
+
+    The records and fields that would have been checked are collected on the cursor and
+    checked together by ``dwr.week.grid._validate_deferred``, once for the whole batch.
+    """
+    _name = 'dwr.deferred.constraints.mixin'
+    _description = 'DWR Deferred Constraints Mixin'
+
+    def _validate_fields(self, field_names, excluded_names=()):
+        if not self.env.context.get('dwr_defer_constraints'):
+            return super()._validate_fields(field_names, excluded_names)
+        deferred = self.env.cr.precommit.data.setdefault(_DEFERRED_KEY, {})
+        ids, names = deferred.setdefault(self._name, (set(), set()))
+        ids.update(self._ids)
+        names.update(field_names)
+
+
+class DWRWeekGrid(models.AbstractModel):
+    """Server side of the weekly grid: an employee's reports and lines of a whole week are
+    loaded with one call and every changed day is saved with another.
+
+    Saving creates the new days in one batch, writes the changed lines and checks the
+    constraints of all the written reports and lines once at the end.
+    """
+    _name = 'dwr.week.grid'
+    _description = 'DWR Weekly Grid'
+
+    @api.model
+    def _grid_days(self, week_start):
+        """Dates shown from ``week_start`` (moved back to its Monday)"""
+        count = int(self.env['ir.config_parameter'].sudo().get_param('daily_work_report.week_grid_days', 6))
+        monday = fields.Date.to_date(week_start)
+        monday -= timedelta(days=monday.weekday())
+        return [monday + timedelta(days=i) for i in range(min(max(count, 5), 7))]
+
+    @api.model
+    def _grid_employee(self, employee_id):
+        employee = self.env['hr.employee'].browse(employee_id) if employee_id else self.env.user.employee_id
+        if not employee:
+            raise UserError(_("Your user is not linked to an employee."))
+        return employee
+
+    @api.model
+    def get_week_grid(self, week_start, employee_id=None):
+        """Reports, lines, statuses and selectable managers of the week of ``week_start``"""
+        employee = self._grid_employee(employee_id)
+        days = self._grid_days(week_start)
+        Report = self.env['employee.report']
+        reports = Report.search([('name', '=', employee.id), ('date', '>=', days[0]), ('date', '<=', days[-1])])
+        report_rows = {row['date']: row for row in reports.read(GRID_REPORT_FIELDS, load=None)}
+        lines_by_report = {}
+        for line in reports.report_ids.read(GRID_LINE_FIELDS, load=None):
+            lines_by_report.setdefault(line['employee_id'], []).append(line)
+        # Selectable managers and expected hours of the missing days, from unsaved reports
+        blanks = {
+            day: Report.new({'name': employee.id, 'date': day})
+            for day in days if day not in report_rows
+        }
+        managers = (reports.available_manager_ids | Report.new({'name': employee.id}).available_manager_ids)
+        grid_days = []
+        for day in days:
+            row = report_rows.get(day)
+            if row:
+                lines = sorted(lines_by_report.get(row['id'], []), key=lambda line: (line['sequence'], line['id']))
+            else:
+                blank = blanks[day]
+                row = {
+                    'id': False,
+                    'date': day,
+                    'state': 'draft',
+                    'reporting_manager_id': employee.parent_id.id,
+                    'total_work_hours': blank.total_work_hours,
+                    'actual_work_hours': '00:00',
+                    'is_half_day': blank.is_half_day,
+                    'reject_reason': False,
+                }
+                lines = []
+            grid_days.append(dict(row, date=fields.Date.to_string(day), editable=row['state'] in EDITABLE_STATES,
+                                  lines=lines))
+        return {
+            'employee': {'id': employee.id, 'name': employee.name},
+            'week_start': fields.Date.to_string(days[0]),
+            'days': grid_days,
+            'managers': [{'id': manager.id, 'name': manager.name} for manager in managers],
+            'statuses': [{'id': status.id, 'name': status.name} for status in self.env['job.status'].search([])],
+        }
+
+    @api.model
+    def save_week_grid(self, week_start, changes, employee_id=None):
+        """Save the changed days of the grid and return the reloaded grid.
+
+        ``changes`` holds one dict per changed day: its ``date``, the ``id`` of its report (False
+        for a new day), an optional ``reporting_manager_id``, the new or changed ``lines`` (with
+        an ``id`` for existing lines) and the ``deleted_line_ids``.
+        """
+        employee = self._grid_employee(employee_id)
+        days = {fields.Date.to_string(day) for day in self._grid_days(week_start)}
+        Report = self.env['employee.report'].with_context(dwr_defer_constraints=True)
+        Line = self.env['report'].with_context(dwr_defer_constraints=True)
+        reports = Report.browse([change['id'] for change in changes if change.get('id')]).exists()
+        reports_by_id = {report.id: report for report in reports}
+
+        new_reports = []
+        new_lines = []
+        line_writes = {}
+        deleted_line_ids = []
+        manager_writes = {}
+        for change in changes:
+            if change['date'] not in days:
+                raise UserError(_("%s is not part of this week.", change['date']))
+            line_vals = [
+                {name: value for name, value in line.items() if name in GRID_LINE_VALUES or name == 'id'}
+                for line in change.get('lines', [])
+            ]
+            if not change.get('id'):
+                new_reports.append({
+                    'name': employee.id,
+                    'date': change['date'],
+                    'reporting_manager_id': change.get('reporting_manager_id') or employee.parent_id.id,
+                    'report_ids': [(0, 0, dict(vals, sequence=vals.get('sequence', index + 1)))
+                                   for index, vals in enumerate(line_vals) if not vals.get('id')],
+                })
+                continue
+            report = reports_by_id.get(change['id'])
+            if not report or report.name != employee or fields.Date.to_string(report.date) != change['date']:
+                raise UserError(_("The report of %s was not found.", change['date']))
+            if report.state not in EDITABLE_STATES:
+                raise UserError(_("The report of %s is already submitted.", change['date']))
+            if 'reporting_manager_id' in change:
+                manager_writes.setdefault(change['reporting_manager_id'] or False, []).append(report.id)
+            for vals in line_vals:
+                line_id = vals.pop('id', False)
+                if line_id:
+                    # Lines saved with the same values share one write
+                    if vals:
+                        line_writes.setdefault(tuple(sorted(vals.items())), []).append(line_id)
+                else:
+                    new_lines.append(dict(vals, employee_id=report.id))
+            deleted_line_ids += change.get('deleted_line_ids', [])
+
+        lines = Line.browse([line_id for line_ids in line_writes.values() for line_id in line_ids]
+                            + deleted_line_ids).exists()
+        for line in lines:
+            if line.employee_id not in reports:
+                raise UserError(_("A line does not belong to the reports of this week."))
+        # Batched: one create per model, one write per distinct manager and per distinct line
+        # values, one unlink
+        if new_reports:
+            Report.create(new_reports)
+        for manager_id, report_ids in manager_writes.items():
+            Report.browse(report_ids).write({'reporting_manager_id': manager_id})
+        if new_lines:
+            Line.create(new_lines)
+        for vals, line_ids in line_writes.items():
+            Line.browse(line_ids).write(dict(vals))
+        Line.browse(deleted_line_ids).exists().unlink()
+        self._validate_deferred()
+        return self.get_week_grid(week_start, employee_id=employee.id)
+
+    @api.model
+    def _validate_deferred(self):
+        """Check the constraints postponed under ``dwr_defer_constraints``, once per model"""
+        deferred = self.env.cr.precommit.data.pop(_DEFERRED_KEY, {})
+        for model_name, (ids, names) in deferred.items():
+            records = self.env[model_name].browse(ids).exists()
+            if records:
+                records._validate_fields(names)
@@ -1,18 +1,23 @@
 import re
 import calendar
 import logging
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError, UserError
 
+from .dwr_monthly_summary import SUMMARY_REPORT_FIELDS
+from .dwr_perf import perf_tracked
+from .report import TIME_TAKEN_RE
+
 _logger = logging.getLogger(__name__)
 
 
 class EmployeeReport(models.Model):
     _name = 'employee.report'
     _description = 'Employee Daily Work Report'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'dwr.change.feed.mixin', 'dwr.replica.mixin',
+                'dwr.org.snapshot.mixin', 'dwr.deferred.constraints.mixin']
     _order = 'date desc'
 
     name = fields.Many2one('hr.employee', string="Employee", 
@@ -20,20 +25,10 @@ class EmployeeReport(models.Model):
     department_id = fields.Many2one('hr.department', string="Department",
                                    default=lambda self: self.env.user.employee_id.department_id, 
                                    readonly=True)
-    branch_id = fields.Many2one('res.partner', string="Branch", 
-                               compute='_compute_branch_id', store=True)
+    branch_id = fields.Many2one('res.partner', string="Branch", readonly=True)
     reporting_manager_id = fields.Many2one('hr.employee', string="Reporting Manager", 
                                           help="Select the specific manager this report is intended for")
 
-    @api.depends('name')
-    def _compute_branch_id(self):
-        for record in self:
-            # Simplified branch computation - can be extended based on company structure
-            if record.name and record.name.company_id:
-                record.branch_id = record.name.company_id.partner_id.id
-            else:
-                record.branch_id = False
-
     # Work report lines
     report_ids = fields.One2many('report', 'employee_id', string="Daily Report", 
                                 default=lambda self: self._default_report_ids())
@@ -65,8 +60,24 @@ class EmployeeReport(models.Model):
     employee_concerns = fields.Text(string="Employee Concerns")
     other_concerns = fields.Text(string="Other Concerns")
     has_concerns = fields.Boolean(string="Has Concerns")
+    concerns_indexed = fields.Boolean(string="Concerns Indexed", readonly=True, copy=False, default=False,
+                                      help="Set once the concern clustering cron has indexed the submitted concerns")
     reject_reason = fields.Text(string='Rejection Reason', tracking=True)
 
+    # Logging patterns scored by the anomaly detection cron (dwr.anomaly.detector)
+    hours_deviation = fields.Float(string='Hours Deviation (%)', readonly=True, copy=False, group_operator='avg',
+                                   help="Logged minutes compared to the expected working hours")
+    hours_streak = fields.Integer(string='Same Hours Streak', readonly=True, copy=False, group_operator='max',
+                                  help="Consecutive reports of the employee logging exactly the same time")
+    lines_repeat_streak = fields.Integer(string='Same Lines Streak', readonly=True, copy=False, group_operator='max',
+                                         help="Consecutive reports of the employee with the same project/task lines")
+    anomaly_under_hours = fields.Boolean(string='Under Hours', readonly=True, copy=False)
+    anomaly_fixed_hours = fields.Boolean(string='Fixed Hours', readonly=True, copy=False)
+    anomaly_repeated_lines = fields.Boolean(string='Repeated Lines', readonly=True, copy=False)
+
+    # Approvers of the submitted report (reporting manager and additional managers)
+    approval_ids = fields.One2many('employee.report.approval', 'report_id', string='Approvals', readonly=True)
+
     # Computed fields for permissions and logic
     is_manager = fields.Boolean(string="Is Manager", compute="_compute_is_manager")
     is_director = fields.Boolean(string='Is Director', compute="_compute_is_manager")
@@ -75,6 +86,25 @@ class EmployeeReport(models.Model):
     available_manager_ids = fields.Many2many('hr.employee', compute='_compute_available_manager_ids')
     is_own_report = fields.Boolean(string="Is Own Report", compute="_compute_is_own_report")
 
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        # Default list order and the "Today's Reports" filter
+        tools.create_index(cr, 'employee_report_date_id_idx', self._table, ['date', 'id'])
+        # Status filters, pending counters and the archive cron (state + date cutoff)
+        tools.create_index(cr, 'employee_report_state_date_idx', self._table, ['state', 'date'])
+        # "My Reports", the own-report rule, per-day uniqueness and the monthly summary
+        tools.create_index(cr, 'employee_report_name_date_idx', self._table, ['name', 'date'])
+        # "Reports to Me", "My Team" and "Pending Team Reports"
+        tools.create_index(cr, 'employee_report_reporting_manager_id_state_idx', self._table,
+                           ['reporting_manager_id', 'state'])
+        # Submitted concerns waiting for the clustering cron
+        tools.create_index(cr, 'employee_report_concerns_pending_idx', self._table, ['id'],
+                           where='has_concerns AND NOT concerns_indexed')
+
+    def _change_feed_children(self):
+        return [self.report_ids]
+
     def _default_report_ids(self):
         """Create default report line for refreshment break"""
         today = date.today()
@@ -151,63 +181,69 @@ class EmployeeReport(models.Model):
     @api.depends('name')
     def _compute_available_manager_ids(self):
         """Compute available managers for employee"""
+        additional_managers = self._get_additional_managers_by_employee()
         for record in self:
             available_managers = []
             if record.name:
                 # Add direct manager
                 if record.name.parent_id:
                     available_managers.append(record.name.parent_id.id)
-                
+
                 # Add additional managers
-                add_managers = self.env['employee.additional.manager'].search([
-                    ('employee_id', '=', record.name.id),
-                    ('active', '=', True)
-                ])
-                for add_manager in add_managers:
-                    available_managers.append(add_manager.manager_id.id)
-            
+                available_managers.extend(additional_managers.get(record.name.id, []))
+
             record.available_manager_ids = available_managers
-            
+
             # Auto-select manager if only one available
             if len(available_managers) == 1 and not record.reporting_manager_id and record.state == 'draft':
                 record.reporting_manager_id = available_managers[0]
 
+    def _get_additional_managers_by_employee(self, user=None):
+        """Return {employee_id: [manager_id, ...]} of active additional managers for the
+        employees of these reports, optionally restricted to managers linked to ``user``."""
+        domain = [('employee_id', 'in', self.name.ids)]
+        if user is not None:
+            domain.append(('manager_id.user_id', '=', user.id))
+        result = {}
+        for employee, manager in self.env['employee.additional.manager']._read_group(
+                domain, ['employee_id', 'manager_id']):
+            result.setdefault(employee.id, []).append(manager.id)
+        return result
+
     @api.depends('name', 'reporting_manager_id')
     def _compute_is_manager(self):
         """Compute user permissions"""
+        user = self.env.user
+        is_director = user.has_group('daily_work_report.group_directors')
+        is_hod = user.has_group('daily_work_report.group_hod')
+        additional_managers = self._get_additional_managers_by_employee(user=user)
+
+        # Reports for which the user is the current escalation target (queued via dwr.escalation)
+        escalated_report_ids = set()
+        if self._origin.ids:
+            escalated_report_ids = {
+                report.id for [report] in self.env['dwr.escalation'].sudo()._read_group([
+                    ('employee_report_id', 'in', self._origin.ids),
+                    ('processed', '=', False),
+                    ('created_by', '=', user.id),
+                ], ['employee_report_id'])
+            }
+
         for record in self:
             # Check if user is direct manager
-            is_direct_manager = record.name.parent_id.user_id == self.env.user
-            
+            is_direct_manager = record.name.parent_id.user_id == user
+
             # Check if user is the specific reporting manager
-            is_reporting_manager = False
-            if record.reporting_manager_id and record.reporting_manager_id.user_id == self.env.user:
-                is_reporting_manager = True
-                
+            is_reporting_manager = bool(record.reporting_manager_id) and record.reporting_manager_id.user_id == user
+
             # Check if user is an additional manager
-            is_additional_manager = False
-            if record.name:
-                additional_manager_recs = self.env['employee.additional.manager'].search([
-                    ('employee_id', '=', record.name.id),
-                    ('manager_id.user_id', '=', self.env.user.id)
-                ])
-                is_additional_manager = bool(additional_manager_recs)
-            
-            # Check if user is current escalation target (next-level manager queued via dwr.escalation)
-            is_escalation_target = False
-            try:
-                esc = self.env['dwr.escalation'].search([
-                    ('employee_report_id', '=', record.id),
-                    ('processed', '=', False),
-                    ('created_by', '=', self.env.user.id)
-                ], limit=1)
-                is_escalation_target = bool(esc)
-            except Exception:
-                is_escalation_target = False
+            is_additional_manager = record.name.id in additional_managers
+
+            is_escalation_target = record._origin.id in escalated_report_ids
 
             record.is_manager = is_direct_manager or is_reporting_manager or is_additional_manager or is_escalation_target
-            record.is_director = self.env.user.has_group('daily_work_report.group_directors')
-            record.is_hod = self.env.user.has_group('daily_work_report.group_hod')
+            record.is_director = is_director
+            record.is_hod = is_hod
 
     @api.depends('name')
     def _compute_is_own_report(self):
@@ -215,324 +251,492 @@ class EmployeeReport(models.Model):
         for record in self:
             record.is_own_report = record.name.user_id == self.env.user if record.name else False
 
-    @api.constrains('name', 'date', 'reporting_manager_id')
+    @api.constrains('name', 'date')
     def _check_unique_record_per_day(self):
-        """Ensure one report per employee per day per manager"""
+        """Ensure one report per employee per day; additional managers approve the same report"""
+        duplicates = {
+            (employee.id, day)
+            for employee, day, count in self._read_group(
+                [('name', 'in', self.name.ids), ('date', 'in', list(set(self.mapped('date'))))],
+                ['name', 'date:day'], ['__count'])
+            if count > 1
+        }
         for record in self:
-            domain = [
-                ('name', '=', record.name.id),
-                ('date', '=', record.date),
-                ('id', '!=', record.id),
-            ]
-            
-            if record.reporting_manager_id:
-                domain.append(('reporting_manager_id', '=', record.reporting_manager_id.id))
+            if (record.name.id, record.date) in duplicates:
+                raise ValidationError(_("You have already submitted a report for this day."))
+
+    # ------------------------------------------------------------------
+    # Notification helpers
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _get_notification_email_from(self):
+        """Sender address for DWR notifications: mail.default.from, then company email, then catchall"""
+        params = self.env['ir.config_parameter'].sudo()
+        email_from = params.get_param('mail.default.from')
+        if not email_from:
+            email_from = self.env.company.email or (self.env.user.company_id.email if self.env.user.company_id else False)
+        if not email_from:
+            catchall = params.get_param('mail.catchall.domain')
+            if catchall:
+                email_from = 'no-reply@' + catchall
+                _logger.debug("Using catchall to build sender email: %s", email_from)
+            else:
+                email_from = 'no-reply@example.com'
+                _logger.debug("No sender configured; falling back to %s", email_from)
+        return email_from
+
+    @api.model
+    def _get_employee_email(self, employee):
+        """Work email of the employee, falling back to the email of its user"""
+        if not employee:
+            return False
+        return employee.work_email or (employee.user_id.partner_id.email if employee.user_id else False)
+
+    def _get_record_url(self):
+        self.ensure_one()
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        return f"{base_url}/web#id={self.id}&model={self._name}&view_type=form"
+
+    def _send_mails(self, mail_vals_list, queue=False):
+        """Create all notification mails at once and send them in a single batch.
+
+        With ``queue`` the mails are only created as outgoing and the mail queue cron is woken
+        up to send them once the transaction has committed, keeping SMTP out of the caller's
+        transaction.
+        """
+        if not mail_vals_list:
+            return self.env['mail.mail']
+        mails = self.env['mail.mail'].sudo().create(mail_vals_list)
+        if queue:
+            cron = self.env.ref('mail.ir_cron_mail_scheduler_action', raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
+            return mails
+        try:
+            mails.send(raise_exception=False)
+        except Exception as e:
+            _logger.error('Failed to send mail: %s', e, exc_info=True)
+        return mails
+
+    def _get_submission_mail_body(self, manager):
+        self.ensure_one()
+        return f"""
+            <div style="margin: 0px; padding: 0px;">
+                <p style="margin: 0px; padding: 0px; font-size: 13px;">
+                    Hello {manager.name},
+                </p>
+                <p style="margin: 16px 0px 0px 0px; padding: 0px; font-size: 13px;">
+                    {self.name.name} has submitted a daily work report for {self.date}.
+                </p>
+                <div style="margin: 16px 0px 0px 0px; padding: 0px; font-size: 13px;">
+                    <a href="{self._get_record_url()}"
+                       style="background-color: #875A7B; padding: 8px 16px 8px 16px;
+                              text-decoration: none; color: #fff;
+                              border-radius: 5px; font-size:13px;">
+                        View Report
+                    </a>
+                </div>
+                <p style="margin: 16px 0px 0px 0px; padding: 0px; font-size: 13px;">
+                    This report requires your review and approval.
+                </p>
+            </div>
+        """
+
+    def _notify_submission(self):
+        """Queue an email to every approver (or the direct manager) of each report.
+
+        The queued mail is linked to the report and shows in its chatter; only reports that
+        could not be notified get an extra chatter note.
+        """
+        email_from = self._get_notification_email_from()
+        mail_vals_list = []
+        bodies = {}
+        for record in self:
+            # Approvers of the report, else the reporting or direct manager
+            managers = record.approval_ids.approver_id or record.reporting_manager_id or record.name.parent_id
+            if not managers:
+                _logger.debug("No manager found for employee %s", record.name.name)
+                bodies[record.id] = "⚠️ Could not send email notification: No manager found"
+                continue
+            for manager in managers:
+                manager_email = self._get_employee_email(manager)
+                if not manager_email:
+                    _logger.debug("No email address found for manager %s", manager.name)
+                    bodies[record.id] = f"⚠️ Could not send email notification: No email address found for manager {manager.name}"
+                    continue
+                mail_vals_list.append({
+                    'subject': f"Daily Work Report submitted by {record.name.name}",
+                    'body_html': record._get_submission_mail_body(manager),
+                    'email_to': manager_email,
+                    'email_from': email_from,
+                    'auto_delete': False,
+                    'state': 'outgoing',
+                    'message_type': 'email',
+                    'model': self._name,
+                    'res_id': record.id,
+                })
+        self._send_mails(mail_vals_list, queue=True)
+        if bodies and not self.env['dwr.audit.log']._is_compact():
+            self._message_log_batch(bodies=bodies)
+
+    def _notify_approval(self):
+        """Email each employee that their report was approved"""
+        template = self.env.ref('daily_work_report.mail_template_dwr_approved', raise_if_not_found=False)
+        template = template.sudo() if template else template
+        email_from = self._get_notification_email_from()
+        records = self.filtered(lambda r: self._get_employee_email(r.name))
+        if not records:
+            return
+        if template:
+            subjects = template._render_field('subject', records.ids)
+            bodies = template._render_field('body_html', records.ids)
+        mail_vals_list = []
+        for rec in records:
+            if template:
+                subject, body = subjects[rec.id], bodies[rec.id]
             else:
-                domain.append(('reporting_manager_id', '=', False))
-                
-            if self.search_count(domain) > 0:
-                if record.reporting_manager_id:
-                    raise ValidationError(_("You have already submitted a report for this day to manager %s.") % record.reporting_manager_id.name)
-                else:
-                    raise ValidationError(_("You have already submitted a report for this day."))
+                subject = _("Your Daily Work Report has been approved")
+                body = _("<p>Hello %s,</p><p>Your daily work report for %s has been approved by %s.</p>") % (
+                    rec.name.name or '', rec.date or '', self.env.user.name or '')
+            mail_vals_list.append({
+                'subject': subject,
+                'body_html': body,
+                'email_from': email_from,
+                'email_to': self._get_employee_email(rec.name),
+                'model': self._name,
+                'res_id': rec.id,
+            })
+        self._send_mails(mail_vals_list)
 
+    def _notify_employee_of_manager_message(self, body, user=None):
+        """Email the employee of each report on which ``user`` (a manager) posted ``body``"""
+        user = user or self.env.user
+        additional_managers = self._get_additional_managers_by_employee(user=user)
+        mail_vals_list = []
+        for rec in self:
+            is_mgr = (
+                (rec.name.parent_id and rec.name.parent_id.user_id == user)
+                or (rec.reporting_manager_id and rec.reporting_manager_id.user_id == user)
+                or rec.name.id in additional_managers
+            )
+            employee_email = self._get_employee_email(rec.name)
+            if is_mgr and employee_email:
+                mail_vals_list.append({
+                    'subject': _("Message from manager regarding your Daily Work Report"),
+                    'body_html': body or '',
+                    'email_to': employee_email,
+                })
+        self._send_mails(mail_vals_list)
+
+    # ------------------------------------------------------------------
+    # Workflow actions
+    # ------------------------------------------------------------------
+
+    def _check_manager_action_date(self, hod_message, manager_message):
+        """Restrict managers to today's reports (HODs: today and yesterday)"""
+        today = fields.Date.today()
+        yesterday = today - timedelta(days=1)
+        is_hod = self.env.user.has_group('daily_work_report.group_hod')
+        for record in self:
+            if is_hod:
+                if record.date not in [today, yesterday]:
+                    raise UserError(hod_message)
+            elif record.date != today:
+                raise UserError(manager_message)
+
+    # ------------------------------------------------------------------
+    # Approvals
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _get_approval_policy(self):
+        """``any`` (first approval wins, default), ``all`` (every approver) or ``project``
+        (every owner of a line's project, see employee.additional.manager.project_names)"""
+        policy = self.env['ir.config_parameter'].sudo().get_param('daily_work_report.approval_policy', 'any')
+        return policy if policy in ('any', 'all', 'project') else 'any'
+
+    def _create_approvals(self):
+        """(Re)create the approval rows of the reports being submitted, in one batch"""
+        policy = self._get_approval_policy()
+        links = self.env['employee.additional.manager'].sudo().search([('employee_id', 'in', self.name.ids)])
+        links_by_employee = {}
+        for link in links:
+            links_by_employee.setdefault(link.employee_id.id, []).append(link)
+
+        vals_list = []
+        for record in self:
+            primary = record.reporting_manager_id or record.name.parent_id
+            approvers = {}
+            if policy == 'project':
+                projects = {line.project_id.strip(): line.project_id.strip().lower() for line in record.report_ids if line.project_id}
+                claimed = set()
+                for link in links_by_employee.get(record.name.id, []):
+                    owned = {p.strip().lower() for p in (link.project_names or '').split(',') if p.strip()}
+                    names = sorted(name for name, key in projects.items() if key in owned)
+                    if names and link.manager_id != record.name:
+                        approvers[link.manager_id] = ', '.join(names)
+                        claimed.update(names)
+                remaining = sorted(set(projects) - claimed)
+                if primary and (remaining or not approvers):
+                    approvers[primary] = ', '.join(remaining)
+            else:
+                if primary:
+                    approvers[primary] = False
+                for link in links_by_employee.get(record.name.id, []):
+                    if link.manager_id != record.name:
+                        approvers.setdefault(link.manager_id, False)
+            vals_list += [{
+                'report_id': record.id,
+                'approver_id': approver.id,
+                'project_names': project_names,
+                'sequence': sequence,
+            } for sequence, (approver, project_names) in enumerate(approvers.items())]
+        self.approval_ids.sudo().unlink()
+        return self.env['employee.report.approval'].sudo().create(vals_list)
+
+    def _record_approval(self, user, is_director):
+        """Mark the approvals of ``user`` as approved and return the reports whose policy is
+        now satisfied. Directors, direct managers and escalation targets without an approval
+        row of their own approve on behalf of every approver."""
+        policy = self._get_approval_policy()
+        now = fields.Datetime.now()
+        to_approve = self.env['employee.report.approval']
+        escalated = set()
+        if not is_director:
+            escalated = set(self.env['dwr.escalation'].sudo().search([
+                ('employee_report_id', 'in', self.ids),
+                ('processed', '=', False),
+                ('created_by', '=', user.id),
+            ]).employee_report_id.ids)
+        for record in self:
+            pending = record.approval_ids.filtered(lambda a: a.state == 'pending')
+            own = record.approval_ids.filtered(lambda a: a.approver_user_id == user)
+            if is_director:
+                to_approve |= pending
+            elif not own:
+                direct_managers = record.reporting_manager_id | record.name.parent_id
+                if user not in direct_managers.user_id and record.id not in escalated:
+                    raise UserError(_("You are not an approver of the report of %s.") % record.name.name)
+                to_approve |= pending
+            elif not own.filtered(lambda a: a.state == 'pending'):
+                raise UserError(_("You have already approved the report of %s.") % record.name.name)
+            else:
+                to_approve |= own.filtered(lambda a: a.state == 'pending')
+        to_approve.sudo().write({'state': 'approved', 'decided_time': now})
+        if policy == 'any':
+            return self
+        return self.filtered(lambda r: all(a.state == 'approved' for a in r.approval_ids))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['dwr.monthly.summary']._mark_dirty(records)
+        self.env['dwr.pending.counter']._invalidate_reports(records.filtered(lambda r: r.state == 'submitted'))
+        return records
+
+    def write(self, vals):
+        Summary = self.env['dwr.monthly.summary']
+        if 'name' in vals or 'date' in vals:
+            # The report leaves its current (employee, month) summary
+            Summary._mark_dirty(self)
+        if 'date' in vals:
+            # ... and the snapshot of its current day
+            new_date = fields.Date.to_date(vals['date'])
+            self.env['dwr.snapshot.stale.day']._log_days(self.filtered(lambda r: r.date != new_date).mapped('date'))
+        Counter = self.env['dwr.pending.counter']
+        if 'state' in vals or 'reporting_manager_id' in vals:
+            Counter._invalidate_reports(self)
+        if 'state' in vals:
+            # Escalations only make sense while the report waits for approval
+            if vals['state'] != 'submitted':
+                self.env['dwr.escalation']._cancel_pending(self.filtered(lambda r: r.state == 'submitted'))
+            # The PDF of an approved report is cached as an attachment; drop it once the state moves on
+            self.filtered(lambda r: r.state == 'approved' and r.state != vals['state'])._unlink_cached_pdf()
+            Audit = self.env['dwr.audit.log']
+            if Audit._is_compact():
+                Audit._log_transitions(
+                    self, vals['state'], reason=vals.get('reject_reason') or self.env.context.get('dwr_audit_reason'))
+                self = self.with_context(tracking_disable=True)
+        res = super(EmployeeReport, self).write(vals)
+        if SUMMARY_REPORT_FIELDS.intersection(vals):
+            Summary._mark_dirty(self)
+        if 'reporting_manager_id' in vals:
+            Counter._invalidate_reports(self)
+        return res
+
+    def unlink(self):
+        # Archiving keeps the summary of the archived months
+        if not self.env.context.get('dwr_archive'):
+            self.env['dwr.monthly.summary']._mark_dirty(self)
+        self.env['dwr.pending.counter']._invalidate_reports(self.filtered(lambda r: r.state == 'submitted'))
+        # The concerns of the reports lose their link without a change of their own
+        self.env['dwr.snapshot.stale.day'].sudo()._log_concern_days(
+            self.env['concern.action'].sudo().search([('employee_report_id', 'in', self.ids)]))
+        # The indexed concerns go with the reports (cascade): refresh their clusters afterwards
+        members = self.env['dwr.concern.cluster.member'].sudo().search([('employee_report_id', 'in', self.ids)])
+        clusters = members.cluster_id
+        res = super().unlink()
+        clusters._update_stats()
+        return res
+
+    def _org_units_backfilled(self):
+        self.env['dwr.monthly.summary']._mark_dirty(self)
+
+    def _unlink_cached_pdf(self):
+        if self:
+            self.env['ir.attachment'].sudo().search([
+                ('res_model', '=', self._name),
+                ('res_id', 'in', self.ids),
+                ('name', '=like', 'DWR-%.pdf'),
+            ]).unlink()
+
+    @perf_tracked('employee.report.action_submit')
     def action_submit(self):
         """Submit the report for approval"""
         today = fields.Date.today()
         yesterday = fields.Date.today() - timedelta(days=1)
-        
+        user = self.env.user
+
         # Validate date restrictions
-        if not self.is_director:
-            if self.is_hod:
-                if self.date not in [today, yesterday]:
-                    raise ValidationError(_("As HOD, you can only submit reports for today and yesterday"))
-            elif self.date != today:
-                raise ValidationError(_("You can only submit reports for today"))
-        
+        if not user.has_group('daily_work_report.group_directors'):
+            is_hod = user.has_group('daily_work_report.group_hod')
+            for record in self:
+                if is_hod:
+                    if record.date not in [today, yesterday]:
+                        raise ValidationError(_("As HOD, you can only submit reports for today and yesterday"))
+                elif record.date != today:
+                    raise ValidationError(_("You can only submit reports for today"))
+
         # Validate incomplete tasks
-        for report in self.report_ids:
-            if report.current_status.name.strip().lower() != 'completed':
-                if not report.to_work_on or not report.expected_close_date:
-                    raise ValidationError(
-                        _("For task '%s': When status is not 'Completed', both 'To Work On' and 'Expected Close Date' are mandatory.") % report.task_id)
-        
-        # Check for concerns
-        if self.student_concerns or self.employee_concerns or self.other_concerns:
-            self.has_concerns = True
-        
-        self.write({
-            'state': 'submitted',
-            'prepared_by': self.env.user.employee_id.id,
-            'submitted_time': fields.Datetime.now()
-        })
+        self.report_ids._check_incomplete_task_requirements()
 
-        # Create escalation queue entry (next day at 14:00) so cron can escalate if still pending
-        for record in self:
-            try:
-                    # Schedule escalation for next day at 16:00 IST (Asia/Kolkata)
-                    import pytz
-                    ist = pytz.timezone('Asia/Kolkata')
-                    now_utc = datetime.utcnow().replace(tzinfo=pytz.utc)
-                    now_ist = now_utc.astimezone(ist)
-                    tomorrow_ist = now_ist + timedelta(days=1)
-                    scheduled_ist = tomorrow_ist.replace(hour=16, minute=0, second=0, microsecond=0)
-                    # Convert back to UTC for Odoo storage
-                    scheduled_utc = scheduled_ist.astimezone(pytz.utc)
-                    esc_vals = {
-                        'employee_report_id': record.id,
-                        'scheduled_datetime': fields.Datetime.to_string(scheduled_utc),
-                    }
-                    self.env['dwr.escalation'].sudo().create(esc_vals)
-            except Exception as e:
-                _logger.error('Failed to create escalation queue for report %s: %s', record.id, e)
-
-        # Send email notification to the reporting manager
+        # One write of each report's own row: the state, the department and branch of the
+        # employee (dwr.org.snapshot.mixin) and the concerns flag; the concerns are grouped with
+        # their near-duplicates by the clustering cron, outside of the submit transaction
+        submit_vals = {
+            'state': 'submitted',
+            'prepared_by': user.employee_id.id,
+            'submitted_time': fields.Datetime.now(),
+            'concerns_indexed': False,
+        }
+        units = self._get_org_units(self.name.ids)
+        groups = {}
         for record in self:
-            try:
-                _logger.info("=== Starting DWR Submission Email Process ===")
-                _logger.info("Report ID: %s, Employee: %s", record.id, record.name.name)
-
-                # Determine sender email (try mail.default.from, then company email, then catchall)
-                email_from = self.env['ir.config_parameter'].sudo().get_param('mail.default.from')
-                if not email_from:
-                    email_from = self.env.company.email or (self.env.user.company_id.email if self.env.user.company_id else False)
-                if not email_from:
-                    catchall = self.env['ir.config_parameter'].sudo().get_param('mail.catchall.domain')
-                    if catchall:
-                        email_from = 'no-reply@' + catchall
-                        _logger.warning("Using catchall to build sender email: %s", email_from)
-                    else:
-                        email_from = 'no-reply@example.com'
-                        _logger.warning("No sender configured; falling back to %s", email_from)
-                _logger.info("Email will be sent from: %s", email_from)
-
-                # Get manager (reporting or direct)
-                manager = record.reporting_manager_id
-                _logger.info("Reporting manager: %s", manager.name if manager else "None")
-
-                if not manager and record.name and record.name.parent_id:
-                    manager = record.name.parent_id
-                    _logger.info("Using direct manager as fallback: %s", manager.name if manager else "None")
-
-                if manager:
-                    _logger.info("Manager details - ID: %s, Name: %s", manager.id, manager.name)
-                    
-                    # Try to get manager's email
-                    manager_email = False
-                    if manager.work_email:
-                        manager_email = manager.work_email
-                        _logger.info("Using manager's work email: %s", manager_email)
-                    elif manager.user_id and manager.user_id.partner_id.email:
-                        manager_email = manager.user_id.partner_id.email
-                        _logger.info("Using manager's user email: %s", manager_email)
-                    
-                    if manager_email:
-                        # Get base URL for the link
-                        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
-                        record_url = f"{base_url}/web#id={record.id}&model={self._name}&view_type=form"
-                        _logger.info("Record URL: %s", record_url)
-                        
-                        # Prepare email content
-                        subject = f"Daily Work Report submitted by {record.name.name}"
-                        body = f"""
-                            <div style="margin: 0px; padding: 0px;">
-                                <p style="margin: 0px; padding: 0px; font-size: 13px;">
-                                    Hello {manager.name},
-                                </p>
-                                <p style="margin: 16px 0px 0px 0px; padding: 0px; font-size: 13px;">
-                                    {record.name.name} has submitted a daily work report for {record.date}.
-                                </p>
-                                <div style="margin: 16px 0px 0px 0px; padding: 0px; font-size: 13px;">
-                                    <a href="{record_url}" 
-                                       style="background-color: #875A7B; padding: 8px 16px 8px 16px; 
-                                              text-decoration: none; color: #fff; 
-                                              border-radius: 5px; font-size:13px;">
-                                        View Report
-                                    </a>
-                                </div>
-                                <p style="margin: 16px 0px 0px 0px; padding: 0px; font-size: 13px;">
-                                    This report requires your review and approval.
-                                </p>
-                            </div>
-                        """
-                        
-                        # Create and send the email using sudo()
-                        mail_values = {
-                            'subject': subject,
-                            'body_html': body,
-                            'email_to': manager_email,
-                            'email_from': email_from,
-                            'auto_delete': False,
-                            'state': 'outgoing',
-                            'message_type': 'email',
-                            'model': self._name,
-                            'res_id': record.id,
-                        }
-                        
-                        # Try sending via mail template (preferred) otherwise fallback to mail.mail
-                        try:
-                            _logger.info("Creating mail with values: %s", mail_values)
-                            mail = self.env['mail.mail'].sudo().create(mail_values)
-                            _logger.info("Created mail.mail record ID: %s", mail.id)
-                            # Force send immediately
-                            _logger.info("Attempting to send mail...")
-                            mail.sudo().send(raise_exception=True)
-                            # Re-browse to get status
-                            mail = self.env['mail.mail'].sudo().browse(mail.id)
-                            _logger.info("Mail status after sending: %s", mail.state)
-                            # Create a message in the chatter
-                            self.message_post(
-                                body=f"Daily work report submitted. Email notification sent to {manager.name} ({manager_email})",
-                                message_type='notification'
-                            )
-                        except Exception as e:
-                            _logger.error('Failed to send mail: %s', e, exc_info=True)
-                        
-                    else:
-                        _logger.error("❌ No email address found for manager %s", manager.name)
-                        self.message_post(
-                            body=f"⚠️ Could not send email notification: No email address found for manager {manager.name}",
-                            message_type='notification'
-                        )
-                else:
-                    _logger.error("❌ No manager found for employee %s", record.name.name)
-                    self.message_post(
-                        body="⚠️ Could not send email notification: No manager found",
-                        message_type='notification'
-                    )
-
-            except Exception as e:
-                _logger.error("❌ Error in submission notification process: %s", str(e), exc_info=True)
-                # Post the error in chatter
-                self.message_post(
-                    body=f"⚠️ Failed to send email notification to manager. Error: {str(e)}",
-                    message_type='notification'
-                )
-            finally:
-                _logger.info("=== End of DWR Submission Email Process ===\n")
-        
-        # Note: duplicate/legacy notification block removed (handled above)
-
+            has_concerns = bool(record.has_concerns or record.student_concerns or record.employee_concerns
+                                or record.other_concerns)
+            groups.setdefault(units.get(record.name.id, (False, False)) + (has_concerns,), []).append(record.id)
+        for (department_id, branch_id, has_concerns), ids in groups.items():
+            self.browse(ids).write(dict(
+                submit_vals, department_id=department_id, branch_id=branch_id, has_concerns=has_concerns))
+        self._create_approvals()
+
+        # Create escalation queue entries so cron can escalate if still pending
+        try:
+            # First escalation on the schedule of the configured policy
+            Escalation = self.env['dwr.escalation']
+            scheduled_utc = fields.Datetime.to_string(Escalation._schedule(fields.Datetime.now()))
+            # Start a fresh chain: at most one active escalation per report
+            Escalation._cancel_pending(self)
+            Escalation.sudo().create([{
+                'employee_report_id': record.id,
+                'scheduled_datetime': scheduled_utc,
+            } for record in self])
+        except Exception as e:
+            _logger.error('Failed to create escalation queue for reports %s: %s', self.ids, e)
+
+        # Queue the email notification to the reporting manager; it is sent by the mail queue
+        # cron after commit so the submit transaction only writes the state and queue rows
+        try:
+            self._notify_submission()
+        except Exception as e:
+            _logger.error("Error in submission notification process: %s", str(e), exc_info=True)
+            # Post the error in chatter
+            if not self.env['dwr.audit.log']._is_compact():
+                self._message_log_batch(bodies={
+                    record.id: f"⚠️ Failed to send email notification to manager. Error: {str(e)}"
+                    for record in self
+                })
+
+    @perf_tracked('employee.report.action_approve')
     def action_approve(self):
         """Approve the report"""
-        today = fields.Date.today()
-        
-        # Prevent self-approval by managers
-        if self.is_manager and self.name.user_id == self.env.user:
-            raise ValidationError(_("You cannot approve your own report"))
-        
-        if self.is_director:
-            self.write({
-                'state': 'approved',
-                'approved_by': self.env.user.employee_id.id,
-                'approved_time': fields.Datetime.now()
-            })
-            self.activity_ids.unlink()
-            # Notify employee by email
-            for rec in self:
-                try:
-                    employee = rec.name
-                    # Approval email and notification removed as requested
-                except Exception:
-                    # Do not block approval on email failure
-                    pass
+        user = self.env.user
+        is_director = user.has_group('daily_work_report.group_directors')
+
+        for record in self:
+            # Prevent self-approval by managers
+            if record.is_manager and record.name.user_id == user:
+                raise ValidationError(_("You cannot approve your own report"))
+            if not is_director and not record.is_manager:
+                raise ValidationError(_("You are not authorized to approve this report"))
+
+        if not is_director:
+            # Date validation for managers; when every approver must act, those still expected
+            # to act may do so on a later day
+            dated = self
+            if self._get_approval_policy() != 'any':
+                dated = self.filtered(lambda r: not r.approval_ids.filtered(
+                    lambda a: a.approver_user_id == user and a.state == 'pending'))
+            dated._check_manager_action_date(
+                _("As HOD, you can only approve reports for today and yesterday"),
+                _("You can only approve today's reports"))
+
+        # Each approver approves their part; the report is approved once the policy is met
+        approved = self._record_approval(user, is_director)
+        approved.write({
+            'state': 'approved',
+            'approved_by': user.employee_id.id,
+            'approved_time': fields.Datetime.now()
+        })
+        approved.activity_ids.unlink()
+
+        # Notify employee by email (director approvals are not notified)
+        if not is_director and approved:
+            try:
+                approved._notify_approval()
+            except Exception:
+                # Do not block approval on email failure
+                _logger.warning('Failed to send approval notification for reports %s', self.ids, exc_info=True)
+        if approved != self:
             return {
-                'effect': {
-                    'fadeout': 'slow',
-                    'message': 'Approved',
-                    'type': 'rainbow_man',
-                }
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'type': 'info',
+                    'message': _("Your approval has been recorded. %(waiting)s of %(total)s reports are waiting "
+                                 "for the other approvers.", waiting=len(self - approved), total=len(self)),
+                    'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+                },
             }
-        elif self.is_manager:
-            yesterday = fields.Date.today() - timedelta(days=1)
-            
-            # Date validation for managers
-            if self.is_hod:
-                if self.date not in [today, yesterday]:
-                    raise UserError(_("As HOD, you can only approve reports for today and yesterday"))
-            elif self.date != today:
-                raise UserError(_("You can only approve today's reports"))
-                
-            self.write({
-                'state': 'approved',
-                'approved_by': self.env.user.employee_id.id,
-                'approved_time': fields.Datetime.now()
-            })
-            self.activity_ids.unlink()
-            # Notify employee by email
-            for rec in self:
-                try:
-                    employee = rec.name
-                    if employee:
-                        employee_email = employee.work_email or (employee.user_id.partner_id.email if employee.user_id else False)
-                        if employee_email:
-                            # Try using approval template if present
-                            try:
-                                template = False
-                                try:
-                                    template = self.env.ref('daily_work_report.mail_template_dwr_approved')
-                                except Exception:
-                                    template = False
-                                # Compute email_from fallback
-                                email_from = self.env['ir.config_parameter'].sudo().get_param('mail.default.from')
-                                if not email_from:
-                                    email_from = self.env.company.email or (self.env.user.company_id.email if self.env.user.company_id else False)
-                                if not email_from:
-                                    catchall = self.env['ir.config_parameter'].sudo().get_param('mail.catchall.domain')
-                                    if catchall:
-                                        email_from = 'no-reply@' + catchall
-                                    else:
-                                        email_from = 'no-reply@example.com'
-
-                                if template:
-                                    template.sudo().send_mail(rec.id, force_send=True, email_values={'email_from': email_from, 'email_to': employee_email})
-                                else:
-                                    subject = _("Your Daily Work Report has been approved")
-                                    body = _("<p>Hello %s,</p><p>Your daily work report for %s has been approved by %s.</p>") % (
-                                        employee.name or '', rec.date or '', self.env.user.name or '')
-                                    mail = self.env['mail.mail'].create({
-                                        'subject': subject,
-                                        'body_html': body,
-                                        'email_to': employee_email,
-                                    })
-                                    mail.send()
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
-            return {
-                'effect': {
-                    'fadeout': 'slow',
-                    'message': 'Approved',
-                    'type': 'rainbow_man',
-                }
+        return {
+            'effect': {
+                'fadeout': 'slow',
+                'message': 'Approved',
+                'type': 'rainbow_man',
             }
-        else:
-            raise ValidationError(_("You are not authorized to approve this report"))
+        }
 
+    @perf_tracked('employee.report.action_reject')
     def action_reject(self):
         """Reject the report with reason"""
-        today = fields.Date.today()
-        
-        # Prevent self-rejection by managers
-        if self.is_manager and self.name.user_id == self.env.user:
-            raise ValidationError(_("You cannot reject your own report"))
-        
-        if self.is_director:
-            return self._open_reject_wizard()
-        elif self.is_manager:
-            yesterday = fields.Date.today() - timedelta(days=1)
-            
+        user = self.env.user
+        is_director = user.has_group('daily_work_report.group_directors')
+
+        for record in self:
+            # Prevent self-rejection by managers
+            if record.is_manager and record.name.user_id == user:
+                raise ValidationError(_("You cannot reject your own report"))
+            if not is_director and not record.is_manager:
+                raise ValidationError(_("You are not authorized to reject this report"))
+
+        if not is_director:
             # Date validation for managers
-            if self.is_hod:
-                if self.date not in [today, yesterday]:
-                    raise UserError(_("As HOD, you can only reject reports for today and yesterday"))
-            elif self.date != today:
-                raise UserError(_("You can only reject today's reports"))
-            
-            return self._open_reject_wizard()
-        else:
-            raise ValidationError(_("You are not authorized to reject this report"))
+            self._check_manager_action_date(
+                _("As HOD, you can only reject reports for today and yesterday"),
+                _("You can only reject today's reports"))
+
+        return self._open_reject_wizard()
 
     def _open_reject_wizard(self):
         """Open reject wizard"""
@@ -542,13 +746,192 @@ class EmployeeReport(models.Model):
             'res_model': 'report.reject.wizard',
             'target': 'new',
             'view_mode': 'form',
-            'context': {'default_employee_report_id': self.id},
+            'context': {
+                'default_employee_report_id': self[:1].id,
+                'default_employee_report_ids': [(6, 0, self.ids)],
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Batch ingest
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _ingest_prepare_vals(self, reports_payload):
+        """Validate a batch of reports with their lines in one pass.
+
+        ``reports_payload`` is a list of dicts with ``date``, optional ``employee_id``,
+        ``reporting_manager_id``, ``summary``, the three concern texts and ``lines`` (each with
+        ``project``, ``task``, ``activity``, ``time_taken``, ``status``, ``to_work_on``,
+        ``expected_close_date`` and ``remarks``). Returns ``(vals_list, errors)`` where
+        ``errors`` lists every problem found, so the client can fix them all at once.
+        """
+        errors = []
+        if not isinstance(reports_payload, list) or not reports_payload:
+            return [], [{'path': 'reports', 'error': _("A non-empty list of reports is required.")}]
+
+        def text(values, name, path, required=False):
+            """String value of ``values[name]``, False when missing or invalid"""
+            value = values.get(name)
+            if value is None or value is False or value == '':
+                if required:
+                    errors.append({'path': path, 'error': _("This value is required.")})
+                return False
+            if not isinstance(value, str):
+                errors.append({'path': path, 'error': _("A string is expected.")})
+                return False
+            return value
+
+        def record_id(values, name, path):
+            """Id of ``values[name]``, False when missing, None when invalid"""
+            value = values.get(name)
+            if value is None or value is False:
+                return False
+            if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+                errors.append({'path': path, 'error': _("A record id (positive integer) is expected.")})
+                return None
+            return value
+
+        def day(values, name, path):
+            """Date of ``values[name]``, False when missing, None when invalid"""
+            value = values.get(name)
+            if value is None or value is False or value == '':
+                return False
+            try:
+                if not isinstance(value, str):
+                    raise ValueError(value)
+                return fields.Date.to_date(value)
+            except ValueError:
+                errors.append({'path': path, 'error': _("Invalid date, expected YYYY-MM-DD.")})
+                return None
+
+        status_names = {
+            line['status'].strip().lower()
+            for report in reports_payload if isinstance(report, dict) and isinstance(report.get('lines'), list)
+            for line in report['lines'] if isinstance(line, dict) and isinstance(line.get('status'), str)
+        }
+        statuses = {
+            status.name.strip().lower(): status
+            for status in self.env['job.status'].search([]) if status.name.strip().lower() in status_names
         }
+        default_employee = self.env.user.employee_id
+
+        vals_list = []
+        vals_paths = []
+        keys = set()
+        for index, report in enumerate(reports_payload):
+            path = 'reports[%s]' % index
+            if not isinstance(report, dict):
+                errors.append({'path': path, 'error': _("Each report must be an object.")})
+                continue
+            report_date = day(report, 'date', path + '.date')
+            employee_id = record_id(report, 'employee_id', path + '.employee_id')
+            manager_id = record_id(report, 'reporting_manager_id', path + '.reporting_manager_id')
+            if employee_id is False:
+                employee_id = default_employee.id
+                if not employee_id:
+                    errors.append({'path': path + '.employee_id', 'error': _("No employee given and none linked to the user.")})
+            report_vals = {
+                name: text(report, name, '%s.%s' % (path, name))
+                for name in ('summary', 'student_concerns', 'employee_concerns', 'other_concerns')
+            }
+            lines = report.get('lines') or []
+            if not isinstance(lines, list):
+                errors.append({'path': path + '.lines', 'error': _("A list of lines is expected.")})
+                lines = []
+
+            line_commands = []
+            for line_index, line in enumerate(lines):
+                line_path = '%s.lines[%s]' % (path, line_index)
+                if not isinstance(line, dict):
+                    errors.append({'path': line_path, 'error': _("Each line must be an object.")})
+                    continue
+                project = text(line, 'project', line_path + '.project', required=True)
+                time_taken = text(line, 'time_taken', line_path + '.time_taken', required=True)
+                if time_taken and not TIME_TAKEN_RE.match(time_taken):
+                    errors.append({'path': line_path + '.time_taken', 'error': _("Time must be in HH:MM format (e.g., 02:00, 13:30).")})
+                status_name = text(line, 'status', line_path + '.status', required=True)
+                to_work_on = text(line, 'to_work_on', line_path + '.to_work_on')
+                close_date = day(line, 'expected_close_date', line_path + '.expected_close_date')
+                status = statuses.get(status_name.strip().lower()) if status_name else False
+                if status_name and not status:
+                    errors.append({'path': line_path + '.status', 'error': _("Unknown status '%s'.") % status_name})
+                elif status and status.name.strip().lower() != 'completed' and not (to_work_on and close_date):
+                    errors.append({'path': line_path, 'error': _("When status is not 'Completed', both 'To Work On' and 'Expected Close Date' are mandatory.")})
+                line_commands.append((0, 0, {
+                    'sequence': line_index + 1,
+                    'project_id': project,
+                    'task_id': text(line, 'task', line_path + '.task'),
+                    'activity': text(line, 'activity', line_path + '.activity'),
+                    'time_taken': time_taken,
+                    'current_status': status.id if status else False,
+                    'to_work_on': to_work_on,
+                    'expected_close_date': close_date or False,
+                    'remarks_if_any': text(line, 'remarks', line_path + '.remarks'),
+                }))
+
+            if report_date is None or not employee_id:
+                continue
+            report_date = report_date or fields.Date.today()
+            key = (employee_id, report_date)
+            if key in keys:
+                errors.append({'path': path, 'error': _("Duplicate report for the same employee and day in this batch.")})
+            keys.add(key)
+            vals_paths.append(path)
+            vals_list.append(dict(
+                report_vals,
+                name=employee_id,
+                department_id=False,
+                prepared_by=default_employee.id,
+                reporting_manager_id=manager_id or False,
+                date=report_date,
+                report_ids=line_commands,
+            ))
+
+        # Existing reports for the same employee/day, checked with a single query
+        if keys and not errors:
+            existing = self.sudo()._read_group(
+                [('name', 'in', list({k[0] for k in keys})), ('date', 'in', list({k[1] for k in keys}))],
+                ['name', 'date:day'])
+            for employee, existing_day in existing:
+                if (employee.id, existing_day) in keys:
+                    errors.append({'path': 'reports', 'error': _(
+                        "A report already exists for employee %(employee)s on %(date)s.",
+                        employee=employee.name, date=existing_day)})
+
+        # Employees and managers resolved in one read; the department follows the employee
+        employees = self.env['hr.employee'].browse(
+            {vals['name'] for vals in vals_list} | {vals['reporting_manager_id'] for vals in vals_list if vals['reporting_manager_id']}
+        ).exists()
+        departments = {employee.id: employee.department_id.id for employee in employees}
+        for path, vals in zip(vals_paths, vals_list):
+            if vals['name'] not in departments:
+                errors.append({'path': path + '.employee_id', 'error': _("Unknown employee %s.") % vals['name']})
+            if vals['reporting_manager_id'] and vals['reporting_manager_id'] not in departments:
+                errors.append({'path': path + '.reporting_manager_id',
+                               'error': _("Unknown reporting manager %s.") % vals['reporting_manager_id']})
+            vals['department_id'] = departments.get(vals['name'], False)
+        return vals_list, errors
+
+    @api.model
+    def ingest_batch(self, reports_payload, submit=False):
+        """Create (and optionally submit) a whole batch of reports in one transaction.
+
+        Raises a ValidationError listing every problem when the payload is invalid; nothing is
+        created in that case. Returns the created reports.
+        """
+        vals_list, errors = self._ingest_prepare_vals(reports_payload)
+        if errors:
+            raise ValidationError('\n'.join('%s: %s' % (e['path'], e['error']) for e in errors))
+        reports = self.create(vals_list)
+        if submit:
+            reports.action_submit()
+        return reports
 
     def action_quick_create_concern(self):
         """Quick create concern action"""
         self.ensure_one()
-        
+
         default_title = _("Action against {}'s concern on {}").format(
             self.name.name,
             self.date.strftime('%d-%m-%Y') if self.date else ''
@@ -566,6 +949,7 @@ class EmployeeReport(models.Model):
             },
         }
 
+    @perf_tracked('employee.report.message_post')
     def message_post(self, **kwargs):
         """Override to send an email to the employee when a manager posts a message/comment."""
         res = super(EmployeeReport, self).message_post(**kwargs)
@@ -575,36 +959,10 @@ class EmployeeReport(models.Model):
         if message_type != 'comment':
             return res
 
-        for rec in self:
-            try:
-                # Determine if current user is a manager for this employee
-                user = self.env.user
-                is_mgr = False
-                if rec.name and rec.name.parent_id and rec.name.parent_id.user_id == user:
-                    is_mgr = True
-                if not is_mgr and rec.reporting_manager_id and rec.reporting_manager_id.user_id == user:
-                    is_mgr = True
-                if not is_mgr:
-                    add_mgr = self.env['employee.additional.manager'].search([
-                        ('employee_id', '=', rec.name.id if rec.name else False),
-                        ('manager_id.user_id', '=', user.id),
-                    ], limit=1)
-                    if add_mgr:
-                        is_mgr = True
-
-                if is_mgr and rec.name:
-                    employee_email = rec.name.work_email or (rec.name.user_id.partner_id.email if rec.name.user_id else False)
-                    if employee_email:
-                        body = kwargs.get('body') or ''
-                        subject = _("Message from manager regarding your Daily Work Report")
-                        mail = self.env['mail.mail'].create({
-                            'subject': subject,
-                            'body_html': body,
-                            'email_to': employee_email,
-                        })
-                        mail.send()
-            except Exception:
-                # Swallow exceptions to avoid breaking messaging
-                pass
+        try:
+            self._notify_employee_of_manager_message(kwargs.get('body'))
+        except Exception:
+            # Swallow exceptions to avoid breaking messaging
+            _logger.warning('Failed to notify employee of manager message on %s', self.ids, exc_info=True)
 
         return res
\ No newline at end of file
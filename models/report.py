@@ -1,11 +1,17 @@
-from odoo import api, models, fields, _
+from odoo import api, models, fields, tools, _
 from odoo.exceptions import ValidationError
 import re
 
+from .dwr_monthly_summary import SUMMARY_LINE_FIELDS
+
+# Valid durations for time_taken, from 0:00 to 23:59
+TIME_TAKEN_RE = re.compile(r'^([0-9]|0[0-9]|1[0-9]|2[0-3]):[0-5][0-9]$')
+
 
 class Report(models.Model):
     _name = 'report'
     _description = 'Daily Work Report Line'
+    _inherit = ['dwr.change.feed.mixin', 'dwr.replica.mixin', 'dwr.deferred.constraints.mixin']
     _order = 'sequence, id'
 
     employee_id = fields.Many2one('employee.report', string='Employee Report', ondelete='cascade')
@@ -24,18 +30,51 @@ class Report(models.Model):
     expected_close_date = fields.Date(string='Expected Close Date')
     remarks_if_any = fields.Char(string='Remarks')
 
+    def init(self):
+        super().init()
+        # Lines of a report in display order
+        tools.create_index(self.env.cr, 'report_employee_id_sequence_idx', self._table, ['employee_id', 'sequence', 'id'])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env['dwr.monthly.summary']._mark_dirty(lines.employee_id)
+        return lines
+
+    def _change_feed_days(self):
+        return {line.id: line.employee_id.date for line in self}
+
+    def write(self, vals):
+        if 'employee_id' in vals:
+            # The line leaves the snapshot of its current day
+            self.env['dwr.snapshot.stale.day']._log_days(
+                self.employee_id.filtered(lambda r: r.id != vals['employee_id']).mapped('date'))
+        if not SUMMARY_LINE_FIELDS.intersection(vals):
+            return super().write(vals)
+        reports = self.employee_id
+        res = super().write(vals)
+        self.env['dwr.monthly.summary']._mark_dirty(reports | self.employee_id)
+        return res
+
+    def unlink(self):
+        if not self.env.context.get('dwr_archive'):
+            self.env['dwr.monthly.summary']._mark_dirty(self.employee_id)
+        return super().unlink()
+
     @api.constrains('time_taken')
     def _check_time_format(self):
         """Validate time format HH:MM"""
         for record in self:
-            if record.time_taken and not re.match(r'^([0-9]|0[0-9]|1[0-9]|2[0-3]):[0-5][0-9]$', record.time_taken):
+            if record.time_taken and not TIME_TAKEN_RE.match(record.time_taken):
                 raise ValidationError(_("Time must be in HH:MM format (e.g., 02:00, 13:30)."))
 
     @api.constrains('current_status', 'to_work_on', 'expected_close_date')
     def _check_incomplete_task_requirements(self):
         """Check that incomplete tasks have required fields"""
+        # Resolve the statuses of all lines at once instead of one read per line
+        incomplete_statuses = self.current_status.filtered(lambda s: s.name.strip().lower() != 'completed')
         for record in self:
-            if record.current_status and record.current_status.name.strip().lower() != 'completed':
+            if record.current_status in incomplete_statuses:
                 if not record.to_work_on or not record.expected_close_date:
                     task_name = record.task_id or record.project_id or 'Unnamed Task'
                     raise ValidationError(
@@ -0,0 +1,42 @@
+from odoo import api, fields, models
+
+
+class EmployeeReportApproval(models.Model):
+    """One approver of a submitted daily work report and their decision.
+
+    Rows are created on submit for the reporting manager and the active additional managers
+    of the employee (or only the project owners under the ``project`` policy); the report is
+    approved once the ``daily_work_report.approval_policy`` is satisfied.
+    """
+    _name = 'employee.report.approval'
+    _description = 'Daily Work Report Approval'
+    _order = 'report_id, sequence, id'
+
+    report_id = fields.Many2one('employee.report', string='Report', required=True, ondelete='cascade', index=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    approver_id = fields.Many2one('hr.employee', string='Approver', required=True)
+    approver_user_id = fields.Many2one('res.users', string='Approver User', related='approver_id.user_id',
+                                       store=True, index=True)
+    project_names = fields.Char(string='Projects',
+                                help="Projects of the report lines this approver is responsible for (project policy)")
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+    ], string='Status', default='pending', required=True)
+    decided_time = fields.Datetime(string='Decided On', readonly=True)
+
+    _sql_constraints = [
+        ('report_approver_uniq', 'unique(report_id, approver_id)', 'An approver can only be listed once per report.'),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        approvals = super().create(vals_list)
+        self.env['dwr.pending.counter']._invalidate(approvals.approver_user_id)
+        return approvals
+
+    def write(self, vals):
+        if 'state' in vals:
+            self.env['dwr.pending.counter']._invalidate(self.approver_user_id)
+        return super().write(vals)
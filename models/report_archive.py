@@ -0,0 +1,204 @@
+import json
+import logging
+import threading
+from datetime import timedelta
+
+from markupsafe import Markup, escape
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+from .dwr_perf import perf_tracked
+
+_logger = logging.getLogger(__name__)
+
+
+class EmployeeReportArchive(models.Model):
+    _name = 'employee.report.archive'
+    _description = 'Archived Daily Work Report'
+    _inherit = ['mail.thread']
+    _order = 'date desc, id desc'
+    _rec_name = 'name'
+
+    source_model = fields.Selection([
+        ('employee.report', 'Daily Work Report'),
+        ('support.staff', 'Support Staff Report'),
+    ], string='Report Type', required=True, readonly=True, index=True)
+    source_id = fields.Integer(string='Original ID', readonly=True)
+    name = fields.Many2one('hr.employee', string="Employee", readonly=True, index=True)
+    department_id = fields.Many2one('hr.department', string="Department", readonly=True)
+    branch_id = fields.Many2one('res.partner', string="Branch", readonly=True)
+    reporting_manager_id = fields.Many2one('hr.employee', string="Reporting Manager", readonly=True)
+    date = fields.Date(string='Date', readonly=True)
+    month = fields.Char(string='Month', readonly=True, index=True, help="Archive partition key (YYYY-MM)")
+    state = fields.Char(string='Status', readonly=True)
+    prepared_by = fields.Many2one('hr.employee', string="Prepared By", readonly=True)
+    approved_by = fields.Many2one('hr.employee', string="Approved By", readonly=True)
+    submitted_time = fields.Datetime(string='Submission On', readonly=True)
+    approved_time = fields.Datetime(string='Approved On', readonly=True)
+    total_work_minutes = fields.Integer(string='Total Work Minutes', readonly=True)
+    actual_work_hours = fields.Char(string='Actual Work Hours', readonly=True)
+    summary = fields.Html(string="Summary", readonly=True)
+    concerns = fields.Text(string="Concerns", readonly=True)
+    has_concerns = fields.Boolean(string="Has Concerns", readonly=True)
+    lines_json = fields.Text(string='Lines (JSON)', readonly=True)
+    lines_text = fields.Text(string='Lines', readonly=True,
+                             help="Flattened line descriptions used for searching archived reports")
+    lines_html = fields.Html(string='Report Lines', compute='_compute_lines_html', sanitize=False)
+    archived_on = fields.Datetime(string='Archived On', readonly=True, default=fields.Datetime.now)
+    concern_action_ids = fields.One2many('concern.action', 'archive_id', string='Concern Actions', readonly=True)
+
+    def _compute_lines_html(self):
+        for record in self:
+            lines = json.loads(record.lines_json or '[]')
+            if not lines:
+                record.lines_html = False
+                continue
+            headers = list(lines[0].keys())
+            rows = Markup('').join(
+                Markup('<tr>%s</tr>') % Markup('').join(
+                    Markup('<td>%s</td>') % escape(line.get(key) or '') for key in headers)
+                for line in lines
+            )
+            head = Markup('').join(
+                Markup('<th>%s</th>') % escape(key.replace('_', ' ').title()) for key in headers)
+            record.lines_html = Markup(
+                '<table class="table table-sm o_main_table"><thead><tr>%s</tr></thead><tbody>%s</tbody></table>'
+            ) % (head, rows)
+
+    # ------------------------------------------------------------------
+    # Snapshot builders
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _prepare_employee_report_vals(self, report):
+        lines = [{
+            'project': line.project_id,
+            'task': line.task_id or '',
+            'activity': line.activity or '',
+            'time_taken': line.time_taken,
+            'status': line.current_status.name or '',
+            'to_work_on': line.to_work_on or '',
+            'expected_close_date': fields.Date.to_string(line.expected_close_date) or '',
+            'remarks': line.remarks_if_any or '',
+        } for line in report.report_ids]
+        concerns = '\n'.join(filter(None, [report.student_concerns, report.employee_concerns, report.other_concerns]))
+        return {
+            'source_model': 'employee.report',
+            'source_id': report.id,
+            'name': report.name.id,
+            'department_id': report.department_id.id,
+            'branch_id': report.branch_id.id,
+            'reporting_manager_id': report.reporting_manager_id.id,
+            'date': report.date,
+            'month': report.date.strftime('%Y-%m') if report.date else False,
+            'state': report.state,
+            'prepared_by': report.prepared_by.id,
+            'approved_by': report.approved_by.id,
+            'submitted_time': report.submitted_time,
+            'approved_time': report.approved_time,
+            'total_work_minutes': report.total_work_minutes,
+            'actual_work_hours': report.actual_work_hours,
+            'summary': report.summary,
+            'concerns': concerns or False,
+            'has_concerns': report.has_concerns,
+            'lines_json': json.dumps(lines),
+            'lines_text': '\n'.join(' '.join(filter(None, [l['project'], l['task'], l['activity']])) for l in lines),
+        }
+
+    @api.model
+    def _prepare_support_staff_vals(self, report):
+        lines = [{
+            'work_type': line.work_type,
+            'description': line.name,
+            'time_taken': line.time_taken,
+            'status': line.current_status.name or '',
+        } for line in report.yesterday_wrk_support_ids | report.today_wrk_support_ids | report.balance_wrk_support_ids]
+        summary = Markup('').join(s for s in [report.summary1, report.summary2, report.summary3] if s)
+        return {
+            'source_model': 'support.staff',
+            'source_id': report.id,
+            'name': report.name.id,
+            'department_id': report.department_id.id,
+            'branch_id': report.branch_id.id,
+            'date': report.date,
+            'month': report.date.strftime('%Y-%m') if report.date else False,
+            'state': report.state,
+            'prepared_by': report.prepared_by.id,
+            'approved_by': report.approved_by.id,
+            'summary': summary or False,
+            'lines_json': json.dumps(lines),
+            'lines_text': '\n'.join(l['description'] for l in lines),
+        }
+
+    @api.model
+    def _relink_archived(self, reports, archives):
+        """Move what outlives the archived ``reports`` to their ``archives`` rows: the chatter
+        and attachments, the concern actions and the indexed concerns of the concern clusters"""
+        report_ids, archive_ids = reports.ids, archives.ids
+        self.env.flush_all()
+        for table, model_column in [('mail_message', 'model'), ('ir_attachment', 'res_model')]:
+            self.env.cr.execute(SQL(
+                """
+                UPDATE %s t
+                   SET %s = %s, res_id = a.archive_id
+                  FROM unnest(%s::int[], %s::int[]) AS a(report_id, archive_id)
+                 WHERE t.%s = %s AND t.res_id = a.report_id
+                """,
+                SQL.identifier(table), SQL.identifier(model_column), self._name, report_ids, archive_ids,
+                SQL.identifier(model_column), reports._name,
+            ))
+        self.env['mail.message'].invalidate_model(['model', 'res_id'])
+        self.env['ir.attachment'].invalidate_model(['res_model', 'res_id'])
+        if reports._name != 'employee.report':
+            return
+        archive_by_report = dict(zip(report_ids, archive_ids))
+        for concern in self.env['concern.action'].sudo().search([('employee_report_id', 'in', report_ids)]):
+            concern.archive_id = archive_by_report[concern.employee_report_id.id]
+        # Detached from the report, whose deletion would cascade to them
+        for member in self.env['dwr.concern.cluster.member'].sudo().search([('employee_report_id', 'in', report_ids)]):
+            member.write({'archive_id': archive_by_report[member.employee_report_id.id], 'employee_report_id': False})
+        # The archived concerns stay in their clusters, whose counts must not drift
+        self.env['dwr.concern.cluster.member'].sudo().search([
+            ('archive_id', 'in', archive_ids)]).cluster_id._update_stats()
+
+    # ------------------------------------------------------------------
+    # Cron
+    # ------------------------------------------------------------------
+
+    @api.model
+    @perf_tracked('employee.report.archive._cron_archive_reports')
+    def _cron_archive_reports(self):
+        """Move approved reports older than the configured age into the archive.
+
+        Controlled by the ``daily_work_report.archive_after_days`` (default 365, 0 disables)
+        and ``daily_work_report.archive_batch_size`` (default 500) system parameters.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        days = int(params.get_param('daily_work_report.archive_after_days', 365))
+        batch_size = int(params.get_param('daily_work_report.archive_batch_size', 500))
+        if days <= 0:
+            return True
+        cutoff = fields.Date.today() - timedelta(days=days)
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+
+        for model_name, prepare in [
+            ('employee.report', self._prepare_employee_report_vals),
+            ('support.staff', self._prepare_support_staff_vals),
+        ]:
+            Model = self.env[model_name].sudo()
+            total = 0
+            while True:
+                reports = Model.search([('state', '=', 'approved'), ('date', '<', cutoff)], limit=batch_size, order='id')
+                if not reports:
+                    break
+                archives = self.sudo().with_context(mail_create_nolog=True, mail_create_nosubscribe=True).create(
+                    [prepare(report) for report in reports])
+                self._relink_archived(reports, archives)
+                total += len(reports)
+                reports.with_context(dwr_archive=True).unlink()
+                if auto_commit:
+                    self.env.cr.commit()
+            if total:
+                _logger.info('DWR Archive: archived %s %s records older than %s', total, model_name, cutoff)
+        return True
@@ -1,11 +1,13 @@
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
 
+from .dwr_perf import perf_tracked
+
 
 class SupportStaff(models.Model):
     _name = 'support.staff'
     _description = 'Support Staff Report'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'dwr.change.feed.mixin', 'dwr.org.snapshot.mixin']
     _order = 'date desc'
 
     # Constants
@@ -16,18 +18,8 @@ class SupportStaff(models.Model):
     department_id = fields.Many2one('hr.department', string="Department",
                                    default=lambda self: self.env.user.employee_id.department_id, 
                                    readonly=True)
-    branch_id = fields.Many2one('res.partner', string="Branch", 
-                               compute='_compute_branch_id', store=True)
+    branch_id = fields.Many2one('res.partner', string="Branch", readonly=True)
     date = fields.Date(string='Date', default=fields.Date.today)
-
-    @api.depends('name')
-    def _compute_branch_id(self):
-        for record in self:
-            # Simplified branch computation - can be extended based on company structure
-            if record.name and record.name.company_id:
-                record.branch_id = record.name.company_id.partner_id.id
-            else:
-                record.branch_id = False
     
     # Time fields
     start_time = fields.Float(string='Start Time')
@@ -44,25 +36,8 @@ class SupportStaff(models.Model):
     balance_wrk_support_ids = fields.One2many(WORK_LINE_MODEL, 'support_staff_id',
                                              domain=[('work_type', '=', 'balance')],
                                              string='Balance Work')
-    
-    # Inverse methods for the one2many fields
-    @api.onchange('yesterday_wrk_support_ids')
-    def _onchange_yesterday_work(self):
-        for line in self.yesterday_wrk_support_ids:
-            if not line.work_type:
-                line.work_type = 'yesterday'
-    
-    @api.onchange('today_wrk_support_ids')
-    def _onchange_today_work(self):
-        for line in self.today_wrk_support_ids:
-            if not line.work_type:
-                line.work_type = 'today'
-    
-    @api.onchange('balance_wrk_support_ids')
-    def _onchange_balance_work(self):
-        for line in self.balance_wrk_support_ids:
-            if not line.work_type:
-                line.work_type = 'balance'
+    # Line work_type defaults come from the default_work_type context of each list in the
+    # form view, so editing lines does not need a server onchange round-trip.
     
     # Summaries
     summary1 = fields.Html(string="Yesterday Work Summary")
@@ -85,6 +60,19 @@ class SupportStaff(models.Model):
     is_manager = fields.Boolean(string="Is Manager", compute="_compute_is_manager")
     is_director = fields.Boolean(string='Is Director', compute="_compute_is_manager")
 
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        # Default list order and the "Today" filter
+        tools.create_index(cr, 'support_staff_date_id_idx', self._table, ['date', 'id'])
+        # Status filters, pending counters and the archive cron
+        tools.create_index(cr, 'support_staff_state_date_idx', self._table, ['state', 'date'])
+        # "My Reports", the own and team rules and per-day uniqueness
+        tools.create_index(cr, 'support_staff_name_date_idx', self._table, ['name', 'date'])
+
+    def _change_feed_children(self):
+        return [self.yesterday_wrk_support_ids | self.today_wrk_support_ids | self.balance_wrk_support_ids]
+
     @api.depends('start_time', 'end_time')
     def _compute_total_work_hours(self):
         for record in self:
@@ -104,16 +92,40 @@ class SupportStaff(models.Model):
 
     @api.constrains('name', 'date')
     def _check_unique_record_per_day(self):
+        duplicates = {
+            (employee.id, day)
+            for employee, day, count in self._read_group(
+                [('name', 'in', self.name.ids), ('date', 'in', list(set(self.mapped('date'))))],
+                ['name', 'date:day'], ['__count'])
+            if count > 1
+        }
         for record in self:
-            domain = [
-                ('name', '=', record.name.id),
-                ('date', '=', record.date),
-                ('id', '!=', record.id),
-            ]
-            if self.search_count(domain) > 0:
+            if (record.name.id, record.date) in duplicates:
                 raise ValidationError(_("You have already submitted a support staff report for this day."))
 
+    def write(self, vals):
+        if 'state' in vals:
+            self.env['dwr.pending.counter']._invalidate_reports(self)
+            # The PDF of an approved report is cached as an attachment; drop it once the state moves on
+            self.filtered(lambda r: r.state == 'approved' and r.state != vals['state'])._unlink_cached_pdf()
+            Audit = self.env['dwr.audit.log']
+            if Audit._is_compact():
+                Audit._log_transitions(
+                    self, vals['state'], reason=vals.get('reject_reason') or self.env.context.get('dwr_audit_reason'))
+                self = self.with_context(tracking_disable=True)
+        return super(SupportStaff, self).write(vals)
+
+    def _unlink_cached_pdf(self):
+        if self:
+            self.env['ir.attachment'].sudo().search([
+                ('res_model', '=', self._name),
+                ('res_id', 'in', self.ids),
+                ('name', '=like', 'DWR-%.pdf'),
+            ]).unlink()
+
+    @perf_tracked('support.staff.action_submit')
     def action_submit(self):
+        self._snapshot_org_units()
         self.write({
             'state': 'submitted',
             'prepared_by': self.env.user.employee_id.id,
@@ -137,6 +149,7 @@ class SupportStaff(models.Model):
             except Exception:
                 pass
 
+    @perf_tracked('support.staff.action_approve')
     def action_approve(self):
         if self.is_director or self.is_manager:
             self.write({
@@ -183,6 +196,7 @@ class SupportStaff(models.Model):
 
         return res
 
+    @perf_tracked('support.staff.action_rejection')
     def action_rejection(self):
         if self.is_director or self.is_manager:
             return {
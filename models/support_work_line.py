@@ -1,9 +1,10 @@
-from odoo import fields, models
+from odoo import fields, models, tools
 
 
 class SupportWorkLine(models.Model):
     _name = 'support.work.line'
     _description = 'Support Work Line'
+    _inherit = ['dwr.change.feed.mixin']
 
     support_staff_id = fields.Many2one('support.staff', string='Support Staff', ondelete='cascade')
     work_type = fields.Selection([
@@ -14,4 +15,10 @@ class SupportWorkLine(models.Model):
     
     name = fields.Char(string='Work Description', required=True)
     time_taken = fields.Char(string='Time Taken (HH:MM)', required=True)
-    current_status = fields.Many2one('job.status', string='Status', required=True)
\ No newline at end of file
+    current_status = fields.Many2one('job.status', string='Status', required=True)
+
+    def init(self):
+        super().init()
+        # The three one2many fields of support.staff each read the lines of one work type
+        tools.create_index(self.env.cr, 'support_work_line_support_staff_id_work_type_idx', self._table,
+                           ['support_staff_id', 'work_type'])
\ No newline at end of file
@@ -0,0 +1,109 @@
+/** @odoo-module **/
+
+import { Component } from "@odoo/owl";
+import { _t } from "@web/core/l10n/translation";
+import { registry } from "@web/core/registry";
+import { CharField, charField } from "@web/views/fields/char/char_field";
+import { standardWidgetProps } from "@web/views/widgets/standard_widget_props";
+
+const TIME_RE = /^(\d{1,2})(?::([0-5]?\d))?$/;
+
+/**
+ * Parse a duration typed as "H", "H:MM" or "HH:MM" into minutes.
+ * Returns null when the value is not a valid time of at most 23:59.
+ */
+export function parseDuration(value) {
+    const match = TIME_RE.exec((value || "").trim());
+    if (!match) {
+        return null;
+    }
+    const hours = parseInt(match[1], 10);
+    const minutes = match[2] ? parseInt(match[2], 10) : 0;
+    if (hours > 23 || minutes > 59) {
+        return null;
+    }
+    return hours * 60 + minutes;
+}
+
+export function formatDuration(totalMinutes) {
+    const sign = totalMinutes < 0 ? "-" : "";
+    const abs = Math.abs(totalMinutes);
+    const hours = String(Math.floor(abs / 60)).padStart(2, "0");
+    const minutes = String(abs % 60).padStart(2, "0");
+    return `${sign}${hours}:${minutes}`;
+}
+
+/**
+ * Char field that validates and normalises HH:MM durations in the browser, so a wrong
+ * value is flagged immediately instead of after a server round-trip.
+ */
+export class DwrTimeField extends CharField {
+    parse(value) {
+        if (!value) {
+            return value;
+        }
+        const minutes = parseDuration(value);
+        if (minutes === null) {
+            throw new Error(_t("Time must be in HH:MM format (e.g., 02:00, 13:30)."));
+        }
+        return formatDuration(minutes);
+    }
+}
+
+registry.category("fields").add("dwr_time_hhmm", {
+    ...charField,
+    component: DwrTimeField,
+});
+
+/**
+ * Running total of the report lines against the expected working hours, computed
+ * client-side from the lines currently in the form.
+ */
+export class DwrWorkTotals extends Component {
+    static template = "daily_work_report.WorkTotals";
+    static props = {
+        ...standardWidgetProps,
+        linesField: { type: String, optional: true },
+        expectedField: { type: String, optional: true },
+    };
+    static defaultProps = {
+        linesField: "report_ids",
+        expectedField: "total_work_hours",
+    };
+
+    get loggedMinutes() {
+        const lines = this.props.record.data[this.props.linesField];
+        if (!lines) {
+            return 0;
+        }
+        return lines.records.reduce((total, line) => total + (parseDuration(line.data.time_taken) || 0), 0);
+    }
+
+    get expectedMinutes() {
+        return parseDuration(this.props.record.data[this.props.expectedField]) || 0;
+    }
+
+    get logged() {
+        return formatDuration(this.loggedMinutes);
+    }
+
+    get difference() {
+        return formatDuration(this.loggedMinutes - this.expectedMinutes);
+    }
+
+    get statusClass() {
+        const diff = this.loggedMinutes - this.expectedMinutes;
+        if (diff < 0) {
+            return "text-warning";
+        }
+        return diff > 0 ? "text-info" : "text-success";
+    }
+}
+
+registry.category("view_widgets").add("dwr_work_totals", {
+    component: DwrWorkTotals,
+    extractProps: ({ attrs }) => ({
+        linesField: attrs.lines_field,
+        expectedField: attrs.expected_field,
+    }),
+});
@@ -0,0 +1,52 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, onWillUnmount, useState } from "@odoo/owl";
+import { Dropdown } from "@web/core/dropdown/dropdown";
+import { DropdownItem } from "@web/core/dropdown/dropdown_item";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+
+// The counter is cached server side, so polling it is a single lookup
+const REFRESH_INTERVAL = 5 * 60 * 1000;
+
+/**
+ * Systray badge with the number of reports waiting for the current user's approval.
+ */
+export class DwrPendingSystray extends Component {
+    static template = "daily_work_report.PendingSystray";
+    static components = { Dropdown, DropdownItem };
+    static props = {};
+
+    setup() {
+        this.orm = useService("orm");
+        this.action = useService("action");
+        this.state = useState({ employeeReport: 0, supportStaff: 0, visible: false });
+        onWillStart(() => this.refresh());
+        const interval = setInterval(() => this.refresh(), REFRESH_INTERVAL);
+        onWillUnmount(() => clearInterval(interval));
+    }
+
+    get total() {
+        return this.state.employeeReport + this.state.supportStaff;
+    }
+
+    async refresh() {
+        const counts = await this.orm.call("dwr.pending.counter", "get_pending_counts", []);
+        Object.assign(this.state, {
+            employeeReport: counts.employee_report,
+            supportStaff: counts.support_staff,
+            visible: counts.is_approver,
+        });
+    }
+
+    async open(model) {
+        const action = await this.orm.call("dwr.pending.counter", "action_open_pending", [model]);
+        if (action) {
+            this.action.doAction(action);
+        }
+    }
+}
+
+registry.category("systray").add("daily_work_report.pending_systray", {
+    Component: DwrPendingSystray,
+}, { sequence: 30 });
@@ -0,0 +1,161 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, useState } from "@odoo/owl";
+import { _t } from "@web/core/l10n/translation";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { formatDuration, parseDuration } from "./daily_report";
+
+const { DateTime } = luxon;
+
+/**
+ * Weekly entry grid: an employee's reports of a whole week edited in place, loaded with a
+ * single call and saved with another (dwr.week.grid).
+ */
+export class DwrWeekGrid extends Component {
+    static template = "daily_work_report.WeekGrid";
+    static props = ["*"];
+
+    setup() {
+        this.orm = useService("orm");
+        this.notification = useService("notification");
+        this.state = useState({ grid: null, weekStart: DateTime.now().toISODate(), saving: false });
+        this.nextLineKey = 1;
+        onWillStart(() => this.load());
+    }
+
+    get dirty() {
+        return Boolean(this.state.grid && this.state.grid.days.some((day) => day.dirty));
+    }
+
+    setGrid(grid) {
+        for (const day of grid.days) {
+            day.dirty = false;
+            day.managerChanged = false;
+            day.deletedLineIds = [];
+            for (const line of day.lines) {
+                line.key = this.nextLineKey++;
+                line.dirty = false;
+            }
+        }
+        this.state.grid = grid;
+        this.state.weekStart = grid.week_start;
+    }
+
+    async load() {
+        const grid = await this.orm.call("dwr.week.grid", "get_week_grid", [this.state.weekStart]);
+        this.setGrid(grid);
+    }
+
+    async moveWeek(weeks) {
+        if (this.dirty && !window.confirm(_t("Discard the unsaved changes of this week?"))) {
+            return;
+        }
+        this.state.weekStart = DateTime.fromISO(this.state.weekStart).plus({ weeks }).toISODate();
+        await this.load();
+    }
+
+    dayLabel(day) {
+        return DateTime.fromISO(day.date).toFormat("ccc dd LLL");
+    }
+
+    loggedMinutes(day) {
+        return day.lines.reduce((total, line) => total + (parseDuration(line.time_taken) || 0), 0);
+    }
+
+    totalsClass(day) {
+        return this.loggedMinutes(day) >= (parseDuration(day.total_work_hours) || 0) ? "text-success" : "text-warning";
+    }
+
+    formatMinutes(minutes) {
+        return formatDuration(minutes);
+    }
+
+    onManagerChange(day, ev) {
+        day.reporting_manager_id = parseInt(ev.target.value, 10) || false;
+        day.managerChanged = true;
+        day.dirty = true;
+    }
+
+    onLineChange(day, line, field, ev) {
+        let value = ev.target.value;
+        if (field === "current_status") {
+            value = parseInt(value, 10) || false;
+        } else if (field === "time_taken" && value) {
+            const minutes = parseDuration(value);
+            if (minutes === null) {
+                this.notification.add(_t("Time must be in HH:MM format (e.g., 02:00, 13:30)."), { type: "danger" });
+                ev.target.value = line.time_taken || "";
+                return;
+            }
+            value = formatDuration(minutes);
+            ev.target.value = value;
+        }
+        line[field] = value || false;
+        line.dirty = true;
+        day.dirty = true;
+    }
+
+    addLine(day) {
+        day.lines.push({
+            key: this.nextLineKey++,
+            id: false,
+            sequence: day.lines.length ? day.lines[day.lines.length - 1].sequence + 1 : 1,
+            project_id: "",
+            task_id: "",
+            activity: "",
+            time_taken: "",
+            current_status: false,
+            to_work_on: "",
+            expected_close_date: false,
+            remarks_if_any: "",
+            dirty: true,
+        });
+        day.dirty = true;
+    }
+
+    removeLine(day, line) {
+        day.lines.splice(day.lines.indexOf(line), 1);
+        if (line.id) {
+            day.deletedLineIds.push(line.id);
+        }
+        day.dirty = true;
+    }
+
+    lineValues(line) {
+        const { key, dirty, ...values } = line;
+        return values;
+    }
+
+    async save() {
+        const changes = this.state.grid.days.filter((day) => day.dirty).map((day) => {
+            const change = {
+                id: day.id,
+                date: day.date,
+                lines: day.lines.filter((line) => line.dirty).map((line) => this.lineValues(line)),
+                deleted_line_ids: day.deletedLineIds,
+            };
+            if (!day.id || day.managerChanged) {
+                change.reporting_manager_id = day.reporting_manager_id;
+            }
+            return change;
+        });
+        if (!changes.length) {
+            return;
+        }
+        this.state.saving = true;
+        try {
+            const grid = await this.orm.call("dwr.week.grid", "save_week_grid", [this.state.weekStart, changes]);
+            this.setGrid(grid);
+            this.notification.add(_t("The week has been saved."), { type: "success" });
+        } finally {
+            this.state.saving = false;
+        }
+    }
+
+    async discard() {
+        await this.load();
+    }
+}
+
+registry.category("actions").add("daily_work_report.week_grid", DwrWeekGrid);
@@ -0,0 +1,14 @@
+from . import test_query_counts
+from . import test_query_plans
+from . import test_replica
+from . import test_org_snapshot
+from . import test_concern_clusters
+from . import test_week_grid
+from . import test_escalation_policy
+from . import test_report_archive
+from . import test_change_feed
+from . import test_ingest
+from . import test_approvals
+from . import test_escalations
+from . import test_anomaly
+from . import test_snapshot
\ No newline at end of file
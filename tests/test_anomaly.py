@@ -0,0 +1,45 @@
+import unittest
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.daily_work_report.models.dwr_anomaly import np, score_reports
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+@tagged('post_install', '-at_install')
+class TestAnomalies(TransactionCase):
+    """Scoring of the logged hours and lines, and clearing of the reports no longer scored."""
+
+    def test_score_reports(self):
+        # Two employees, sorted by employee and date
+        employee_ids = np.array([1, 1, 1, 1, 2, 2])
+        minutes = np.array([480, 480, 480, 240, 480, 480])
+        expected = np.array([480, 480, 480, 480, 480, 240])
+        fingerprints = np.array([7, 7, 9, 9, 7, 0])
+        deviation, hours_streak, lines_streak = score_reports(employee_ids, minutes, expected, fingerprints)
+        self.assertEqual(deviation.tolist(), [0.0, 0.0, 0.0, -50.0, 0.0, 100.0])
+        # Runs do not continue across employees
+        self.assertEqual(hours_streak.tolist(), [3, 3, 3, 1, 2, 2])
+        # Reports without lines are not part of a run
+        self.assertEqual(lines_streak.tolist(), [2, 2, 2, 2, 1, 0])
+
+    def test_flags_cleared_when_no_longer_scored(self):
+        employee = self.env['hr.employee'].create({'name': 'AN Employee'})
+        today = fields.Date.today()
+        reports = self.env['employee.report'].create([{
+            'name': employee.id,
+            'date': today - timedelta(days=i),
+            'state': 'submitted',
+        } for i in range(3)])
+        Detector = self.env['dwr.anomaly.detector']
+        Detector._detect_anomalies(today - timedelta(days=30))
+        self.assertTrue(all(reports.mapped('anomaly_under_hours')))
+
+        reports[0].write({'state': 'draft'})
+        stats = Detector._detect_anomalies(today - timedelta(days=1))
+        # Reset to draft, and out of the window
+        self.assertEqual(stats['cleared'], 2)
+        self.assertEqual(reports.mapped('anomaly_under_hours'), [False, True, False])
+        self.assertEqual(reports[2].hours_deviation, 0)
@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestApprovals(TransactionCase):
+    """Approval rows and decisions under the any, all and project policies."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, no_reset_password=True))
+        groups = 'base.group_user,daily_work_report.group_staff_manager'
+        cls.manager_user = new_test_user(cls.env, login='dwr_ap_manager', groups=groups)
+        cls.owner_user = new_test_user(cls.env, login='dwr_ap_owner', groups=groups)
+        cls.manager = cls.env['hr.employee'].create({'name': 'AP Manager', 'user_id': cls.manager_user.id})
+        cls.owner = cls.env['hr.employee'].create({'name': 'AP Project Owner', 'user_id': cls.owner_user.id})
+        cls.employee = cls.env['hr.employee'].create({'name': 'AP Employee', 'parent_id': cls.manager.id})
+        cls.env['employee.additional.manager'].create({
+            'employee_id': cls.employee.id,
+            'manager_id': cls.owner.id,
+            'project_names': 'Alpha',
+        })
+        cls.other_user = new_test_user(cls.env, login='dwr_ap_other', groups=groups)
+        cls.other = cls.env['hr.employee'].create({'name': 'AP Other Owner', 'user_id': cls.other_user.id})
+        cls.env['employee.additional.manager'].create({
+            'employee_id': cls.employee.id,
+            'manager_id': cls.other.id,
+            'project_names': 'Gamma',
+        })
+        cls.completed = cls.env.ref('daily_work_report.job_status_completed')
+
+    def _submitted_report(self, policy, day=None):
+        self.env['ir.config_parameter'].sudo().set_param('daily_work_report.approval_policy', policy)
+        report = self.env['employee.report'].create({
+            'name': self.employee.id,
+            'reporting_manager_id': self.manager.id,
+            'date': day or fields.Date.today(),
+            'state': 'submitted',
+            'submitted_time': fields.Datetime.now(),
+            'report_ids': [(0, 0, {
+                'project_id': project,
+                'time_taken': '04:00',
+                'current_status': self.completed.id,
+            }) for project in ('Alpha', 'Beta')],
+        })
+        report._create_approvals()
+        return report
+
+    def _approve(self, report, user):
+        return report.with_user(user).action_approve()
+
+    def test_any(self):
+        report = self._submitted_report('any')
+        self.assertEqual(report.approval_ids.approver_id, self.manager | self.owner)
+        self.assertIn('effect', self._approve(report, self.owner_user))
+        self.assertEqual(report.state, 'approved')
+
+    def test_all(self):
+        report = self._submitted_report('all')
+        action = self._approve(report, self.manager_user)
+        self.assertEqual(action['tag'], 'display_notification')
+        self.assertEqual(report.state, 'submitted')
+        with self.assertRaises(UserError):
+            self._approve(report, self.manager_user)
+        self.assertIn('effect', self._approve(report, self.owner_user))
+        self.assertEqual(report.state, 'approved')
+        self.assertEqual(set(report.approval_ids.mapped('state')), {'approved'})
+
+    def test_project(self):
+        report = self._submitted_report('project')
+        projects = {approval.approver_id: approval.project_names for approval in report.approval_ids}
+        self.assertEqual(projects, {self.owner: 'Alpha', self.manager: 'Beta'})
+        self._approve(report, self.owner_user)
+        self.assertEqual(report.state, 'submitted')
+        self._approve(report, self.manager_user)
+        self.assertEqual(report.state, 'approved')
+
+    def test_unrelated_manager_cannot_approve_on_behalf(self):
+        report = self._submitted_report('project')
+        self.assertNotIn(self.other, report.approval_ids.approver_id)
+        with self.assertRaises(UserError):
+            self._approve(report, self.other_user)
+        self.assertEqual(set(report.approval_ids.mapped('state')), {'pending'})
+        # The escalation target approves on behalf of the project owners
+        self.env['dwr.escalation']._cancel_pending(report)
+        self.env['dwr.escalation'].create({
+            'employee_report_id': report.id,
+            'scheduled_datetime': fields.Datetime.now() + timedelta(days=1),
+            'created_by': self.other_user.id,
+        })
+        self.assertIn('effect', self._approve(report, self.other_user))
+        self.assertEqual(report.state, 'approved')
+
+    def test_pending_approver_acts_on_a_later_day(self):
+        yesterday = fields.Date.today() - timedelta(days=1)
+        report = self._submitted_report('all', day=yesterday)
+        self._approve(report, self.manager_user)
+        self._approve(report, self.owner_user)
+        self.assertEqual(report.state, 'approved')
+        # Under the first-approval-wins policy managers stay limited to today's reports
+        report = self._submitted_report('any', day=yesterday - timedelta(days=1))
+        with self.assertRaises(UserError):
+            self._approve(report, self.manager_user)
@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+from odoo.tests import HttpCase, new_test_user, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestChangeFeed(HttpCase):
+    """The change feed pages through rows sharing a write_date and serves tombstones."""
+
+    def setUp(self):
+        super().setUp()
+        new_test_user(self.env, login='dwr_cf_admin', password='dwr_cf_admin',
+                      groups='base.group_user,daily_work_report.group_admin')
+        self.employee = self.env['hr.employee'].create({'name': 'CF Employee'})
+        # Written by one transaction: all the reports share the same write_date
+        self.reports = self.env['employee.report'].create([{
+            'name': self.employee.id,
+            'date': date(2024, 1, 1) + timedelta(days=i),
+        } for i in range(7)])
+        self._age('employee_report', 'write_date', self.reports.ids)
+        self.authenticate('dwr_cf_admin', 'dwr_cf_admin')
+
+    def _age(self, table, column, ids):
+        """Move the rows past the margin of the feed"""
+        self.env.flush_all()
+        self.env.cr.execute(
+            "UPDATE %s SET %s = %s - interval '1 hour' WHERE id = ANY(%%s)" % (table, column, column), [ids])
+        self.env.invalidate_all()
+
+    def _get(self, cursor=None, headers=None):
+        url = '/dwr/api/changes/employee_reports?limit=3'
+        if cursor:
+            url += '&cursor=%s' % cursor
+        return self.url_open(url, headers=headers)
+
+    def _pull(self, cursor=None):
+        """Follow the pages from ``cursor``; the ids of the records and tombstones served"""
+        records, deleted = [], []
+        for _page in range(20):
+            response = self._get(cursor)
+            self.assertEqual(response.status_code, 200)
+            payload = response.json()
+            records += [row['id'] for row in payload['records']]
+            deleted += [tombstone['id'] for tombstone in payload['deleted']]
+            cursor = payload['next_cursor']
+            if not payload['has_more']:
+                return records, deleted, cursor
+        self.fail("The cursor does not move forward")
+
+    def test_pages_and_tombstones(self):
+        records, deleted, cursor = self._pull()
+        served = [record_id for record_id in records if record_id in self.reports.ids]
+        self.assertEqual(served, sorted(self.reports.ids))
+        self.assertFalse(deleted)
+
+        # Recent changes wait for the margin; old enough tombstones are served
+        recent = self.env['employee.report'].create({'name': self.employee.id, 'date': date(2024, 2, 1)})
+        removed = self.reports[0]
+        removed.unlink()
+        self.env.cr.execute("UPDATE dwr_deletion_log SET deleted_at = deleted_at - interval '1 hour'"
+                            " WHERE res_model = 'employee.report' AND res_id = %s", [removed.id])
+        records, deleted, cursor = self._pull(cursor)
+        self.assertNotIn(recent.id, records)
+        self.assertEqual(deleted, [removed.id])
+
+        self._age('employee_report', 'write_date', recent.ids)
+        records, deleted, cursor = self._pull(cursor)
+        self.assertEqual(records, recent.ids)
+        self.assertFalse(deleted)
+
+    def test_not_modified(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        response = self._get(headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
@@ -0,0 +1,115 @@
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestConcernClusters(TransactionCase):
+    """Near-duplicate concerns of submitted reports share a cluster and its concern action."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.employees = cls.env['hr.employee'].create([{'name': 'CC Employee %s' % i} for i in range(4)])
+        cls.Cluster = cls.env['dwr.concern.cluster']
+
+    def _reports(self, concerns, concern_field='student_concerns'):
+        return self.env['employee.report'].create([{
+            'name': employee.id,
+            'prepared_by': employee.id,
+            'date': fields.Date.today(),
+            concern_field: text,
+            'has_concerns': True,
+        } for employee, text in zip(self.employees, concerns)])
+
+    def _member(self, report, concern_type='student'):
+        return self.env['dwr.concern.cluster.member'].search([
+            ('employee_report_id', '=', report.id), ('concern_type', '=', concern_type)])
+
+    def test_near_duplicates_share_a_cluster(self):
+        reports = self._reports([
+            "Student Rahul (class 7B) has been absent for 3 days, parents not reachable",
+            "student rahul of class 7B absent for 3 days - parents not reachable",
+            "Projector in room 12 is not working since Monday",
+            "None",
+        ])
+        self.Cluster._index_reports(reports)
+        first, second, other, empty = (self._member(report) for report in reports)
+        self.assertEqual(first.cluster_id, second.cluster_id)
+        self.assertNotEqual(first.cluster_id, other.cluster_id)
+        self.assertFalse(empty)
+        self.assertEqual(first.cluster_id.member_count, 2)
+        self.assertEqual(first.cluster_id.employee_count, 2)
+
+    def test_reindex_edited_concern(self):
+        reports = self._reports([
+            "Projector in room 12 is not working since Monday",
+            "Projector in room 12 not working since monday",
+        ])
+        self.Cluster._index_reports(reports)
+        cluster = self._member(reports[0]).cluster_id
+        # Unchanged concerns are left alone
+        self.Cluster._index_reports(reports)
+        self.assertEqual(self._member(reports[0]).cluster_id, cluster)
+        reports[1].student_concerns = "Library books for class 9 have not arrived"
+        self.Cluster._index_reports(reports[1])
+        self.assertNotEqual(self._member(reports[1]).cluster_id, cluster)
+        self.assertEqual(cluster.member_count, 1)
+        reports[0].student_concerns = False
+        self.Cluster._index_reports(reports[0])
+        self.assertFalse(self._member(reports[0]))
+        self.assertFalse(cluster.exists())
+
+    def test_concern_action_links_cluster(self):
+        reports = self._reports([
+            "Water cooler on the second floor is leaking",
+            "The water cooler on second floor is leaking again",
+        ], concern_field='other_concerns')
+        self.Cluster._index_reports(reports)
+        cluster = self._member(reports[0], 'other').cluster_id
+        cluster.action_create_concern_action()
+        self.assertEqual(cluster.concern_action_id.cluster_id, cluster)
+        self.assertEqual(cluster.concern_action_id.cluster_member_ids.employee_report_id, reports)
+        # A concern raised from another report of the cluster joins it without taking it over
+        concern = self.env['concern.action'].create({
+            'name': 'Water cooler',
+            'employee_report_id': reports[1].id,
+            'employee_id': reports[1].name.id,
+            'concern_type': 'other',
+            'description': '<p>Leak</p>',
+        })
+        self.assertEqual(concern.cluster_id, cluster)
+        self.assertNotEqual(cluster.concern_action_id, concern)
+
+    def test_submitted_concerns_indexed_by_cron(self):
+        reports = self._reports([
+            "Drinking water tap near the lab is broken",
+            "The drinking water tap near the lab is broken again",
+        ])
+        reports.write({'has_concerns': False})
+        reports.action_submit()
+        # Submitting only flags the reports; the clusters are shared rows left to the cron
+        self.assertEqual(reports.mapped('has_concerns'), [True, True])
+        self.assertFalse(any(reports.mapped('concerns_indexed')))
+        self.assertFalse(self._member(reports[0]))
+        self.Cluster._cron_index_reports()
+        self.assertTrue(all(reports.mapped('concerns_indexed')))
+        self.assertEqual(self._member(reports[0]).cluster_id, self._member(reports[1]).cluster_id)
+
+    def test_deleted_reports_leave_their_cluster(self):
+        reports = self._reports([
+            "Smart board in room 4 does not turn on",
+            "Smart board in room 4 doesn't turn on",
+        ])
+        self.Cluster._index_reports(reports)
+        cluster = self._member(reports[0]).cluster_id
+        cluster.action_create_concern_action()
+        concern = cluster.concern_action_id
+        reports[0].unlink()
+        self.assertEqual(cluster.member_count, 1)
+        self.assertEqual(cluster.employee_count, 1)
+        # Its last member gone, the cluster and its buckets go and the concern action is released
+        reports[1].unlink()
+        self.assertFalse(cluster.exists())
+        self.assertFalse(self.env['dwr.concern.bucket'].search_count([('cluster_id', '=', cluster.id)]))
+        self.assertFalse(concern.cluster_id)
@@ -0,0 +1,79 @@
+from datetime import date, datetime, timedelta
+
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import mute_logger
+
+from ..models.dwr_escalation import (
+    EscalationPolicy, Hierarchy, Submission, WorkingCalendar, schedule_after, simulate_escalations,
+)
+
+# Monday 10:30 in Asia/Kolkata, as naive UTC
+MONDAY = datetime(2024, 3, 4, 5, 0)
+DEFAULT_POLICY = EscalationPolicy(1, 16.0, 1, 14.0, 'Asia/Kolkata', False, False)
+
+
+@tagged('post_install', '-at_install')
+class TestEscalationPolicy(TransactionCase):
+    """The escalation schedule follows the configured policy and can be replayed offline."""
+
+    def test_default_schedule(self):
+        # Next day 16:00 IST, then the following day 14:00 IST
+        first = schedule_after(MONDAY, 1, 16.0, 'Asia/Kolkata')
+        self.assertEqual(first, datetime(2024, 3, 5, 10, 30))
+        self.assertEqual(schedule_after(first, 1, 14.0, 'Asia/Kolkata'), datetime(2024, 3, 6, 8, 30))
+
+    def test_working_days(self):
+        calendar = WorkingCalendar(frozenset(range(5)), frozenset({date(2024, 3, 11)}))
+        friday = MONDAY + timedelta(days=4)
+        # Saturday, Sunday and the Monday holiday are skipped
+        self.assertEqual(schedule_after(friday, 1, 16.0, 'Asia/Kolkata', calendar), datetime(2024, 3, 12, 10, 30))
+
+    def test_calendar_without_working_days(self):
+        # Falls back to calendar days instead of searching forever
+        calendar = WorkingCalendar(frozenset(), frozenset())
+        self.assertEqual(schedule_after(MONDAY, 1, 16.0, 'Asia/Kolkata', calendar), datetime(2024, 3, 5, 10, 30))
+
+    def test_invalid_policy_parameters(self):
+        Escalation = self.env['dwr.escalation']
+        params = self.env['ir.config_parameter'].sudo()
+        params.set_param('daily_work_report.escalation_first_hour', '24')
+        params.set_param('daily_work_report.escalation_repeat_days', 'two')
+        params.set_param('daily_work_report.escalation_timezone', 'Mars/Olympus')
+        params.set_param('daily_work_report.escalation_first_days', '3')
+        with mute_logger('odoo.addons.daily_work_report.models.dwr_escalation'):
+            policy = Escalation._get_policy()
+        self.assertEqual(policy, DEFAULT_POLICY._replace(first_days=3))
+        with self.assertRaises(UserError):
+            Escalation._set_policy(DEFAULT_POLICY._replace(repeat_hour=25.0))
+
+    def test_policy_round_trip(self):
+        Escalation = self.env['dwr.escalation']
+        policy = DEFAULT_POLICY._replace(first_days=2, first_hour=9.5, working_days=True, digest=True)
+        Escalation._set_policy(policy)
+        self.assertEqual(Escalation._get_policy(), policy)
+        self.assertEqual(Escalation._schedule(MONDAY, policy=policy._replace(working_days=False)),
+                         datetime(2024, 3, 6, 4, 0))
+
+    def test_simulation(self):
+        # Employees 1 and 4 report to 2, who reports to 3
+        hierarchy = Hierarchy({1: 2, 4: 2, 2: 3, 3: False}, {1, 2, 3, 4}, {2, 3})
+        submissions = [
+            Submission(10, 1, MONDAY, None, None),
+            Submission(11, 4, MONDAY, None, None),
+            # Approved before the first escalation was due
+            Submission(12, 1, MONDAY, MONDAY + timedelta(hours=2), 'approved'),
+        ]
+        now = MONDAY + timedelta(days=10)
+        stats = simulate_escalations(submissions, hierarchy, DEFAULT_POLICY, now=now)
+        self.assertEqual(stats['submissions'], 3)
+        self.assertEqual(stats['escalated_reports'], 2)
+        self.assertEqual(stats['escalations'], 4)
+        self.assertEqual(stats['mails'], 4)
+        self.assertEqual(stats['managers'], 2)
+        self.assertEqual(stats['max_manager_day_mails'], 2)
+        self.assertAlmostEqual(stats['median_first_escalation_hours'], 29.5)
+        # The digest sends one mail per manager for the reports escalated together
+        digest = simulate_escalations(submissions, hierarchy, DEFAULT_POLICY._replace(digest=True), now=now)
+        self.assertEqual(digest['escalations'], 4)
+        self.assertEqual(digest['mails'], 2)
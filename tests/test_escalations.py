@@ -0,0 +1,184 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import psycopg2
+
+from odoo import fields
+from odoo.tests import TransactionCase, new_test_user, tagged
+from odoo.tools import mute_logger
+
+
+@tagged('post_install', '-at_install')
+class TestEscalations(TransactionCase):
+    """Escalation chains follow the report state, and the pending counters follow both."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, no_reset_password=True))
+        manager_groups = 'base.group_user,daily_work_report.group_staff_manager'
+        cls.director_user = new_test_user(cls.env, login='dwr_esc_director', groups=manager_groups)
+        cls.manager_user = new_test_user(cls.env, login='dwr_esc_manager', groups=manager_groups)
+        cls.outsider_user = new_test_user(cls.env, login='dwr_esc_outsider', groups=manager_groups)
+        cls.director = cls.env['hr.employee'].create({
+            'name': 'ESC Director',
+            'user_id': cls.director_user.id,
+            'work_email': 'esc.director@example.com',
+        })
+        cls.manager = cls.env['hr.employee'].create({
+            'name': 'ESC Manager',
+            'user_id': cls.manager_user.id,
+            'parent_id': cls.director.id,
+            'work_email': 'esc.manager@example.com',
+        })
+        cls.outsider = cls.env['hr.employee'].create({'name': 'ESC Outsider', 'user_id': cls.outsider_user.id})
+        cls.users = cls.env['res.users']
+        cls.employees = cls.env['hr.employee']
+        for i in range(3):
+            user = new_test_user(cls.env, login='dwr_esc_employee_%s' % i,
+                                 groups='base.group_user,daily_work_report.group_user')
+            cls.users |= user
+            cls.employees |= cls.env['hr.employee'].create({
+                'name': 'ESC Employee %s' % i,
+                'user_id': user.id,
+                'parent_id': cls.manager.id,
+            })
+        cls.completed = cls.env.ref('daily_work_report.job_status_completed')
+        cls.Escalation = cls.env['dwr.escalation']
+        cls.Counter = cls.env['dwr.pending.counter']
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(type(self.env['mail.mail']), 'send', lambda mails, *args, **kwargs: True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _submit(self, count=1):
+        reports = self.env['employee.report']
+        for user, employee in list(zip(self.users, self.employees))[:count]:
+            report = self.env['employee.report'].search([('name', '=', employee.id)]) or \
+                self.env['employee.report'].create({
+                    'name': employee.id,
+                    'reporting_manager_id': self.manager.id,
+                    'date': fields.Date.today(),
+                    'report_ids': [(0, 0, {
+                        'project_id': 'Project',
+                        'time_taken': '08:00',
+                        'current_status': self.completed.id,
+                    })],
+                })
+            report.with_user(user).action_submit()
+            reports |= report
+        return reports
+
+    def _escalations(self, reports):
+        return self.Escalation.search([('employee_report_id', 'in', reports.ids)], order='id')
+
+    def _pending_count(self, user):
+        return self.Counter.with_user(user).get_pending_counts()['employee_report']
+
+    def test_leaving_submitted_cancels_in_bulk(self):
+        reports = self._submit(3)
+        escalations = self._escalations(reports)
+        self.assertEqual(len(escalations), 3)
+        self.assertFalse(any(escalations.mapped('processed')))
+        reports[:2].with_user(self.manager_user).action_approve()
+        self.assertEqual(escalations[:2].mapped('cancelled'), [True, True])
+        self.assertTrue(all(escalations[:2].mapped('processed')))
+        self.assertFalse(escalations[2].processed)
+        self.env['report.reject.wizard'].with_user(self.manager_user).create({
+            'employee_report_ids': [(6, 0, reports[2].ids)],
+            'reason': 'Incomplete',
+        }).action_reject_report()
+        self.assertTrue(escalations[2].cancelled)
+
+    def test_resubmit_starts_a_fresh_chain(self):
+        report = self._submit()
+        report.write({'state': 'draft'})
+        report.with_user(self.users[0]).action_submit()
+        escalations = self._escalations(report)
+        self.assertEqual(escalations.mapped('cancelled'), [True, False])
+        self.assertEqual(escalations.mapped('processed'), [True, False])
+
+    @mute_logger('odoo.sql_db')
+    def test_single_active_chain(self):
+        report = self._submit()
+        with self.assertRaises(psycopg2.IntegrityError), self.cr.savepoint():
+            self.Escalation.create({
+                'employee_report_id': report.id,
+                'scheduled_datetime': fields.Datetime.now(),
+            })
+            self.env.flush_all()
+
+    def test_cron_escalates_level_by_level(self):
+        report = self._submit()
+        first = self._escalations(report)
+        first.scheduled_datetime = fields.Datetime.now() - timedelta(hours=1)
+        self.Escalation.process_due_escalations()
+        # The closed row is flushed before the next level is queued under the unique index
+        self.assertTrue(first.processed)
+        self.assertFalse(first.cancelled)
+        second = self._escalations(report) - first
+        self.assertEqual(len(second), 1)
+        self.assertEqual(second.created_by, self.manager_user)
+        self.assertFalse(second.processed)
+        self.assertEqual(self.env['mail.mail'].search_count([('email_to', '=', 'esc.manager@example.com'),
+                                                             ('res_id', '=', report.id)]), 1)
+
+        second.scheduled_datetime = fields.Datetime.now() - timedelta(hours=1)
+        self.Escalation.process_due_escalations()
+        # The director has no manager: the chain ends there
+        self.assertTrue(second.processed)
+        self.assertEqual(self._escalations(report), first | second)
+        self.assertEqual(self.env['mail.mail'].search_count([('email_to', '=', 'esc.director@example.com'),
+                                                             ('res_id', '=', report.id)]), 1)
+
+    def test_pending_counter_invalidation(self):
+        self.assertEqual(self._pending_count(self.manager_user), 0)
+        reports = self._submit(2)
+        # The shared rows are only deleted after the commit; this transaction skips them
+        self.env.cr.execute("SELECT count(*) FROM dwr_pending_counter WHERE user_id = %s", (self.manager_user.id,))
+        self.assertEqual(self.env.cr.fetchone()[0], 1)
+        # Submitting and approving change the count of the approver
+        self.assertEqual(self._pending_count(self.manager_user), 2)
+        reports[0].with_user(self.manager_user).action_approve()
+        self.assertEqual(self._pending_count(self.manager_user), 1)
+        # An escalation makes its target an approver
+        self.assertEqual(self._pending_count(self.outsider_user), 0)
+        self.Escalation._cancel_pending(reports[1])
+        escalation = self.Escalation.create({
+            'employee_report_id': reports[1].id,
+            'scheduled_datetime': fields.Datetime.now(),
+            'created_by': self.outsider_user.id,
+        })
+        self.assertEqual(self._pending_count(self.outsider_user), 1)
+        escalation.processed = True
+        self.assertEqual(self._pending_count(self.outsider_user), 0)
+        # So does becoming an additional manager, or the reporting manager
+        self.env['employee.additional.manager'].create({
+            'employee_id': self.employees[1].id,
+            'manager_id': self.outsider.id,
+        })
+        self.assertEqual(self._pending_count(self.outsider_user), 1)
+        self.assertEqual(self._pending_count(self.director_user), 0)
+        reports[1].reporting_manager_id = self.director
+        self.assertEqual(self._pending_count(self.director_user), 1)
+
+    def test_digest_mail_follows_the_policy(self):
+        Escalation = self.Escalation
+        Escalation._set_policy(Escalation._get_policy()._replace(timezone='UTC', digest=True))
+        reports = self._submit(2)
+        escalations = self._escalations(reports)
+        escalations.scheduled_datetime = fields.Datetime.now().replace(microsecond=0) - timedelta(hours=1)
+        Escalation.process_due_escalations()
+        mail = self.env['mail.mail'].search([('email_to', '=', 'esc.manager@example.com'),
+                                             ('subject', '=like', 'Escalation:%')])
+        self.assertEqual(len(mail), 1)
+        # The digest stays attached to a report, so the mail purge still covers it
+        self.assertEqual(mail.model, 'employee.report')
+        self.assertIn(mail.res_id, reports.ids)
+        # The deadlines come from the policy, in its timezone
+        self.assertIn('did not act by %s (UTC)' % escalations[0].scheduled_datetime.strftime('%Y-%m-%d %H:%M'),
+                      mail.body_html)
+        self.assertIn('it will escalate to your manager', mail.body_html)
+        self.assertNotIn('15 hours', mail.body_html)
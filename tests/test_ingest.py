@@ -0,0 +1,88 @@
+import json
+
+from odoo.tests import HttpCase, new_test_user, tagged
+
+URL = '/dwr/api/reports/batch'
+
+
+@tagged('post_install', '-at_install')
+class TestIngest(HttpCase):
+    """The batch ingest endpoint validates the whole payload and honours idempotency keys."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = new_test_user(self.env, login='dwr_ingest_user', password='dwr_ingest_user',
+                                  groups='base.group_user,daily_work_report.group_user')
+        self.manager = self.env['hr.employee'].create({'name': 'Ingest Manager'})
+        self.employee = self.env['hr.employee'].create({
+            'name': 'Ingest Employee',
+            'user_id': self.user.id,
+            'parent_id': self.manager.id,
+        })
+        self.authenticate('dwr_ingest_user', 'dwr_ingest_user')
+
+    def _post(self, payload, key):
+        return self.url_open(URL, data=json.dumps(payload), headers={
+            'Content-Type': 'application/json',
+            'Idempotency-Key': key,
+        })
+
+    def _report(self, day, **values):
+        return dict({
+            'date': day,
+            'reporting_manager_id': self.manager.id,
+            'lines': [{'project': 'CRM', 'task': 'Import', 'time_taken': '02:30', 'status': 'Completed'}],
+        }, **values)
+
+    def test_replay_with_the_same_key(self):
+        payload = {'reports': [self._report('2024-05-02'), self._report('2024-05-03')]}
+        response = self._post(payload, 'ingest-replay')
+        self.assertEqual(response.status_code, 201)
+        created = response.json()
+        self.assertFalse(created['replayed'])
+        self.assertEqual(len(created['reports']), 2)
+
+        response = self._post(payload, 'ingest-replay')
+        self.assertEqual(response.status_code, 201)
+        replayed = response.json()
+        self.assertTrue(replayed['replayed'])
+        self.assertEqual(replayed['reports'], created['reports'])
+        self.assertEqual(self.env['employee.report'].search_count([('name', '=', self.employee.id)]), 2)
+
+    def test_key_in_progress(self):
+        self.env['dwr.ingest.request'].with_user(self.user)._claim('ingest-busy')
+        response = self._post({'reports': [self._report('2024-05-02')]}, 'ingest-busy')
+        self.assertEqual(response.status_code, 409)
+
+    def test_mixed_errors(self):
+        payload = {'reports': [
+            self._report('2024-05-02'),
+            self._report('02/05/2024'),
+            self._report('2024-05-04', employee_id='me', reporting_manager_id=1.5, summary=['list']),
+            self._report('2024-05-05', lines=[
+                {'project': 'CRM', 'time_taken': 230, 'status': 'Completed'},
+                {'project': 'CRM', 'time_taken': '01:00', 'status': 7},
+                {'project': 'CRM', 'time_taken': '01:00', 'status': 'Completed', 'expected_close_date': '2024-13-45'},
+                'not a line',
+            ]),
+            self._report('2024-05-06', reporting_manager_id=10 ** 9, lines={'project': 'CRM'}),
+        ]}
+        response = self._post(payload, 'ingest-errors')
+        self.assertEqual(response.status_code, 422)
+        paths = {error['path'] for error in response.json()['errors']}
+        self.assertEqual(paths, {
+            'reports[1].date',
+            'reports[2].employee_id',
+            'reports[2].reporting_manager_id',
+            'reports[2].summary',
+            'reports[3].lines[0].time_taken',
+            'reports[3].lines[1].status',
+            'reports[3].lines[2].expected_close_date',
+            'reports[3].lines[3]',
+            'reports[4].lines',
+            'reports[4].reporting_manager_id',
+        })
+        self.assertFalse(self.env['employee.report'].search([('name', '=', self.employee.id)]))
+        # The rejected payload released its key: the corrected one is accepted
+        response = self._post({'reports': [self._report('2024-05-02')]}, 'ingest-errors')
+        self.assertEqual(response.status_code, 201)
@@ -0,0 +1,66 @@
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestOrgSnapshot(TransactionCase):
+    """The department and branch of a report are captured from the employee and only change
+    on submission or through the explicit backfill."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.company = cls.env.company
+        cls.other_company = cls.env['res.company'].create({'name': 'OS Branch'})
+        cls.department = cls.env['hr.department'].create({'name': 'OS Department'})
+        cls.other_department = cls.env['hr.department'].create({
+            'name': 'OS Other Department',
+            'company_id': cls.other_company.id,
+        })
+        cls.employees = cls.env['hr.employee'].create([{
+            'name': 'OS Employee %s' % i,
+            'department_id': cls.department.id,
+        } for i in range(3)])
+        cls.reports = cls.env['employee.report'].create([{
+            'name': employee.id,
+            'prepared_by': employee.id,
+            'date': fields.Date.today(),
+        } for employee in cls.employees])
+
+    def _transfer(self):
+        """Bulk HR update of the employees"""
+        self.employees.write({'department_id': self.other_department.id, 'company_id': self.other_company.id})
+        self.env.flush_all()
+        self.env.invalidate_all()
+
+    def test_captured_on_create(self):
+        for report in self.reports:
+            self.assertEqual(report.department_id, self.department)
+            self.assertEqual(report.branch_id, self.company.partner_id)
+
+    def test_employee_update_keeps_reports(self):
+        write_dates = {report.id: report.write_date for report in self.reports}
+        self._transfer()
+        for report in self.reports:
+            self.assertEqual(report.department_id, self.department)
+            self.assertEqual(report.branch_id, self.company.partner_id)
+            self.assertEqual(report.write_date, write_dates[report.id])
+
+    def test_captured_on_submit(self):
+        self._transfer()
+        self.reports[0]._snapshot_org_units()
+        self.assertEqual(self.reports[0].department_id, self.other_department)
+        self.assertEqual(self.reports[0].branch_id, self.other_company.partner_id)
+        self.assertEqual(self.reports[1].department_id, self.department)
+
+    def test_backfill(self):
+        self._transfer()
+        Report = self.env['employee.report']
+        domain = [('id', 'in', self.reports[:2].ids)]
+        self.assertEqual(Report._backfill_org_units(domain, batch_size=1), 2)
+        self.assertEqual(self.reports[:2].department_id, self.other_department)
+        self.assertEqual(self.reports[:2].branch_id, self.other_company.partner_id)
+        self.assertEqual(self.reports[2].department_id, self.department)
+        # Reports already up to date are left alone
+        self.assertEqual(Report._backfill_org_units(domain), 0)
@@ -0,0 +1,204 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+# Recordset sizes every workflow action is measured with; the query bound must hold for all of them
+SIZES = (1, 10, 100)
+
+
+@tagged('post_install', '-at_install')
+class TestQueryCounts(TransactionCase):
+    """Guard the workflow actions against N+1 queries.
+
+    Each action runs for recordsets of 1, 10 and 100 reports; it must stay under the same
+    upper bound of SQL queries and run no more queries for a larger recordset than for a
+    smaller one. Outgoing mail transport is stubbed out, and tracking (which
+    is flushed at commit time) is disabled so only the action itself is measured.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, no_reset_password=True))
+        cls.director_user = new_test_user(
+            cls.env, login='dwr_qc_director', groups='base.group_user,daily_work_report.group_directors')
+        cls.manager_user = new_test_user(
+            cls.env, login='dwr_qc_manager', groups='base.group_user,daily_work_report.group_hod')
+        cls.director = cls.env['hr.employee'].create({
+            'name': 'QC Director',
+            'user_id': cls.director_user.id,
+            'work_email': 'director@example.com',
+        })
+        cls.manager = cls.env['hr.employee'].create({
+            'name': 'QC Manager',
+            'user_id': cls.manager_user.id,
+            'parent_id': cls.director.id,
+            'work_email': 'manager@example.com',
+        })
+        group_ids = (cls.env.ref('base.group_user') | cls.env.ref('daily_work_report.group_user')).ids
+        users = cls.env['res.users'].create([{
+            'name': 'QC Employee %s' % i,
+            'login': 'dwr_qc_employee_%s' % i,
+            'email': 'employee%s@example.com' % i,
+            'groups_id': [(6, 0, group_ids)],
+        } for i in range(sum(SIZES))])
+        employees = cls.env['hr.employee'].create([{
+            'name': user.name,
+            'user_id': user.id,
+            'parent_id': cls.manager.id,
+            'work_email': user.email,
+        } for user in users])
+        # Disjoint slices so each size works on its own employees
+        cls.slices = {}
+        offset = 0
+        for size in SIZES:
+            cls.slices[size] = employees[offset:offset + size]
+            offset += size
+        cls.completed = cls.env.ref('daily_work_report.job_status_completed')
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _report_vals(self, employees, state='draft'):
+        today = fields.Date.today()
+        return [{
+            'name': employee.id,
+            'reporting_manager_id': self.manager.id,
+            'prepared_by': employee.id,
+            'date': today,
+            'state': state,
+            'submitted_time': fields.Datetime.now() if state != 'draft' else False,
+            'report_ids': [(0, 0, {
+                'project_id': 'Project',
+                'task_id': 'Task %s' % i,
+                'time_taken': '01:00',
+                'current_status': self.completed.id,
+            }) for i in range(3)],
+        } for employee in employees]
+
+    def _create_reports(self, size, state='draft'):
+        return self.env['employee.report'].create(self._report_vals(self.slices[size], state=state))
+
+    def _count_queries(self, func):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        start = self.cr.sql_log_count
+        func()
+        self.env.flush_all()
+        return self.cr.sql_log_count - start
+
+    def assertQueryBound(self, bound, prepare, action):
+        """Assert that ``action(prepare(size))`` runs at most ``bound`` queries for every size,
+        and no more for a size than for the previous one"""
+        counts = {}
+        with patch.object(type(self.env['mail.mail']), 'send', lambda mails, *args, **kwargs: True):
+            for size in SIZES:
+                prepared = prepare(size)
+                counts[size] = self._count_queries(lambda: action(prepared))
+        for size, count in counts.items():
+            self.assertLessEqual(
+                count, bound,
+                "%s queries for a recordset of %s (bound %s); counts per size: %s" % (count, size, bound, counts))
+        for smaller, larger in zip(SIZES, SIZES[1:]):
+            self.assertLessEqual(
+                counts[larger], counts[smaller],
+                "Query count grows with the recordset size: %s" % counts)
+
+    # ------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------
+
+    def test_create_constraints(self):
+        self.assertQueryBound(
+            40,
+            lambda size: self._report_vals(self.slices[size]),
+            lambda vals_list: self.env['employee.report'].create(vals_list),
+        )
+
+    def test_compute_is_manager(self):
+        self.assertQueryBound(
+            15,
+            lambda size: self._create_reports(size).with_user(self.manager_user),
+            lambda reports: reports.mapped('is_manager'),
+        )
+
+    def test_action_submit(self):
+        self.assertQueryBound(
+            60,
+            lambda size: self._create_reports(size).with_user(self.manager_user),
+            lambda reports: reports.action_submit(),
+        )
+
+    def test_action_approve(self):
+        self.assertQueryBound(
+            60,
+            lambda size: self._create_reports(size, state='submitted').with_user(self.manager_user),
+            lambda reports: reports.action_approve(),
+        )
+
+    def test_action_reject(self):
+        self.assertQueryBound(
+            20,
+            lambda size: self._create_reports(size, state='submitted').with_user(self.manager_user),
+            lambda reports: reports.action_reject(),
+        )
+
+    def test_reject_wizard(self):
+        def prepare(size):
+            reports = self._create_reports(size, state='submitted')
+            return self.env['report.reject.wizard'].with_user(self.manager_user).create({
+                'employee_report_id': reports[0].id,
+                'employee_report_ids': [(6, 0, reports.ids)],
+                'reason': 'Incomplete',
+            })
+        self.assertQueryBound(50, prepare, lambda wizard: wizard.action_reject_report())
+
+    def test_message_post(self):
+        def prepare(size):
+            # The manager check must not scale with the number of additional managers
+            report = self._create_reports(size)[0]
+            extra_managers = self.env['hr.employee'].create([
+                {'name': 'QC Extra Manager %s-%s' % (size, i)} for i in range(size)])
+            self.env['employee.additional.manager'].create([{
+                'employee_id': report.name.id,
+                'manager_id': manager.id,
+            } for manager in extra_managers])
+            return report.with_user(self.manager_user)
+        self.assertQueryBound(
+            60, prepare, lambda report: report.message_post(body='Please add details', message_type='comment'))
+
+    def test_concern_wizard(self):
+        def prepare(size):
+            # The action joins the concern cluster of the report, shared by all ``size`` reports
+            reports = self._create_reports(size, state='submitted')
+            reports.write({
+                'employee_concerns': 'Lab equipment for the chemistry practicals is missing (batch %s)' % size,
+                'has_concerns': True,
+            })
+            self.env['dwr.concern.cluster']._index_reports(reports)
+            return self.env['concern.action.wizard'].create({
+                'employee_report_id': reports[0].id,
+                'name': 'Follow up',
+                'concern_type': 'employee',
+                'description': '<p>Needs attention</p>',
+            })
+        self.assertQueryBound(40, prepare, lambda wizard: wizard.action_create_concern_action())
+
+    def test_default_report_ids(self):
+        def prepare(size):
+            self.env['job.status'].create([{'name': 'QC Status %s-%s' % (size, i)} for i in range(size)])
+            return self.env['employee.report']
+        self.assertQueryBound(5, prepare, lambda Report: Report._default_report_ids())
+
+    def test_escalation_cron(self):
+        def prepare(size):
+            reports = self._create_reports(size, state='submitted')
+            self.env['dwr.escalation'].create([{
+                'employee_report_id': report.id,
+                'scheduled_datetime': fields.Datetime.now() - timedelta(hours=1),
+            } for report in reports])
+            return self.env['dwr.escalation']
+        self.assertQueryBound(80, prepare, lambda Escalation: Escalation.process_due_escalations())
@@ -0,0 +1,224 @@
+import datetime
+import time
+
+from dateutil.relativedelta import relativedelta
+from lxml import etree
+
+from odoo import fields
+from odoo.tests import TransactionCase, new_test_user, tagged
+from odoo.tools import SQL
+from odoo.tools.safe_eval import safe_eval
+
+# Tables the module indexes; a plan must not scan any of them in full
+INDEXED_TABLES = {
+    'employee_report', 'report', 'support_staff', 'support_work_line', 'concern_action', 'dwr_escalation',
+}
+# Nodes that consume their whole input: an index walk below them is not stopped early by a LIMIT
+BLOCKING_NODES = {'Sort', 'Incremental Sort', 'Aggregate', 'Hash', 'Materialize', 'Unique', 'SetOp'}
+
+# Size of the generated dataset
+EMPLOYEES = 200
+MANAGERS = 10
+REPORT_DAYS = 60
+SUPPORT_DAYS = 30
+# Page size of the list views
+LIST_LIMIT = 80
+
+
+@tagged('post_install', '-at_install')
+class TestQueryPlans(TransactionCase):
+    """Guard the indexes against the access paths that use them.
+
+    A synthetic dataset is generated with SQL and analyzed, then every filter shipped in the
+    search views (evaluated for a manager, in list view order and page size), the manager record
+    rules and the line, concern and cron lookups are explained with sequential scans disabled.
+    A plan fails when it still reads one of the module's tables in full: a sequential scan, or
+    an index walk without an index condition that no LIMIT stops early.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, no_reset_password=True))
+        cls.manager_user = new_test_user(
+            cls.env, login='dwr_qp_manager', groups='base.group_user,daily_work_report.group_hod')
+        director = cls.env['hr.employee'].create({'name': 'QP Director'})
+        managers = cls.env['hr.employee'].create([{
+            'name': 'QP Manager %s' % i,
+            'parent_id': director.id,
+            'user_id': cls.manager_user.id if i == 0 else False,
+        } for i in range(MANAGERS)])
+        employees = cls.env['hr.employee'].create([{
+            'name': 'QP Employee %s' % i,
+            'parent_id': managers[i % MANAGERS].id,
+        } for i in range(EMPLOYEES)])
+        cls.env.flush_all()
+        cls._generate(
+            (managers | employees).ids,
+            cls.env.ref('daily_work_report.job_status_completed').id,
+        )
+
+    @classmethod
+    def _generate(cls, employee_ids, status_id):
+        cr = cls.env.cr
+        cr.execute("""
+            INSERT INTO employee_report
+                (name, reporting_manager_id, prepared_by, date, state, submitted_time, has_concerns,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT e.id, e.parent_id, e.id, current_date - d,
+                   CASE WHEN d = 0 THEN 'draft'
+                        WHEN d < 3 THEN 'submitted'
+                        WHEN (e.id + d) %% 40 = 0 THEN 'rejected'
+                        ELSE 'approved' END,
+                   CASE WHEN d > 0 THEN (now() at time zone 'UTC') - make_interval(days => d) END,
+                   (e.id + d) %% 25 = 0,
+                   1, (now() at time zone 'UTC'), 1, (now() at time zone 'UTC')
+              FROM hr_employee e, generate_series(0, %s) d
+             WHERE e.id = ANY(%s)
+        """, (REPORT_DAYS - 1, employee_ids))
+        cr.execute("""
+            INSERT INTO report (employee_id, sequence, project_id, task_id, time_taken, current_status,
+                                create_date, write_date)
+            SELECT r.id, s, 'Project ' || (r.id %% 7), 'Task ' || s, '01:00', %s,
+                   (now() at time zone 'UTC'), (now() at time zone 'UTC')
+              FROM employee_report r, generate_series(1, 3) s
+             WHERE r.name = ANY(%s)
+        """, (status_id, employee_ids))
+        cr.execute("""
+            INSERT INTO support_staff (name, prepared_by, date, state, create_date, write_date)
+            SELECT e.id, e.id, current_date - d,
+                   CASE WHEN d = 0 THEN 'draft' WHEN d < 3 THEN 'submitted' ELSE 'approved' END,
+                   (now() at time zone 'UTC'), (now() at time zone 'UTC')
+              FROM hr_employee e, generate_series(0, %s) d
+             WHERE e.id = ANY(%s)
+        """, (SUPPORT_DAYS - 1, employee_ids))
+        cr.execute("""
+            INSERT INTO support_work_line (support_staff_id, work_type, name, time_taken, current_status,
+                                           create_date, write_date)
+            SELECT s.id, (ARRAY['yesterday', 'today', 'balance'])[t], 'Work ' || t, '01:00', %s,
+                   (now() at time zone 'UTC'), (now() at time zone 'UTC')
+              FROM support_staff s, generate_series(1, 3) t
+             WHERE s.name = ANY(%s)
+        """, (status_id, employee_ids))
+        cr.execute("""
+            INSERT INTO concern_action (name, employee_report_id, employee_id, concern_type, description,
+                                        state, priority, assigned_to, create_date, write_date)
+            SELECT 'Concern ' || r.id, r.id, r.name, 'employee', '<p>Needs attention</p>',
+                   CASE WHEN r.date > current_date - 7 THEN 'in_progress'
+                        WHEN r.id %% 9 = 0 THEN 'draft'
+                        ELSE 'resolved' END,
+                   (ARRAY['low', 'medium', 'high', 'urgent'])[1 + r.id %% 4],
+                   r.reporting_manager_id,
+                   coalesce(r.submitted_time, (now() at time zone 'UTC')), (now() at time zone 'UTC')
+              FROM employee_report r
+             WHERE r.has_concerns AND r.name = ANY(%s)
+        """, (employee_ids,))
+        # History of processed escalations, and a pending one per submitted report
+        cr.execute("""
+            INSERT INTO dwr_escalation (employee_report_id, scheduled_datetime, processed, cancelled,
+                                        created_by, create_date)
+            SELECT r.id, r.submitted_time + interval '15 hours', r.state <> 'submitted', r.state = 'rejected',
+                   %s, r.submitted_time
+              FROM employee_report r
+             WHERE r.submitted_time IS NOT NULL AND r.name = ANY(%s)
+        """, (cls.manager_user.id, employee_ids))
+        for table in sorted(INDEXED_TABLES):
+            cr.execute(SQL("ANALYZE %s", SQL.identifier(table)))
+
+    def setUp(self):
+        super().setUp()
+        # Reverted with the test savepoint
+        self.env.cr.execute("SET LOCAL enable_seqscan = off")
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _view_filters(self, model):
+        """Domain filters of the search view of ``model``, as the web client evaluates them"""
+        Model = self.env[model]
+        today = fields.Date.context_today(Model)
+        eval_context = {
+            'uid': self.manager_user.id,
+            'context_today': lambda: today,
+            'datetime': datetime,
+            'relativedelta': relativedelta,
+            'time': time,
+        }
+        arch = etree.fromstring(Model.get_view(view_type='search')['arch'])
+        return [
+            (node.get('name') or node.get('string'), safe_eval(node.get('domain'), eval_context))
+            for node in arch.iter('filter') if node.get('domain')
+        ]
+
+    def _full_scans(self, node, limited=False):
+        """Scans of the indexed tables in ``node`` that read the whole table"""
+        node_type = node['Node Type']
+        relation = node.get('Relation Name')
+        scans = []
+        if relation in INDEXED_TABLES:
+            if node_type == 'Seq Scan':
+                scans.append('Seq Scan on %s' % relation)
+            elif node_type in ('Index Scan', 'Index Only Scan') and 'Index Cond' not in node and not limited:
+                scans.append('full %s on %s using %s' % (node_type, relation, node['Index Name']))
+        if node_type == 'Limit':
+            limited = True
+        elif node_type in BLOCKING_NODES:
+            limited = False
+        for child in node.get('Plans', []):
+            scans += self._full_scans(child, limited)
+        return scans
+
+    def assertIndexed(self, Model, domain, limit=None, order=None):
+        query = Model._search(domain, limit=limit, order=order or Model._order)
+        self.env.cr.execute(SQL("EXPLAIN (FORMAT JSON) %s", query.select()))
+        plan = self.env.cr.fetchone()[0][0]['Plan']
+        scans = self._full_scans(plan)
+        self.assertFalse(scans, "%s %s is not served by an index: %s" % (Model._name, domain, ', '.join(scans)))
+
+    def assertFiltersIndexed(self, model):
+        filters = self._view_filters(model)
+        self.assertTrue(filters)
+        for name, domain in filters:
+            with self.subTest(filter=name):
+                self.assertIndexed(self.env[model], domain, limit=LIST_LIMIT)
+
+    # ------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------
+
+    def test_employee_report_filters(self):
+        self.assertFiltersIndexed('employee.report')
+
+    def test_support_staff_filters(self):
+        self.assertFiltersIndexed('support.staff')
+
+    def test_concern_action_filters(self):
+        self.assertFiltersIndexed('concern.action')
+
+    def test_manager_record_rules(self):
+        for model in ('employee.report', 'support.staff'):
+            with self.subTest(model=model):
+                self.assertIndexed(self.env[model].with_user(self.manager_user), [], limit=LIST_LIMIT)
+
+    def test_code_access_paths(self):
+        reports = self.env['employee.report'].search([('state', '=', 'submitted')], limit=10)
+        support_reports = self.env['support.staff'].search([('state', '=', 'submitted')], limit=10)
+        cutoff = fields.Date.today() - relativedelta(days=REPORT_DAYS // 2)
+        paths = [
+            # One2many reads of the report lines
+            ('report', [('employee_id', 'in', reports.ids)], None, None),
+            ('support.work.line', [('support_staff_id', 'in', support_reports.ids), ('work_type', '=', 'today')],
+             None, None),
+            ('concern.action', [('employee_report_id', 'in', reports.ids)], None, None),
+            # Escalation cron and pending escalations of reports
+            ('dwr.escalation', [('processed', '=', False), ('scheduled_datetime', '<=', fields.Datetime.now())],
+             None, None),
+            ('dwr.escalation', [('employee_report_id', 'in', reports.ids)], None, None),
+            # Per-day uniqueness check and the archive cron batches
+            ('employee.report', [('name', 'in', reports.name.ids), ('date', '=', fields.Date.today())], None, None),
+            ('employee.report', [('state', '=', 'approved'), ('date', '<', cutoff)], 500, 'id'),
+        ]
+        for model, domain, limit, order in paths:
+            with self.subTest(model=model, domain=domain):
+                self.assertIndexed(self.env[model], domain, limit=limit, order=order)
@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+import psycopg2
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import config, mute_logger
+
+from odoo.addons.daily_work_report.models import dwr_replica
+
+
+@tagged('post_install', '-at_install')
+class TestReplicaRouting(TransactionCase):
+    """Routing of the read-only workloads to the read replica.
+
+    The primary database stands in for the replica: a second connection to a server that is
+    not in recovery has no lag. ``test_configured_replica`` runs against the replica set in the
+    ``dwr_replica_uri`` option of the server configuration, e.g. a second local PostgreSQL
+    instance streaming from the primary.
+    """
+
+    def setUp(self):
+        super().setUp()
+        dwr_replica._replica_unavailable_until.clear()
+        self.addCleanup(dwr_replica._replica_unavailable_until.clear)
+        self.Replica = self.env['dwr.replica']
+
+    def _replica_uri(self, uri):
+        return patch.dict(config.options, {'dwr_replica_uri': uri})
+
+    def test_no_replica_configured(self):
+        with self._replica_uri(False), self.Replica._read_env('test') as env:
+            self.assertIs(env, self.env)
+
+    def test_routes_to_replica(self):
+        with self._replica_uri(self.env.cr.dbname), self.Replica._read_env('test') as env:
+            self.assertIsNot(env.cr, self.env.cr)
+            self.assertEqual(env.uid, self.env.uid)
+            # Uncommitted data of the primary transaction is not visible
+            self.env['hr.employee'].create({'name': 'Replica Test Employee'})
+            self.env.flush_all()
+            self.assertFalse(env['hr.employee'].search([('name', '=', 'Replica Test Employee')]))
+            with self.assertRaises(psycopg2.errors.ReadOnlySqlTransaction), mute_logger('odoo.sql_db'):
+                env.cr.execute("DELETE FROM dwr_pending_counter WHERE FALSE")
+
+    @mute_logger('odoo.addons.daily_work_report.models.dwr_replica')
+    def test_lag_over_threshold(self):
+        with self._replica_uri(self.env.cr.dbname), \
+                patch.object(dwr_replica, '_LAG_SQL', "SELECT 3600::float8"), \
+                self.Replica._read_env('test') as env:
+            self.assertIs(env, self.env)
+
+    @mute_logger('odoo.addons.daily_work_report.models.dwr_replica', 'odoo.sql_db')
+    def test_unreachable_replica(self):
+        uri = 'postgresql://localhost:1/dwr_missing?connect_timeout=1'
+        with self._replica_uri(uri):
+            with self.Replica._read_env('test') as env:
+                self.assertIs(env, self.env)
+            # Not retried before the delay expires
+            with patch.object(dwr_replica.sql_db, 'db_connect') as db_connect, self.Replica._read_env('test') as env:
+                self.assertIs(env, self.env)
+                db_connect.assert_not_called()
+
+    def test_routed_reads(self):
+        with self._replica_uri(self.env.cr.dbname):
+            groups = self.env['dwr.monthly.summary'].read_group([], ['days_reported:sum'], [])
+            self.assertEqual(len(groups), 1)
+            result = self.env['dwr.hierarchy.rollup'].web_search_read([], {'employee_id': {}}, limit=5)
+            self.assertIn('records', result)
+            self.assertIsInstance(self.env['dwr.hierarchy.rollup'].get_rollup_tree(), list)
+
+    def test_configured_replica(self):
+        if not config.get('dwr_replica_uri'):
+            self.skipTest('No dwr_replica_uri in the server configuration')
+        with self.Replica._read_env('test') as env:
+            self.assertIsNot(env.cr, self.env.cr, 'The configured replica is unreachable or lagging')
+            env.cr.execute("SELECT count(*) FROM employee_report")
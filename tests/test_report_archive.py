@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestReportArchive(TransactionCase):
+    """Old approved reports move to the archive with what refers to them."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.env['ir.config_parameter'].sudo().set_param('daily_work_report.archive_after_days', 30)
+        cls.employees = cls.env['hr.employee'].create([{'name': 'AR Employee %s' % i} for i in range(2)])
+        completed = cls.env.ref('daily_work_report.job_status_completed')
+        old = fields.Date.today() - timedelta(days=60)
+        cls.reports = cls.env['employee.report'].create([{
+            'name': employee.id,
+            'prepared_by': employee.id,
+            'date': old,
+            'student_concerns': "Library books for class 9 have not arrived, students share one copy",
+            'has_concerns': True,
+            'report_ids': [(0, 0, {
+                'project_id': 'Archive Project',
+                'task_id': 'Quarterly ledger %s' % i,
+                'time_taken': '08:00',
+                'current_status': completed.id,
+            })],
+        } for i, employee in enumerate(cls.employees)])
+        cls.env['dwr.concern.cluster']._index_reports(cls.reports)
+        cls.reports.write({'state': 'approved'})
+
+    def test_archive_and_search(self):
+        report = self.reports[0]
+        message = report.message_post(body="Checked with accounts")
+        concern_action = self.env['concern.action'].create({
+            'name': 'Library books',
+            'employee_report_id': report.id,
+            'employee_id': report.name.id,
+            'concern_type': 'student',
+            'description': 'Order the books',
+        })
+        cluster = concern_action.cluster_id
+        self.assertEqual(cluster.member_count, 2)
+
+        self.env['employee.report.archive']._cron_archive_reports()
+
+        self.assertFalse(self.reports.exists())
+        Archive = self.env['employee.report.archive']
+        archive = Archive.search([('source_model', '=', 'employee.report'), ('source_id', '=', report.id)])
+        self.assertEqual(len(archive), 1)
+        self.assertEqual(Archive.search([('lines_text', 'ilike', 'Quarterly ledger 0')]), archive)
+        self.assertEqual(len(Archive.search([('lines_text', 'ilike', 'Archive Project')])), 2)
+        # The chatter, the concern action and the cluster follow the archive row
+        self.assertIn(message, archive.message_ids)
+        self.assertEqual(concern_action.archive_id, archive)
+        self.assertEqual(archive.concern_action_ids, concern_action)
+        self.assertTrue(cluster.exists())
+        self.assertEqual(cluster.member_count, 2)
+        self.assertEqual(set(cluster.member_ids.archive_id.mapped('source_id')), set(self.reports.ids))
+
+    def test_monthly_summary_of_partly_archived_month(self):
+        employee = self.employees[0]
+        month = (fields.Date.today() - timedelta(days=90)).replace(day=1)
+        submitted = fields.Datetime.now() - timedelta(days=90)
+        completed = self.env.ref('daily_work_report.job_status_completed')
+        reports = self.env['employee.report'].create([{
+            'name': employee.id,
+            'date': month + timedelta(days=i),
+            'state': state,
+            'submitted_time': submitted,
+            'approved_time': submitted + timedelta(hours=2) if state == 'approved' else False,
+            'report_ids': [(0, 0, {
+                'project_id': 'Summary Project',
+                'time_taken': '04:00',
+                'current_status': completed.id,
+            })],
+        } for i, state in enumerate(['approved', 'approved', 'submitted'])])
+        Summary = self.env['dwr.monthly.summary']
+        Summary._refresh({(employee.id, month)})
+
+        def summary():
+            row = Summary.search([('employee_id', '=', employee.id), ('month', '=', month)])
+            return row.read(['days_reported', 'days_approved', 'total_minutes', 'completed_line_count'], load=None)
+
+        expected = summary()
+        self.assertEqual(expected[0]['days_reported'], 3)
+        # Only the approved days move to the archive; the month keeps counting them
+        self.env['employee.report.archive']._cron_archive_reports()
+        self.assertEqual(reports.exists(), reports[2])
+        Summary.action_rebuild()
+        self.assertEqual(summary(), expected)
+        reports[2].write({'state': 'approved', 'approved_time': fields.Datetime.now()})
+        Summary._refresh({(employee.id, month)})
+        self.assertEqual(summary()[0]['days_approved'], 3)
+        self.assertEqual(summary()[0]['total_minutes'], 3 * 240)
@@ -0,0 +1,110 @@
+import csv
+import gzip
+import os
+import tempfile
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.daily_work_report.models.dwr_anomaly import _CLEAR_SQL
+from odoo.addons.daily_work_report.models.dwr_snapshot import DATASETS
+
+
+@tagged('post_install', '-at_install')
+class TestSnapshotDays(TransactionCase):
+    """An incremental snapshot rewrites every day whose rows changed, left or lost a row."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.employee = employee = cls.env['hr.employee'].create({'name': 'Snapshot Employee'})
+        completed = cls.env.ref('daily_work_report.job_status_completed')
+        cls.days = [fields.Date.today() - timedelta(days=10 + i) for i in range(4)]
+        cls.reports = cls.env['employee.report'].create([{
+            'name': employee.id,
+            'prepared_by': employee.id,
+            'date': day,
+            'report_ids': [(0, 0, {
+                'project_id': 'Snapshot Project',
+                'task_id': 'Task %s' % i,
+                'time_taken': '08:00',
+                'current_status': completed.id,
+            }) for i in range(2)],
+        } for day in cls.days[:3]])
+        cls.env.flush_all()
+        # Rows written before the previous run
+        cls.env.cr.execute("SELECT now() at time zone 'UTC'")
+        cls.since = cls.env.cr.fetchone()[0] - timedelta(minutes=1)
+        cls.env.cr.execute("UPDATE employee_report SET write_date = %s WHERE id = ANY(%s)",
+                           (cls.since - timedelta(days=1), cls.reports.ids))
+        cls.env.cr.execute("UPDATE report SET write_date = %s WHERE id = ANY(%s)",
+                           (cls.since - timedelta(days=1), cls.reports.report_ids.ids))
+        cls.env.invalidate_all()
+
+    def _changed_days(self):
+        self.env.flush_all()
+        self.env.cr.execute(DATASETS['employee_report']['days'], {'since': self.since})
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    def test_unchanged(self):
+        self.assertEqual(self._changed_days(), set())
+
+    def test_deleted_report_and_line(self):
+        self.reports[0].unlink()
+        self.reports[1].report_ids[0].unlink()
+        self.assertEqual(self._changed_days(), {self.days[0], self.days[1]})
+
+    def test_moved_report(self):
+        self.reports[2].date = self.days[3]
+        self.assertEqual(self._changed_days(), {self.days[2], self.days[3]})
+
+    def test_cleared_anomaly_flags(self):
+        self.env.cr.execute("UPDATE employee_report SET anomaly_under_hours = TRUE WHERE id = %s",
+                            (self.reports[1].id,))
+        self.env.cr.execute(_CLEAR_SQL, {'date_from': self.days[0]})
+        self.assertEqual(self._changed_days(), {self.days[1]})
+
+    def test_export_drops_deleted_report(self):
+        Exporter = self.env['dwr.snapshot.exporter']
+        with tempfile.TemporaryDirectory() as directory:
+            Exporter._export_snapshot(directory, 'csv')
+            path = os.path.join(
+                directory, 'employee_report', 'month=%s' % self.days[0].strftime('%Y-%m'),
+                '%s.csv.gz' % self.days[0].isoformat())
+            self.assertTrue(os.path.exists(path))
+            self.reports[0].unlink()
+            stats = Exporter._export_snapshot(directory, 'csv', self.since)
+            self.assertFalse(os.path.exists(path))
+            self.assertEqual(stats['employee_report'], 0)
+
+    def test_export_drops_deleted_concern(self):
+        concerns = self.env['concern.action'].create([{
+            'name': 'Snapshot concern %s' % i,
+            'employee_report_id': report.id,
+            'employee_id': self.employee.id,
+            'concern_type': 'student',
+            'description': 'Broken projector',
+        } for i, report in enumerate(self.reports[:2])])
+        self.env.flush_all()
+        self.env.cr.execute("UPDATE concern_action SET write_date = %s WHERE id = ANY(%s)",
+                            (self.since - timedelta(days=1), concerns.ids))
+        day = concerns[0].create_date.date()
+        Exporter = self.env['dwr.snapshot.exporter']
+        with tempfile.TemporaryDirectory() as directory:
+            Exporter._export_snapshot(directory, 'csv')
+            path = os.path.join(directory, 'concern_action', 'month=%s' % day.strftime('%Y-%m'),
+                                '%s.csv.gz' % day.isoformat())
+            self.assertTrue(os.path.exists(path))
+            # A deleted concern, and a concern whose report is deleted (its link is set to null)
+            concerns[0].unlink()
+            self.reports[1].unlink()
+            self.env.flush_all()
+            self.env.cr.execute(DATASETS['concern_action']['days'], {'since': self.since})
+            self.assertEqual([row[0] for row in self.env.cr.fetchall()], [day])
+            Exporter._export_snapshot(directory, 'csv', self.since)
+            with gzip.open(path, 'rt', newline='') as fh:
+                rows = [row for row in csv.DictReader(fh) if int(row['concern_id']) in concerns.ids]
+            self.assertEqual([row['concern_id'] for row in rows], [str(concerns[1].id)])
+            self.assertEqual(rows[0]['report_id'], '')
@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+
+from odoo.exceptions import UserError, ValidationError
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+# A Monday in the past, so the grid covers a full week of drafts
+WEEK_START = date(2024, 3, 4)
+
+
+@tagged('post_install', '-at_install')
+class TestWeekGrid(TransactionCase):
+    """The weekly grid loads and saves a whole week in one call each."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, no_reset_password=True))
+        cls.user = new_test_user(cls.env, login='dwr_wg_employee', groups='base.group_user,daily_work_report.group_user')
+        cls.manager = cls.env['hr.employee'].create({'name': 'WG Manager'})
+        cls.employee = cls.env['hr.employee'].create({
+            'name': 'WG Employee',
+            'user_id': cls.user.id,
+            'parent_id': cls.manager.id,
+        })
+        cls.completed = cls.env.ref('daily_work_report.job_status_completed')
+        cls.Grid = cls.env['dwr.week.grid'].with_user(cls.user)
+
+    def _line(self, task, time_taken='02:00', **values):
+        return dict({
+            'project_id': 'Project',
+            'task_id': task,
+            'time_taken': time_taken,
+            'current_status': self.completed.id,
+        }, **values)
+
+    def _save_new_days(self, count):
+        changes = [{
+            'id': False,
+            'date': (WEEK_START + timedelta(days=i)).isoformat(),
+            'lines': [self._line('Task %s-%s' % (i, n)) for n in range(3)],
+        } for i in range(count)]
+        return self.Grid.save_week_grid(WEEK_START.isoformat(), changes)
+
+    def test_load_empty_week(self):
+        grid = self.Grid.get_week_grid((WEEK_START + timedelta(days=2)).isoformat())
+        self.assertEqual(grid['week_start'], WEEK_START.isoformat())
+        self.assertEqual(len(grid['days']), 6)
+        self.assertTrue(all(day['editable'] and not day['id'] for day in grid['days']))
+        self.assertEqual(grid['managers'], [{'id': self.manager.id, 'name': self.manager.name}])
+
+    def test_save_new_and_changed_days(self):
+        grid = self._save_new_days(3)
+        saved = [day for day in grid['days'] if day['id']]
+        self.assertEqual(len(saved), 3)
+        self.assertEqual([len(day['lines']) for day in saved], [3, 3, 3])
+        self.assertEqual(saved[0]['reporting_manager_id'], self.manager.id)
+        first = saved[0]
+        grid = self.Grid.save_week_grid(WEEK_START.isoformat(), [{
+            'id': first['id'],
+            'date': first['date'],
+            'lines': [dict(first['lines'][0], time_taken='03:30'), self._line('Extra')],
+            'deleted_line_ids': [first['lines'][1]['id']],
+        }])
+        lines = grid['days'][0]['lines']
+        self.assertEqual([line['task_id'] for line in lines], ['Task 0-0', 'Task 0-2', 'Extra'])
+        self.assertEqual(lines[0]['time_taken'], '03:30')
+
+    def test_same_line_values_written_once(self):
+        grid = self._save_new_days(2)
+        Line = type(self.env['report'])
+        writes = []
+        write = Line.write
+
+        def counted_write(records, vals):
+            if records and 'to_work_on' in vals:
+                writes.append(records.ids)
+            return write(records, vals)
+
+        self.patch(Line, 'write', counted_write)
+        changes = [{
+            'id': day['id'],
+            'date': day['date'],
+            'lines': [{'id': line['id'], 'to_work_on': 'Done'} for line in day['lines']],
+        } for day in grid['days'] if day['id']]
+        grid = self.Grid.save_week_grid(WEEK_START.isoformat(), changes)
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(len(writes[0]), 6)
+        self.assertEqual({line['to_work_on'] for day in grid['days'] for line in day['lines']}, {'Done'})
+
+    def test_constraints_checked_once_for_the_batch(self):
+        with self.assertRaises(ValidationError):
+            self.Grid.save_week_grid(WEEK_START.isoformat(), [{
+                'id': False,
+                'date': WEEK_START.isoformat(),
+                'lines': [self._line('Bad time', time_taken='9h')],
+            }])
+        in_progress = self.env.ref('daily_work_report.job_status_in_progress')
+        with self.assertRaises(ValidationError):
+            # An open task needs its follow-up, whichever day of the batch it is in
+            self.Grid.save_week_grid(WEEK_START.isoformat(), [{
+                'id': False,
+                'date': (WEEK_START + timedelta(days=i)).isoformat(),
+                'lines': [self._line('Task %s' % i, current_status=(in_progress if i == 3 else self.completed).id)],
+            } for i in range(5)])
+
+    def test_submitted_day_is_read_only(self):
+        grid = self._save_new_days(1)
+        report = self.env['employee.report'].browse(grid['days'][0]['id'])
+        report.state = 'submitted'
+        with self.assertRaises(UserError):
+            self.Grid.save_week_grid(WEEK_START.isoformat(), [{
+                'id': report.id,
+                'date': WEEK_START.isoformat(),
+                'lines': [self._line('Late')],
+            }])
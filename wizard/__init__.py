@@ -1,2 +1,3 @@
 from . import report_reject_wizard
-from . import concern_action_wizard
\ No newline at end of file
+from . import concern_action_wizard
+from . import escalation_simulator
\ No newline at end of file
@@ -1,5 +1,7 @@
 from odoo import api, fields, models, _
 
+from ..models.dwr_perf import perf_tracked
+
 
 class ConcernActionWizard(models.TransientModel):
     _name = 'concern.action.wizard'
@@ -36,6 +38,7 @@ class ConcernActionWizard(models.TransientModel):
             if concern_text:
                 self.description = f"<p><strong>Original Concern:</strong></p><p>{concern_text}</p><br/><p><strong>Action Required:</strong></p><p></p>"
 
+    @perf_tracked('concern.action.wizard.action_create_concern_action')
     def action_create_concern_action(self):
         """Create concern action record"""
         vals = {
@@ -0,0 +1,117 @@
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models, _
+from odoo.addons.base.models.res_partner import _tz_get
+from odoo.exceptions import UserError, ValidationError
+
+from ..models.dwr_escalation import EscalationPolicy, simulate_escalations
+from ..models.dwr_perf import perf_tracked
+
+# Policy fields of the wizard, named as in EscalationPolicy
+POLICY_FIELDS = list(EscalationPolicy._fields)
+
+
+class EscalationSimulator(models.TransientModel):
+    """Replay the historical submissions under the current escalation policy and a proposed one.
+
+    The submissions of the period and the reporting hierarchy are read once; both policies are
+    then replayed in memory and compared line by line. "Apply" makes the proposed policy the
+    configured one.
+    """
+    _name = 'dwr.escalation.simulator'
+    _description = 'DWR Escalation Policy Simulator'
+
+    date_from = fields.Date(string='From', required=True, default=lambda self: fields.Date.today() - timedelta(days=90))
+    date_to = fields.Date(string='To', required=True, default=fields.Date.today)
+    first_days = fields.Integer(string='First Escalation After (Days)', required=True)
+    first_hour = fields.Float(string='First Escalation At', required=True)
+    repeat_days = fields.Integer(string='Next Level After (Days)', required=True)
+    repeat_hour = fields.Float(string='Next Level At', required=True)
+    timezone = fields.Selection(_tz_get, string='Timezone', required=True)
+    working_days = fields.Boolean(string='Working Days Only',
+                                  help="Move escalations to the next working day of the company's working schedule")
+    digest = fields.Boolean(string='Daily Digest',
+                            help="Send a manager one mail for all the reports escalated to them at the same time")
+    line_ids = fields.One2many('dwr.escalation.simulator.line', 'simulator_id', string='Results', readonly=True)
+    duration = fields.Float(string='Replay Time (s)', digits=(16, 2), readonly=True)
+
+    @api.model
+    def default_get(self, fields_list):
+        values = super().default_get(fields_list)
+        policy = self.env['dwr.escalation']._get_policy()
+        for name in POLICY_FIELDS:
+            if name in fields_list and name not in values:
+                values[name] = getattr(policy, name)
+        return values
+
+    def _get_policy(self):
+        self.ensure_one()
+        return EscalationPolicy(**{name: self[name] for name in POLICY_FIELDS})
+
+    @api.constrains('first_days', 'repeat_days', 'first_hour', 'repeat_hour')
+    def _check_policy(self):
+        for wizard in self:
+            if wizard.first_days < 0 or wizard.repeat_days < 0:
+                raise ValidationError(_("Escalation delays cannot be negative."))
+            if not (0 <= wizard.first_hour < 24 and 0 <= wizard.repeat_hour < 24):
+                raise ValidationError(_("Escalation hours must be between 00:00 and 23:59."))
+
+    @perf_tracked('dwr.escalation.simulator.action_simulate')
+    def action_simulate(self):
+        self.ensure_one()
+        if self.date_from > self.date_to:
+            raise UserError(_("The start of the period must be before its end."))
+        Escalation = self.env['dwr.escalation']
+        start = time.perf_counter()
+        submissions, hierarchy = Escalation._load_history(self.date_from, self.date_to + timedelta(days=1))
+        calendar = Escalation._get_working_calendar()
+        lines = [(5, 0, 0)]
+        for name, policy in ((_('Current'), Escalation._get_policy()), (_('Proposed'), self._get_policy())):
+            stats = simulate_escalations(submissions, hierarchy, policy, calendar=calendar)
+            lines.append((0, 0, dict(stats, name=name)))
+        self.write({'line_ids': lines, 'duration': time.perf_counter() - start})
+        return self._reopen()
+
+    def action_apply(self):
+        self.ensure_one()
+        self.env['dwr.escalation']._set_policy(self._get_policy())
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'message': _("The escalation policy has been updated."),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    def _reopen(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Escalation Policy Simulator'),
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+
+class EscalationSimulatorLine(models.TransientModel):
+    _name = 'dwr.escalation.simulator.line'
+    _description = 'DWR Escalation Policy Simulation Result'
+
+    simulator_id = fields.Many2one('dwr.escalation.simulator', required=True, ondelete='cascade')
+    name = fields.Char(string='Policy', readonly=True)
+    submissions = fields.Integer(string='Submissions', readonly=True)
+    escalated_reports = fields.Integer(string='Escalated Reports', readonly=True)
+    escalations = fields.Integer(string='Escalations', readonly=True)
+    mails = fields.Integer(string='Mails', readonly=True)
+    managers = fields.Integer(string='Managers Mailed', readonly=True)
+    max_manager_day_mails = fields.Integer(string='Max Mails per Manager/Day', readonly=True)
+    avg_manager_day_mails = fields.Float(string='Avg Mails per Manager/Day', digits=(16, 2), readonly=True)
+    unescalated_pct = fields.Float(string='Not Escalated (%)', digits=(16, 1), readonly=True)
+    median_first_escalation_hours = fields.Float(string='Median Hours to First Escalation', digits=(16, 1),
+                                                 readonly=True)
+    median_approval_hours = fields.Float(string='Median Hours to Approval (Escalated)', digits=(16, 1),
+                                         readonly=True)
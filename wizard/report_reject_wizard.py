@@ -1,34 +1,49 @@
 from odoo import api, fields, models, _
 
+from ..models.dwr_perf import perf_tracked
+
 
 class ReportRejectWizard(models.TransientModel):
     _name = 'report.reject.wizard'
     _description = 'Report Reject Wizard'
 
     employee_report_id = fields.Many2one('employee.report', string='Employee Report')
+    employee_report_ids = fields.Many2many('employee.report', string='Employee Reports')
     support_staff_id = fields.Many2one('support.staff', string='Support Staff Report')
     reason = fields.Text(string='Reason for Rejection', required=True)
 
+    @perf_tracked('report.reject.wizard.action_reject_report')
     def action_reject_report(self):
         """Reject the report with reason"""
-        if self.employee_report_id:
-            self.employee_report_id.write({
+        employee_reports = self.employee_report_ids | self.employee_report_id
+        # In compact audit mode the reason is kept in the audit log instead of the chatter
+        compact = self.env['dwr.audit.log']._is_compact()
+        if employee_reports:
+            employee_reports.approval_ids.filtered(
+                lambda a: a.approver_user_id == self.env.user and a.state == 'pending'
+            ).sudo().write({'state': 'rejected', 'decided_time': fields.Datetime.now()})
+            employee_reports.write({
                 'state': 'draft',
                 'reject_reason': self.reason
             })
-            # Post message to chatter
-            self.employee_report_id.message_post(
-                body=_("Report sent back to draft. Reason: %s") % self.reason,
-                message_type='comment'
-            )
+            # Post message to chatter and notify the employees in one batch
+            body = _("Report sent back to draft. Reason: %s") % self.reason
+            if not compact:
+                employee_reports._message_log_batch(
+                    bodies={report.id: body for report in employee_reports},
+                    author_id=self.env.user.partner_id.id,
+                    message_type='comment',
+                )
+            employee_reports._notify_employee_of_manager_message(body)
         elif self.support_staff_id:
-            self.support_staff_id.write({
+            self.support_staff_id.with_context(dwr_audit_reason=self.reason).write({
                 'state': 'rejected',
             })
             # Post message to chatter
-            self.support_staff_id.message_post(
-                body=_("Report rejected. Reason: %s") % self.reason,
-                message_type='comment'
-            )
+            if not compact:
+                self.support_staff_id.message_post(
+                    body=_("Report rejected. Reason: %s") % self.reason,
+                    message_type='comment'
+                )
         
         return {'type': 'ir.actions.act_window_close'}
\ No newline at end of file